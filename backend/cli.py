@@ -0,0 +1,83 @@
+"""
+Admin command line.
+
+    python -m backend.cli export [-o dump.ndjson] [--tables users,posts]
+    python -m backend.cli import dump.ndjson [--checkpoint dump.ckpt] [--batch-size 5000] [--drop-indexes]
+    python -m backend.cli rollup [--compact] [--seed]
+    python -m backend.cli upgrade [--dry-run] [--relink]
+"""
+import argparse
+import sys
+
+from backend.core.bulk import TABLES, IMPORT_BATCH_SIZE, export_ndjson, import_ndjson
+from backend.core.upgrade import upgrade
+from backend.core.vote_log import compact, roll_up, seed_from_votes
+
+
+def _export(args) -> None:
+    tables = [t for t in TABLES if t in args.tables.split(",")]
+    out = open(args.output, "wb") if args.output != "-" else sys.stdout.buffer
+    try:
+        for chunk in export_ndjson(tables):
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+
+
+def _import(args) -> None:
+    with open(args.path, encoding="utf-8") as f:
+        counts = import_ndjson(f, checkpoint=args.checkpoint, batch_size=args.batch_size,
+                               drop_indexes=args.drop_indexes)
+    for table, n in counts.items():
+        print(f"{table}: {n} rows", file=sys.stderr)
+
+
+def _rollup(args) -> None:
+    if args.seed:
+        print(f"seeded {seed_from_votes()} day buckets from current votes", file=sys.stderr)
+    print(f"rolled up {roll_up()} vote events", file=sys.stderr)
+    if args.compact:
+        for what, n in compact().items():
+            print(f"compacted {what}: {n}", file=sys.stderr)
+
+
+def _upgrade(args) -> None:
+    statements = upgrade(dry_run=args.dry_run, relink=args.relink, log=lambda line: print(line, file=sys.stderr))
+    if not statements:
+        print("schema is up to date", file=sys.stderr)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m backend.cli", description="TrackWeave admin tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("export", help="Stream site content as NDJSON")
+    p.add_argument("-o", "--output", default="-", help="Output file (default: stdout)")
+    p.add_argument("--tables", default=",".join(TABLES), help="Comma-separated tables to export")
+    p.set_defaults(func=_export)
+
+    p = sub.add_parser("import", help="Bulk-load an NDJSON export")
+    p.add_argument("path", help="NDJSON file produced by `export`")
+    p.add_argument("--checkpoint", help="Progress file; rerun with the same path to resume")
+    p.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    p.add_argument("--drop-indexes", action="store_true",
+                   help="Drop secondary indexes during the load, rebuild after (offline only: the site must be down)")
+    p.set_defaults(func=_import)
+
+    p = sub.add_parser("rollup", help="Fold pending vote events into score rollups")
+    p.add_argument("--compact", action="store_true", help="Also drop raw events / fine buckets past retention")
+    p.add_argument("--seed", action="store_true", help="First run on an existing site: seed history from current votes")
+    p.set_defaults(func=_rollup)
+
+    p = sub.add_parser("upgrade", help="Add tables, columns and indexes new since the database was created, then backfill")
+    p.add_argument("--dry-run", action="store_true", help="Print the DDL without running it")
+    p.add_argument("--relink", action="store_true", help="Re-canonicalize every link post (after link rules change)")
+    p.set_defaults(func=_upgrade)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+Streaming NDJSON export / batched import of site content.
+
+Each line is one row: {"table": "posts", "row": {...column values...}}.
+Tables are written parent-first so an import never violates a foreign key.
+"""
+import io
+import json
+import os
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import DateTime, bindparam, select, text, tuple_
+from sqlalchemy.engine import Connection
+
+from backend.core.database import engine
+from backend.core.links import canonicalize
+from backend.models.user import User
+from backend.models.community import Community
+from backend.models.post import Post, make_excerpt
+from backend.models.comment import Comment
+from backend.models.vote import Vote
+from backend.models.notification import Notification
+from backend.models.moderation import ModerationJob
+from backend.models.vote_event import VoteEvent, VoteRollup, VoteRollupState
+
+# FK order: every table only references tables listed before it
+TABLES = {
+    "users":    User.__table__,
+    "communities": Community.__table__,
+    "posts":    Post.__table__,
+    "comments": Comment.__table__,
+    "votes":    Vote.__table__,
+    "notifications": Notification.__table__,
+    "moderation_jobs": ModerationJob.__table__,
+    # Score history: no foreign keys, rollups + watermark restore without a re-roll
+    "vote_events":  VoteEvent.__table__,
+    "vote_rollups": VoteRollup.__table__,
+    "vote_rollup_state": VoteRollupState.__table__,
+}
+
+EXPORT_BATCH_SIZE = 1_000
+IMPORT_BATCH_SIZE = 5_000
+
+
+# ── Export ────────────────────────────────────────────────────────────────────
+def _encode(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def export_ndjson(tables: Iterable[str] = TABLES, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """Yield NDJSON chunks (one per `batch_size` rows) using server-side cursors.
+
+    Memory stays constant regardless of table size. On PostgreSQL the whole
+    export reads from a single REPEATABLE READ snapshot so the dump is consistent.
+    """
+    with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            conn = conn.execution_options(isolation_level="REPEATABLE READ")
+        conn = conn.execution_options(yield_per=batch_size)
+
+        for name in tables:
+            table = TABLES[name]
+            result = conn.execute(select(table).order_by(*table.primary_key.columns))
+            for partition in result.mappings().partitions():
+                yield "".join(
+                    json.dumps(
+                        {"table": name, "row": {k: _encode(v) for k, v in row.items()}},
+                        separators=(",", ":"),
+                    ) + "\n"
+                    for row in partition
+                ).encode()
+
+
+# ── Import ────────────────────────────────────────────────────────────────────
+def _decoder(table):
+    """Convert JSON values back to the column's Python type."""
+    datetime_cols = {c.name for c in table.columns if isinstance(c.type, DateTime)}
+
+    def decode(row: dict) -> dict:
+        out = {}
+        for key, value in row.items():
+            if key not in table.c:
+                continue    # Tolerate dumps from newer schemas
+            if key in datetime_cols and value is not None:
+                value = datetime.fromisoformat(value)
+            out[key] = value
+        return out
+
+    return decode
+
+
+def _copy_value(value) -> str:
+    # PostgreSQL COPY text format: \N is NULL; backslash, tab and newlines escaped
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)      # JSON columns
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _insert_batch(conn: Connection, table, rows: list[dict]) -> None:
+    if conn.dialect.name == "postgresql":
+        if not conn.in_transaction():
+            conn.begin()    # So conn.commit() covers the raw COPY below
+        columns = [c.name for c in table.columns]
+        buf = io.StringIO()
+        for row in rows:
+            buf.write("\t".join(_copy_value(row.get(c)) for c in columns))
+            buf.write("\n")
+        buf.seek(0)
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(
+                f'COPY {table.name} ({", ".join(columns)}) FROM STDIN', buf
+            )
+        finally:
+            cursor.close()
+    else:
+        conn.execute(table.insert(), rows)
+
+
+def _deferrable_indexes(table_names: Iterable[str]) -> list:
+    """Plain secondary indexes — safe to drop during a load. Unique ones stay to enforce integrity."""
+    return [
+        index
+        for name in table_names
+        for index in TABLES[name].indexes
+        if not index.unique
+    ]
+
+
+def backfill_excerpts(conn: Connection, batch_size: int = IMPORT_BATCH_SIZE) -> int:
+    """Posts from before Post.excerpt existed (old dumps, upgraded databases) have none. Returns rows set."""
+    posts = TABLES["posts"]
+    update = (
+        posts.update()
+        .where(posts.c.id == bindparam("_id"))
+        .values(excerpt=bindparam("_excerpt"), updated_at=posts.c.updated_at)   # Not an edit
+    )
+    last_id = done = 0
+    while True:
+        rows = conn.execute(
+            select(posts.c.id, posts.c.body)
+            .where(posts.c.id > last_id, posts.c.excerpt.is_(None), posts.c.body.isnot(None))
+            .order_by(posts.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return done
+        conn.execute(update, [{"_id": r.id, "_excerpt": make_excerpt(r.body)} for r in rows])
+        last_id = rows[-1].id
+        done += len(rows)
+
+
+def backfill_links(conn: Connection, batch_size: int = IMPORT_BATCH_SIZE, recompute: bool = False) -> int:
+    """Same for the canonical link columns (repost detection). Returns rows changed.
+
+    recompute re-canonicalizes every link post, for when the rules in
+    core/links.py change; only rows whose result differs are written.
+    """
+    posts = TABLES["posts"]
+    update = (
+        posts.update()
+        .where(posts.c.id == bindparam("_id"))
+        .values(
+            link_canonical=bindparam("_canonical"), link_provider=bindparam("_provider"),
+            link_item_id=bindparam("_item_id"), link_hash=bindparam("_hash"),
+            updated_at=posts.c.updated_at,
+        )
+    )
+    conds = [posts.c.link_url.isnot(None)]
+    if not recompute:
+        conds.append(posts.c.link_hash.is_(None))
+    last_id = done = 0
+    while True:
+        rows = conn.execute(
+            select(posts.c.id, posts.c.link_url, posts.c.link_canonical, posts.c.link_provider, posts.c.link_item_id)
+            .where(posts.c.id > last_id, *conds)
+            .order_by(posts.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return done
+        params = []
+        for r in rows:
+            link = canonicalize(r.link_url)
+            current = (link.url, link.provider, link.item_id) if link else (None, None, None)
+            if current != (r.link_canonical, r.link_provider, r.link_item_id):
+                params.append({"_id": r.id, "_canonical": current[0], "_provider": current[1],
+                               "_item_id": current[2], "_hash": link.hash if link else None})
+        if params:
+            conn.execute(update, params)
+        last_id = rows[-1].id
+        done += len(params)
+
+
+def _finalize(conn: Connection, table_names: Iterable[str]) -> None:
+    """Catch up on maintenance that was skipped while rows were streaming in."""
+    backfill_excerpts(conn)
+    backfill_links(conn)
+    if conn.dialect.name == "postgresql":
+        # Rows arrive with explicit ids, so the serial sequences are behind
+        for name in table_names:
+            if "id" not in TABLES[name].c:
+                continue        # Natural keys, no sequence
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {name}), 1))"
+            ))
+        for name in table_names:
+            conn.execute(text(f"ANALYZE {name}"))
+
+
+def _without_existing(conn: Connection, table, rows: list[dict]) -> list[dict]:
+    """Drop rows whose primary key is already in the table."""
+    pk = list(table.primary_key.columns)
+    keys = [tuple(row[c.name] for c in pk) for row in rows]
+    if len(pk) == 1:
+        query = select(pk[0]).where(pk[0].in_([k[0] for k in keys]))
+    else:
+        query = select(*pk).where(tuple_(*pk).in_(keys))
+    existing = {tuple(r) for r in conn.execute(query)}
+    return [row for row, key in zip(rows, keys) if key not in existing]
+
+
+def _read_checkpoint(path: Optional[str]) -> int:
+    if not path or not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        return json.load(f)["line"]
+
+
+def _write_checkpoint(path: Optional[str], line: int) -> None:
+    if not path:
+        return
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"line": line}, f)
+    os.replace(tmp, path)   # Atomic: a crash never leaves a torn checkpoint
+
+
+def import_ndjson(
+    lines:        Iterable[str],
+    checkpoint:   Optional[str] = None,
+    batch_size:   int = IMPORT_BATCH_SIZE,
+    drop_indexes: bool = False,
+) -> dict[str, int]:
+    """Load an NDJSON dump in large batches; returns rows inserted per table.
+
+    Each batch commits on its own and advances `checkpoint` (a JSON file
+    holding the number of lines consumed), so an interrupted import resumes
+    where it stopped when run again with the same checkpoint path.
+
+    drop_indexes drops the plain secondary indexes for the duration of the
+    load (much faster on big dumps). Offline only: anything else reading the
+    database meanwhile runs without them. They are rebuilt even if the load fails.
+    """
+    resume_at = _read_checkpoint(checkpoint)
+    counts: dict[str, int] = {}
+    decoders = {name: _decoder(table) for name, table in TABLES.items()}
+    indexes = _deferrable_indexes(TABLES) if drop_indexes else []
+
+    with engine.connect() as conn:
+        for index in indexes:
+            index.drop(conn, checkfirst=True)
+        conn.commit()
+
+        try:
+            batch: list[dict] = []
+            batch_table = None
+            line_no = 0
+
+            # The checkpoint file is written after the commit; a crash in between
+            # leaves the first batch after it already loaded, so that one is de-duplicated
+            replayed = resume_at > 0
+
+            def flush(upto: int):
+                nonlocal replayed
+                if batch and replayed:
+                    batch[:] = _without_existing(conn, TABLES[batch_table], batch)
+                    replayed = False
+                if batch:
+                    _insert_batch(conn, TABLES[batch_table], batch)
+                    conn.commit()
+                    counts[batch_table] = counts.get(batch_table, 0) + len(batch)
+                    _write_checkpoint(checkpoint, upto)
+                    batch.clear()
+
+            for line_no, line in enumerate(lines, start=1):
+                if line_no <= resume_at or not line.strip():
+                    continue
+                record = json.loads(line)
+                name = record["table"]
+                if name not in TABLES:
+                    raise ValueError(f"Line {line_no}: unknown table {name!r}")
+                if name != batch_table or len(batch) >= batch_size:
+                    flush(line_no - 1)
+                    batch_table = name
+                batch.append(decoders[name](record["row"]))
+            flush(line_no)
+        finally:
+            if conn.in_transaction():
+                conn.rollback()        # A failed batch; what committed before it stays
+            for index in indexes:
+                index.create(conn, checkfirst=True)
+            conn.commit()
+
+        _finalize(conn, TABLES)
+        conn.commit()
+
+    if checkpoint and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return counts
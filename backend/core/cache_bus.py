@@ -0,0 +1,366 @@
+"""
+Cross-worker cache invalidation bus.
+
+Write paths stage keys on their DB session with `bus.invalidate(db, *keys)`;
+once the transaction commits every worker hears about it and drops the
+matching entries from its in-process caches (see VersionedCache).
+
+Key scheme:
+    feed                   any change to the global post listing
+    community:{id}:feed    a change to one community's listing or its ranking
+    post:{id}              a post's fields, score or comment count
+    post:{id}:comments     anything inside a post's comment thread
+    user:{id}              a user's profile / principal
+"""
+import glob
+import json
+import logging
+import os
+import select
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from backend.core.database import DATABASE_URL, engine
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration — "postgres" (LISTEN/NOTIFY), "local" (Unix sockets, one host)
+# or "none" (this process only)
+# ---------------------------------------------------------------------------
+CACHE_BUS_BACKEND    = os.getenv(
+    "CACHE_BUS_BACKEND",
+    "postgres" if DATABASE_URL.startswith("postgresql") else "local",
+)
+CACHE_BUS_CHANNEL    = os.getenv("CACHE_BUS_CHANNEL", "trackweave_invalidate")
+CACHE_BUS_SOCKET_DIR = os.getenv("CACHE_BUS_SOCKET_DIR", "/tmp/trackweave-bus")
+
+_STAGED = "cache_bus.keys"   # Session.info slot holding keys to publish on commit
+_MAX_KEYS_PER_MESSAGE = 100  # Keeps each payload well under NOTIFY's 8000-byte limit
+
+
+def community_feed_key(community_id: int) -> str:
+    return f"community:{community_id}:feed"
+
+
+# ---------------------------------------------------------------------------
+# Transports
+# ---------------------------------------------------------------------------
+class BusBackend:
+    """Transport that fans invalidation messages out to other workers.
+
+    The base class delivers nothing, which is correct for a single process.
+    """
+
+    def stage(self, session: Session, payload: str) -> None:
+        """Called inside the committing transaction."""
+
+    def send(self, payload: str) -> None:
+        """Called after the transaction has committed."""
+
+    def listen(self, on_message: Callable[[str], None], on_reset: Callable[[], None]) -> None:
+        """Start delivering remote payloads to `on_message`.
+
+        `on_reset` is called whenever messages may have been missed
+        (e.g. after a reconnect) so callers can drop everything.
+        """
+
+    def close(self) -> None:
+        pass
+
+
+class PostgresBackend(BusBackend):
+    """LISTEN/NOTIFY. NOTIFY rides in the write transaction, so it is delivered iff the write commits."""
+
+    def __init__(self, channel: str = CACHE_BUS_CHANNEL):
+        self.channel = channel
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def stage(self, session: Session, payload: str) -> None:
+        session.execute(text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": self.channel, "payload": payload})
+
+    def listen(self, on_message, on_reset) -> None:
+        self._thread = threading.Thread(
+            target=self._run, args=(on_message, on_reset), name="cache-bus-listen", daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self, on_message, on_reset) -> None:
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        first = True
+        while not self._stop.is_set():
+            try:
+                conn = psycopg2.connect(dsn)
+                conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f'LISTEN "{self.channel}"')
+                if not first:
+                    on_reset()    # Anything sent while we were disconnected is lost
+                first = False
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        on_message(conn.notifies.pop(0).payload)
+                conn.close()
+            except Exception:
+                logger.exception("cache bus listener lost its connection; retrying")
+                self._stop.wait(1.0)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+
+class UnixSocketBackend(BusBackend):
+    """Datagram sockets in a shared directory — one per worker on this host."""
+
+    def __init__(self, directory: str = CACHE_BUS_SOCKET_DIR):
+        self.directory = directory
+        self.path: Optional[str] = None     # Bound by listen()
+        self._sock: Optional[socket.socket] = None
+        self._out = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._out.setblocking(False)
+        self._out_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def send(self, payload: str) -> None:
+        data = payload.encode()
+        if not os.path.isdir(self.directory):
+            return
+        with self._out_lock:
+            for peer in glob.glob(os.path.join(self.directory, "*.sock")):
+                if peer == self.path:
+                    continue
+                try:
+                    self._out.sendto(data, peer)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # The worker that owned this socket is gone
+                    try:
+                        os.unlink(peer)
+                    except FileNotFoundError:
+                        pass
+                except BlockingIOError:
+                    logger.warning("cache bus peer %s is not draining its socket", peer)
+
+    def listen(self, on_message, on_reset) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock")
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self.path)
+        self._sock.settimeout(1.0)
+        self._thread = threading.Thread(
+            target=self._run, args=(on_message,), name="cache-bus-listen", daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self, on_message) -> None:
+        while not self._stop.is_set():
+            try:
+                data = self._sock.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            on_message(data.decode())
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+        self._out.close()
+        if self._sock:
+            self._sock.close()
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+
+# ---------------------------------------------------------------------------
+# Bus
+# ---------------------------------------------------------------------------
+class InvalidationBus:
+    """Tracks the newest version seen for every key and notifies subscribers.
+
+    Versions are writer-assigned nanosecond timestamps, exposed through
+    `version(key)`. Caches compare against `seq(key)` instead, a local
+    counter that is immune to clock skew between hosts. Our own messages
+    echoing back from the transport are ignored.
+    """
+
+    def __init__(self, backend: Optional[BusBackend] = None):
+        self.backend = backend or BusBackend()
+        self.origin = uuid.uuid4().hex
+        self._versions: dict[str, int] = {}
+        self._seqs: dict[str, int] = {}
+        self._seq = 0
+        self._epoch = 0     # Bumped by reset(): everything older is stale
+        self._lock = threading.Lock()
+        self._subscribers: list[Callable[[str], None]] = []
+
+    # ── Publishing ────────────────────────────────────────────────────────────
+    def invalidate(self, db: Session, *keys: str) -> None:
+        """Publish `keys` when `db`'s current transaction commits (dropped on rollback)."""
+        db.info.setdefault(_STAGED, set()).update(keys)
+
+    def publish(self, *keys: str) -> None:
+        """Publish immediately — for writes made outside an ORM session."""
+        for payload in self._payloads(keys):
+            self._apply(payload)
+            self.backend.send(payload)
+
+    def _payloads(self, keys: Iterable[str]) -> list[str]:
+        version = time.time_ns()
+        keys = sorted(keys)
+        return [
+            json.dumps({"o": self.origin, "k": {k: version for k in keys[i:i + _MAX_KEYS_PER_MESSAGE]}},
+                       separators=(",", ":"))
+            for i in range(0, len(keys), _MAX_KEYS_PER_MESSAGE)
+        ]
+
+    # ── Receiving ─────────────────────────────────────────────────────────────
+    def subscribe(self, callback: Callable[[str], None]) -> None:
+        """Call `callback(key)` for every key invalidated (locally or remotely).
+
+        Remote invalidations arrive on the listener thread — keep callbacks short.
+        """
+        self._subscribers.append(callback)
+
+    def _apply(self, payload: str, remote: bool = False) -> None:
+        try:
+            message = json.loads(payload)
+            origin, keys = message["o"], message["k"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("cache bus dropped malformed message %r", payload[:200])
+            return
+        if remote and origin == self.origin:
+            return
+        with self._lock:
+            for key, version in keys.items():
+                self._versions[key] = max(version, self._versions.get(key, 0))
+                self._seq += 1
+                self._seqs[key] = self._seq
+        for key in keys:
+            for callback in self._subscribers:
+                callback(key)
+
+    def reset(self) -> None:
+        """Treat every cached value as stale (messages may have been lost)."""
+        with self._lock:
+            self._seq += 1
+            self._epoch = self._seq
+
+    def version(self, key: str) -> int:
+        return self._versions.get(key, 0)
+
+    def seq(self, key: Optional[str] = None) -> int:
+        """Local sequence of the last invalidation of `key` (or the current sequence)."""
+        if key is None:
+            return self._seq
+        return max(self._seqs.get(key, 0), self._epoch)
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+    def start(self) -> None:
+        self.backend.listen(lambda payload: self._apply(payload, remote=True), self.reset)
+
+    def stop(self) -> None:
+        self.backend.close()
+
+
+def _make_backend(name: str) -> BusBackend:
+    if name == "postgres":
+        return PostgresBackend()
+    if name == "local" and hasattr(socket, "AF_UNIX"):
+        return UnixSocketBackend()
+    return BusBackend()
+
+
+bus = InvalidationBus(_make_backend(CACHE_BUS_BACKEND))
+
+
+# ── Session hooks: publish staged keys only for transactions that commit ─────
+@event.listens_for(Session, "before_commit")
+def _stage_invalidations(session: Session) -> None:
+    keys = session.info.get(_STAGED)
+    if keys:
+        session.info[_STAGED + ".payloads"] = payloads = bus._payloads(keys)
+        for payload in payloads:
+            bus.backend.stage(session, payload)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_invalidations(session: Session) -> None:
+    session.info.pop(_STAGED, None)
+    for payload in session.info.pop(_STAGED + ".payloads", ()):
+        bus._apply(payload)
+        bus.backend.send(payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(_STAGED, None)
+    session.info.pop(_STAGED + ".payloads", None)
+
+
+# ---------------------------------------------------------------------------
+# Consumer side
+# ---------------------------------------------------------------------------
+class VersionedCache:
+    """Small LRU for per-process caches that stay coherent through the bus.
+
+    Each entry remembers the bus sequence at the time its value was *read
+    from the DB*; if any of its tags has been invalidated since, it is a miss.
+    Capture `token = cache.token()` before querying and pass it to `set()`
+    so a write that lands mid-query can't be cached over.
+    """
+
+    def __init__(self, bus: InvalidationBus, maxsize: int = 1024):
+        self.bus = bus
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def token(self) -> int:
+        return self.bus.seq()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, tags, token = entry
+            if any(self.bus.seq(tag) > token for tag in tags):
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, tags: Iterable[str], token: int) -> None:
+        tags = tuple(tags)
+        if any(self.bus.seq(tag) > token for tag in tags):
+            return      # Invalidated while we were loading it
+        with self._lock:
+            self._data[key] = (value, tags, token)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
@@ -33,6 +33,21 @@ def get_current_user(
     return user
 
 
+def get_token_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    """User id from a valid access token, without a DB lookup — for hot polling endpoints.
+
+    Callers must still check the account is active (e.g. via a cached row).
+    """
+    payload = decode_token(token)
+    if payload is None or payload.get("type") != "access" or payload.get("sub") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return int(payload["sub"])
+
+
 def get_current_user_optional(
     token: Optional[str] = Depends(OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)),
     db: Session = Depends(get_db),
@@ -44,3 +59,9 @@ def get_current_user_optional(
         return get_current_user(token, db)
     except HTTPException:
         return None
+
+
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin privileges required.")
+    return current_user
@@ -0,0 +1,305 @@
+"""
+Slow-request flight recorder and on-demand stack sampler.
+
+Every /api/ request carries a small trace (a list on a context variable)
+that engine events append each SQL statement and its timing to. When the
+response finishes, the trace is dropped unless the request was slow enough
+to make the "slowest recent requests" board; only then are parameters
+rendered and the entry kept. Idle cost is a context-variable lookup per
+statement and two clock reads.
+
+StackSampler polls sys._current_frames() for a bounded time and returns
+collapsed stacks ("thread;frame;frame count" lines), the input format of
+flamegraph.pl / speedscope.
+"""
+import contextvars
+import heapq
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import event
+
+from backend.core.database import engine, pool_wait
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+FLIGHT_RECORDER_ENABLED  = os.getenv("FLIGHT_RECORDER_ENABLED", "1") == "1"
+FLIGHT_RECORDER_SIZE     = int(os.getenv("FLIGHT_RECORDER_SIZE", 50))         # requests kept
+FLIGHT_RECORDER_MIN_MS   = float(os.getenv("FLIGHT_RECORDER_MIN_MS", 200))    # ignore anything faster
+FLIGHT_RECORDER_WINDOW   = float(os.getenv("FLIGHT_RECORDER_WINDOW", 3600))   # seconds an entry stays eligible
+FLIGHT_RECORDER_MAX_SQL  = 200     # statements kept per request
+_MAX_PARAM_CHARS         = 300
+_SECRET_PARAMS           = ("password", "token", "secret")
+
+PROFILE_MAX_SECONDS      = 60
+PROFILE_MIN_INTERVAL_MS  = 1
+
+
+# ---------------------------------------------------------------------------
+# Per-request trace
+# ---------------------------------------------------------------------------
+class _Trace:
+    __slots__ = ("started", "statements", "dropped", "pool_wait")
+
+    def __init__(self):
+        self.started   = time.perf_counter()
+        self.statements: list[tuple] = []     # (offset_s, duration_s, statement, params)
+        self.dropped   = 0
+        self.pool_wait = 0.0
+
+
+_current: contextvars.ContextVar[Optional[_Trace]] = contextvars.ContextVar("flight_trace", default=None)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("flight_start", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = _current.get()
+    if trace is None:
+        return
+    starts = conn.info.get("flight_start")
+    if not starts:
+        return
+    start = starts.pop()
+    if len(trace.statements) >= FLIGHT_RECORDER_MAX_SQL:
+        trace.dropped += 1
+        return
+    # Bind parameters by name (whatever the driver's paramstyle), kept by
+    # reference and only rendered if the request makes the board
+    if context is not None and context.compiled_parameters:
+        parameters = context.compiled_parameters
+    trace.statements.append((start - trace.started, time.perf_counter() - start, statement, parameters))
+
+
+@event.listens_for(engine, "handle_error")
+def _on_statement_error(context):
+    starts = context.connection.info.get("flight_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def _on_checkout_wait(seconds: float) -> None:
+    trace = _current.get()
+    if trace is not None:
+        trace.pool_wait += seconds
+
+
+pool_wait.listeners.append(_on_checkout_wait)
+
+
+def _render_params(parameters) -> Optional[str]:
+    if not parameters:
+        return None
+    if isinstance(parameters, list) and len(parameters) == 1:
+        parameters = parameters[0]
+    if isinstance(parameters, dict):
+        parameters = {
+            k: ("***" if any(s in str(k).lower() for s in _SECRET_PARAMS) else v)
+            for k, v in parameters.items()
+        }
+    elif isinstance(parameters, list):
+        return f"<executemany: {len(parameters)} rows>"
+    text = repr(parameters)
+    return text if len(text) <= _MAX_PARAM_CHARS else text[:_MAX_PARAM_CHARS] + "…"
+
+
+# ---------------------------------------------------------------------------
+# Slowest-requests board
+# ---------------------------------------------------------------------------
+class SlowRequestLog:
+    """The `size` slowest requests of the last `window` seconds, as a min-heap on duration."""
+
+    def __init__(
+        self,
+        size:   int   = FLIGHT_RECORDER_SIZE,
+        min_ms: float = FLIGHT_RECORDER_MIN_MS,
+        window: float = FLIGHT_RECORDER_WINDOW,
+    ):
+        self.size   = size
+        self.min_ms = min_ms
+        self.window = window
+        self._heap: list[tuple[float, int, float, dict]] = []   # (duration_ms, seq, recorded_at, entry)
+        self._seq  = 0
+        self._lock = threading.Lock()
+
+    def would_keep(self, duration_ms: float) -> bool:
+        """Cheap pre-check so fast requests never pay for building an entry."""
+        if duration_ms < self.min_ms:
+            return False
+        heap = self._heap
+        return len(heap) < self.size or duration_ms > heap[0][0] or heap[0][2] < time.monotonic() - self.window
+
+    def add(self, duration_ms: float, entry: dict) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._seq += 1
+            item = (duration_ms, self._seq, now, entry)
+            if len(self._heap) < self.size:
+                heapq.heappush(self._heap, item)
+            elif duration_ms > self._heap[0][0]:
+                heapq.heapreplace(self._heap, item)
+
+    def entries(self) -> list[dict]:
+        """Slowest first."""
+        with self._lock:
+            self._expire(time.monotonic())
+            return [e for _, _, _, e in sorted(self._heap, key=lambda i: i[0], reverse=True)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._heap.clear()
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window
+        if any(recorded_at < cutoff for _, _, recorded_at, _ in self._heap):
+            self._heap = [i for i in self._heap if i[2] >= cutoff]
+            heapq.heapify(self._heap)
+
+
+slow_requests = SlowRequestLog()
+
+
+# ---------------------------------------------------------------------------
+# ASGI middleware
+# ---------------------------------------------------------------------------
+class FlightRecorderMiddleware:
+    """Times /api/ requests (admin tools excepted) and files the slow ones in `log`."""
+
+    def __init__(self, app, log: Optional[SlowRequestLog] = None, enabled: bool = FLIGHT_RECORDER_ENABLED):
+        self.app     = app
+        self.log     = log or slow_requests
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if (
+            not self.enabled
+            or scope["type"] != "http"
+            or not path.startswith("/api/")
+            or path.startswith("/api/admin/")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        trace = _Trace()
+        token = _current.set(trace)
+        response = {"status": None, "bytes": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            duration_ms = (time.perf_counter() - trace.started) * 1000
+            if self.log.would_keep(duration_ms):
+                self.log.add(duration_ms, _entry(scope, trace, duration_ms, response))
+
+
+def _entry(scope, trace: _Trace, duration_ms: float, response: dict) -> dict:
+    route = scope.get("route")
+    return {
+        "at":             datetime.now(timezone.utc),
+        "method":         scope["method"],
+        "path":           scope["path"],
+        "route":          getattr(route, "path", None),
+        "path_params":    scope.get("path_params", {}),
+        "query":          scope.get("query_string", b"").decode("latin-1"),
+        "status":         response["status"],
+        "duration_ms":    round(duration_ms, 2),
+        "sql_ms":         round(sum(s[1] for s in trace.statements) * 1000, 2),
+        "pool_wait_ms":   round(trace.pool_wait * 1000, 2),
+        "response_bytes": response["bytes"],
+        "sql": [
+            {
+                "offset_ms":   round(offset * 1000, 2),
+                "duration_ms": round(duration * 1000, 2),
+                "statement":   statement,
+                "params":      _render_params(params),
+            }
+            for offset, duration, statement, params in trace.statements
+        ],
+        "sql_dropped":    trace.dropped,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Statistical stack sampler
+# ---------------------------------------------------------------------------
+class ProfilerBusy(Exception):
+    pass
+
+
+class StackSampler:
+    """Time-boxed sampler over every thread in this process. One run at a time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def run(self, seconds: float, interval_ms: float = 5) -> tuple[str, int]:
+        """Sample for `seconds`; returns (collapsed stacks, number of samples taken)."""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy()
+        try:
+            return self._sample(
+                min(seconds, PROFILE_MAX_SECONDS),
+                max(interval_ms, PROFILE_MIN_INTERVAL_MS) / 1000,
+            )
+        finally:
+            self._lock.release()
+
+    def _sample(self, seconds: float, interval: float) -> tuple[str, int]:
+        me = threading.get_ident()
+        prefixes = sorted(filter(None, sys.path), key=len, reverse=True)
+        stacks: Counter = Counter()
+        labels: dict = {}          # Code object -> frame label, computed once
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = _frame_label(code, prefixes)
+                    stack.append(label)
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}").replace(";", ":"))
+                stacks[";".join(reversed(stack))] += 1
+            samples += 1
+            time.sleep(interval)
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common()), samples
+
+
+def _frame_label(code, prefixes: list[str]) -> str:
+    filename = code.co_filename
+    for prefix in prefixes:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):].lstrip(os.sep)
+            break
+    # Same shape as py-spy's collapsed output; ";" is the frame separator
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+sampler = StackSampler()
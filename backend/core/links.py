@@ -0,0 +1,172 @@
+"""
+Link canonicalization for repost detection.
+
+Every spelling of the same track should reduce to one canonical URL:
+
+    https://open.spotify.com/intl-de/track/4uLU6hMC?si=abc   ┐
+    spotify:track:4uLU6hMC                                    ├─ https://open.spotify.com/track/4uLU6hMC
+    http://OPEN.SPOTIFY.COM/track/4uLU6hMC/                   ┘
+
+Known music providers are rebuilt from their item id; anything else gets
+generic normalization (https, lowercase host without www./m., no default
+port / fragment / trailing slash, known tracking parameters dropped, the
+rest sorted). The canonical URL is hashed to a signed 64-bit integer for a
+compact fixed-width index; lookups still compare the full string, so a
+hash collision can never merge two different links.
+"""
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit
+
+MAX_CANONICAL_LENGTH = 2048
+
+# Query parameters that identify the sharer or campaign, never the content.
+# Site-wide only for names no site uses for anything else (plus every utm_*);
+# short generic names (si, ref, source, …) are stripped only on the hosts
+# known to use them for tracking — elsewhere they may select the content.
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "gbraid", "wbraid", "dclid", "msclkid", "yclid", "twclid", "ttclid",
+    "igshid", "mc_cid", "mc_eid", "_ga", "_gl",
+}
+HOST_TRACKING_PARAMS = {                  # Host (and its subdomains) -> extra tracking parameters
+    "youtube.com":      {"si", "feature", "pp", "ab_channel"},
+    "open.spotify.com": {"si", "context", "nd"},
+    "soundcloud.com":   {"si", "ref"},
+    "twitter.com":      {"ref_src", "ref_url", "s", "t"},
+    "x.com":            {"ref_src", "ref_url", "s", "t"},
+    "instagram.com":    {"igsh"},
+    "bandcamp.com":     {"from"},
+}
+_STRIP_HOST_PREFIXES = ("www.", "m.", "mobile.")
+_HOST = re.compile(r"^[a-z0-9.:-]+$")    # After IDNA encoding; ':' for IPv6 literals
+
+_SPOTIFY_URI = re.compile(r"^spotify:(track|album|artist|playlist|episode|show):([A-Za-z0-9]{10,40})$")
+_SPOTIFY     = re.compile(r"^/(?:intl-[a-z]{2}(?:-[a-z]{2})?/)?(?:embed/)?(track|album|artist|playlist|episode|show)/([A-Za-z0-9]{10,40})")
+_DEEZER      = re.compile(r"^/(?:[a-z]{2}(?:-[a-z]{2})?/)?(track|album|artist|playlist)/(\d+)")
+_YOUTUBE_ID  = re.compile(r"^[A-Za-z0-9_-]{11}$")
+_YOUTUBE     = re.compile(r"^/(?:shorts|embed|live|v)/([A-Za-z0-9_-]{11})")
+_APPLE       = re.compile(r"^/[a-z]{2}/(album|song|artist|playlist)/(?:[^/]+/)?((?:pl\.)?[A-Za-z0-9.-]+)$")
+_TIDAL       = re.compile(r"^/(?:browse/)?(track|album|artist|playlist|video)/([A-Za-z0-9-]+)")
+
+
+@dataclass(frozen=True)
+class CanonicalLink:
+    url:      str                   # Canonical URL
+    provider: Optional[str] = None  # "spotify", "deezer", "youtube", "apple", "tidal"
+    item_id:  Optional[str] = None  # "{kind}:{id}", e.g. "track:4uLU6hMC" or "video:dQw4w9WgXcQ"
+
+    @property
+    def hash(self) -> int:
+        return link_hash(self.url)
+
+
+def link_hash(canonical_url: str) -> int:
+    """First 8 bytes of SHA-256 as a signed 64-bit integer (fits BIGINT)."""
+    return int.from_bytes(hashlib.sha256(canonical_url.encode()).digest()[:8], "big", signed=True)
+
+
+def canonicalize(raw: Optional[str]) -> Optional[CanonicalLink]:
+    """Canonical form of a user-supplied link, or None if it isn't a usable http(s) URL."""
+    if not raw:
+        return None
+    raw = raw.strip()
+
+    match = _SPOTIFY_URI.match(raw)
+    if match:
+        return _provider("spotify", *match.groups())
+    if "://" not in raw:
+        raw = "https://" + raw
+
+    try:
+        parts = urlsplit(raw)
+        port = parts.port
+    except ValueError:
+        return None
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        return None
+
+    host = parts.hostname.rstrip(".")
+    try:
+        host = host.encode("idna").decode("ascii").lower()
+    except UnicodeError:
+        return None
+    if not _HOST.match(host):
+        return None
+    for prefix in _STRIP_HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+
+    path = re.sub(r"/{2,}", "/", parts.path) or "/"
+    query = parse_qsl(parts.query, keep_blank_values=True)
+
+    link = _known_provider(host, path, dict(query))
+    if link is not None:
+        return link
+
+    path = quote(unquote(path), safe="/:@!$&'()*+,;=-._~")
+    if len(path) > 1:
+        path = path.rstrip("/")
+    drop = TRACKING_PARAMS | _host_params(host)
+    query = sorted((k, v) for k, v in query if k.lower() not in drop and not k.lower().startswith("utm_"))
+    if ":" in host:
+        host = f"[{host}]"
+    netloc = host if port in (None, 80, 443) else f"{host}:{port}"
+    url = f"https://{netloc}{path}" + (f"?{urlencode(query)}" if query else "")
+    if len(url) > MAX_CANONICAL_LENGTH:
+        return None
+    return CanonicalLink(url)
+
+
+def _host_params(host: str) -> set[str]:
+    params = set()
+    for suffix, names in HOST_TRACKING_PARAMS.items():
+        if host == suffix or host.endswith("." + suffix):
+            params |= names
+    return params
+
+
+def _known_provider(host: str, path: str, query: dict) -> Optional[CanonicalLink]:
+    if host == "open.spotify.com":
+        match = _SPOTIFY.match(path)
+        if match:
+            return _provider("spotify", *match.groups())
+    elif host == "deezer.com":
+        match = _DEEZER.match(path)
+        if match:
+            return _provider("deezer", *match.groups())
+    elif host in ("youtube.com", "music.youtube.com", "youtube-nocookie.com"):
+        video = query.get("v") if path == "/watch" else None
+        match = _YOUTUBE.match(path)
+        video = video or (match.group(1) if match else None)
+        if video and _YOUTUBE_ID.match(video):
+            return _provider("youtube", "video", video)
+    elif host == "youtu.be":
+        video = path.strip("/")
+        if _YOUTUBE_ID.match(video):
+            return _provider("youtube", "video", video)
+    elif host == "music.apple.com":
+        match = _APPLE.match(path.rstrip("/"))
+        if match:
+            kind, item = match.groups()
+            if kind == "album" and query.get("i", "").isdigit():
+                kind, item = "song", query["i"]     # A track link shared from its album page
+            return _provider("apple", kind, item)
+    elif host in ("tidal.com", "listen.tidal.com"):
+        match = _TIDAL.match(path)
+        if match:
+            return _provider("tidal", *match.groups())
+    return None
+
+
+def _provider(provider: str, kind: str, item: str) -> CanonicalLink:
+    url = {
+        "spotify": f"https://open.spotify.com/{kind}/{item}",
+        "deezer":  f"https://www.deezer.com/{kind}/{item}",
+        "youtube": f"https://www.youtube.com/watch?v={item}",
+        "apple":   f"https://music.apple.com/{kind}/{item}",
+        "tidal":   f"https://tidal.com/browse/{kind}/{item}",
+    }[provider]
+    return CanonicalLink(url, provider, f"{kind}:{item}")
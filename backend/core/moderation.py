@@ -0,0 +1,373 @@
+"""
+Set-based bulk moderation.
+
+A job selects rows by keyset (`id > last ORDER BY id LIMIT chunk`) and
+handles each chunk with a few UPDATE / DELETE ... WHERE id IN (...)
+statements in its own short transaction, so an account with hundreds of
+thousands of rows never holds locks for long. Per chunk it also:
+
+  * retires the reply notifications pointing at the removed content (marked
+    read on soft delete, deleted on purge) and lowers the recipients'
+    users.unread_notifications by exactly the rows touched (RETURNING);
+  * stages cache-bus invalidations for the affected posts and threads, and
+    for the authors whose content went away (every worker's @mention index
+    re-reads their activity);
+  * advances the job's progress in the same transaction.
+
+Purge deletes dependents explicitly (notifications, votes, reply links)
+rather than relying on ON DELETE rules, so it behaves the same on every
+database. Every deleted vote is logged as a reversal in the vote event log,
+so score history and rising never keep counting it. Both actions are idempotent: re-running a failed job finishes it.
+
+The job row is the queue's source of truth. Its plan is rebuilt from the
+stored params, and a worker claims a job with a conditional UPDATE, so at
+startup every worker can requeue what is pending, interrupted or running
+without a heartbeat for MODERATION_STALE_AFTER seconds (its worker died), and
+exactly one of them runs it.
+"""
+import logging
+import os
+import queue
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import and_, delete, func, or_, select, update
+
+from backend.core.cache_bus import bus, community_feed_key
+from backend.core.database import SessionLocal
+from backend.core.notifications import adjust_unread
+from backend.core.vote_log import record_vote_removal
+from backend.models.user import User
+from backend.models.post import Post
+from backend.models.comment import Comment
+from backend.models.vote import Vote
+from backend.models.notification import Notification
+from backend.models.moderation import ModerationJob
+from backend.schemas.admin import BanRequest, BulkModeration
+
+logger = logging.getLogger(__name__)
+
+MODERATION_CHUNK_SIZE  = int(os.getenv("MODERATION_CHUNK_SIZE", 1_000))
+MODERATION_STALE_AFTER = int(os.getenv("MODERATION_STALE_AFTER", 300))   # Seconds without progress before a running job is presumed dead
+
+_users         = User.__table__
+_posts         = Post.__table__
+_comments      = Comment.__table__
+_votes         = Vote.__table__
+_notifications = Notification.__table__
+_jobs          = ModerationJob.__table__
+
+
+@dataclass
+class Selection:
+    """Which posts / comments a job touches. Criteria combine with AND."""
+    author_id:      Optional[int]       = None
+    ids:            Optional[list[int]] = None
+    created_after:  Optional[datetime]  = None
+    created_before: Optional[datetime]  = None
+
+    def where(self, table, action: str) -> list:
+        conds = []
+        if self.author_id is not None:
+            conds.append(table.c.author_id == self.author_id)
+        if self.ids is not None:
+            conds.append(table.c.id.in_(self.ids))
+        if self.created_after is not None:
+            conds.append(table.c.created_at >= self.created_after)
+        if self.created_before is not None:
+            conds.append(table.c.created_at < self.created_before)
+        if action == "soft_delete":
+            conds.append(table.c.is_deleted == False)
+        return conds
+
+
+@dataclass
+class Plan:
+    """What a job does: an action over posts and/or comments, optionally a user's votes."""
+    action:    str
+    selection: Selection
+    targets:   tuple[str, ...] = ("posts", "comments")
+    votes_by:  Optional[int]   = None     # Also delete every vote cast by this user
+
+
+def plan_for(kind: str, params: dict) -> Plan:
+    """The plan a job runs, from the params stored with it (the validated request body)."""
+    if kind == "ban_user":
+        ban = BanRequest.model_validate(params)
+        user_id = params["user_id"]
+        return Plan(ban.action, Selection(author_id=user_id), votes_by=user_id if ban.votes else None)
+    bulk = BulkModeration.model_validate(params)
+    selection = Selection(bulk.author_id, bulk.ids, bulk.created_after, bulk.created_before)
+    return Plan(bulk.action, selection, targets=tuple(dict.fromkeys(bulk.targets)))
+
+
+# ---------------------------------------------------------------------------
+# Chunk handlers — each runs inside the chunk's transaction
+# ---------------------------------------------------------------------------
+def _retire_notifications(db, condition, purge: bool) -> int:
+    """Drop (purge) or mark read (soft delete) the notifications matching `condition`."""
+    n = _notifications
+    if purge:
+        stmt = delete(n).where(condition).returning(n.c.user_id, n.c.is_read)
+        rows = db.execute(stmt).all()
+        unread = Counter(user_id for user_id, is_read in rows if not is_read)
+    else:
+        stmt = update(n).where(condition, n.c.is_read == False).values(is_read=True).returning(n.c.user_id)
+        rows = db.execute(stmt).all()
+        unread = Counter(user_id for user_id, in rows)
+    adjust_unread(db, {user_id: -count for user_id, count in unread.items()})
+    return len(rows)
+
+
+def _posts_chunk(db, ids: list[int], purge: bool, community_ids: set[int], author_ids: set[int]) -> None:
+    _retire_notifications(db, _notifications.c.post_id.in_(ids), purge)
+    if purge:
+        thread = select(_comments.c.id).where(_comments.c.post_id.in_(ids))
+        author_ids = author_ids | set(db.scalars(
+            select(_comments.c.author_id).where(_comments.c.post_id.in_(ids)).distinct()
+        ))
+        votes = or_(_votes.c.post_id.in_(ids), _votes.c.comment_id.in_(thread))
+        record_vote_removal(db, votes)
+        db.execute(delete(_votes).where(votes))
+        db.execute(delete(_comments).where(_comments.c.post_id.in_(ids)))
+        db.execute(delete(_posts).where(_posts.c.id.in_(ids)))
+    else:
+        db.execute(update(_posts).where(_posts.c.id.in_(ids)).values(is_deleted=True))
+    keys = ["feed"] + [community_feed_key(c) for c in community_ids] + [f"user:{a}" for a in author_ids]
+    for post_id in ids:
+        keys += [f"post:{post_id}", f"post:{post_id}:comments"]
+    bus.invalidate(db, *keys)
+
+
+def _comments_chunk(db, ids: list[int], purge: bool, post_ids: set[int], author_ids: set[int]) -> None:
+    _retire_notifications(db, _notifications.c.comment_id.in_(ids), purge)
+    if purge:
+        record_vote_removal(db, _votes.c.comment_id.in_(ids))
+        db.execute(delete(_votes).where(_votes.c.comment_id.in_(ids)))
+        # Same as the FK's ON DELETE SET NULL: replies by others move up a level
+        db.execute(
+            update(_comments)
+            .where(_comments.c.parent_id.in_(ids))
+            .values(parent_id=None, updated_at=_comments.c.updated_at)
+        )
+        db.execute(delete(_comments).where(_comments.c.id.in_(ids)))
+    else:
+        db.execute(update(_comments).where(_comments.c.id.in_(ids)).values(is_deleted=True))
+    keys = [f"user:{a}" for a in author_ids]
+    for post_id in post_ids:
+        keys += [f"post:{post_id}", f"post:{post_id}:comments"]
+    bus.invalidate(db, *keys)
+
+
+def _votes_chunk(db, ids: list[int], post_ids: set[int], thread_ids: set[int], community_ids: set[int]) -> None:
+    record_vote_removal(db, _votes.c.id.in_(ids))     # Score history shows the votes going away
+    db.execute(delete(_votes).where(_votes.c.id.in_(ids)))
+    keys = [f"post:{p}" for p in post_ids] + [f"post:{p}:comments" for p in thread_ids]
+    keys += [community_feed_key(c) for c in community_ids]
+    if post_ids:
+        keys.append("feed")
+    bus.invalidate(db, *keys)
+
+
+def deactivate_user(db, user_id: int) -> None:
+    """Lock the account out right away; its content is handled by a job."""
+    db.execute(update(_users).where(_users.c.id == user_id).values(is_active=False))
+    bus.invalidate(db, f"user:{user_id}")
+
+
+# ---------------------------------------------------------------------------
+# Job execution
+# ---------------------------------------------------------------------------
+class JobInterrupted(Exception):
+    pass
+
+
+def _resumable(now: datetime):
+    """Jobs nobody is working on: never started, stopped by a shutdown, or running on a dead worker."""
+    return or_(
+        _jobs.c.status.in_(("pending", "interrupted")),
+        and_(
+            _jobs.c.status == "running",
+            func.coalesce(_jobs.c.updated_at, _jobs.c.created_at) < now - timedelta(seconds=MODERATION_STALE_AFTER),
+        ),
+    )
+
+
+class ModerationRunner:
+    """Runs queued jobs one at a time on a background thread (jobs never race each other)."""
+
+    def __init__(self, chunk_size: int = MODERATION_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self._queue: "queue.SimpleQueue[int]" = queue.SimpleQueue()
+        self._stop   = threading.Event()
+        self._thread = None
+
+    def submit(self, db, kind: str, params: dict, admin_id: int) -> ModerationJob:
+        """Commit a pending job row (with whatever else `db` holds) and queue it."""
+        plan = plan_for(kind, params)
+        job = ModerationJob(kind=kind, action=plan.action, params=params, created_by=admin_id, progress={})
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self._queue.put(job.id)
+        return job
+
+    def retry(self, db, job: ModerationJob) -> bool:
+        """Queue a failed, interrupted or abandoned job again. False if it is done or still in hand."""
+        now = datetime.now(timezone.utc)
+        reset = db.execute(
+            update(_jobs)
+            .where(_jobs.c.id == job.id, or_(_jobs.c.status == "failed", _resumable(now)))
+            .values(status="pending", error=None, finished_at=None, updated_at=now)
+        ).rowcount
+        db.commit()
+        db.refresh(job)
+        if reset:
+            self._queue.put(job.id)
+        return bool(reset)
+
+    def resume(self) -> int:
+        """Queue every job left unfinished by a previous run of any worker. Returns how many."""
+        db = SessionLocal()
+        try:
+            ids = db.scalars(
+                select(_jobs.c.id).where(_resumable(datetime.now(timezone.utc))).order_by(_jobs.c.id)
+            ).all()
+        finally:
+            db.close()
+        for job_id in ids:
+            self._queue.put(job_id)
+        return len(ids)
+
+    def start(self) -> None:
+        self._stop.clear()
+        try:
+            resumed = self.resume()
+        except Exception:
+            logger.exception("could not look for unfinished moderation jobs")
+        else:
+            if resumed:
+                logger.info("resuming %d unfinished moderation job(s)", resumed)
+        self._thread = threading.Thread(target=self._loop, name="moderation", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                job_id = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self.run(job_id)
+
+    def run(self, job_id: int) -> None:
+        db = SessionLocal()
+        job = None
+        try:
+            # Claim it: when several workers queued the same job at startup, one wins
+            now = datetime.now(timezone.utc)
+            claimed = db.execute(
+                update(_jobs).where(_jobs.c.id == job_id, _resumable(now)).values(status="running", updated_at=now)
+            ).rowcount
+            db.commit()
+            if not claimed:
+                return
+            job = db.get(ModerationJob, job_id)
+            plan = plan_for(job.kind, job.params)
+            job.progress = self._totals(db, plan)
+            db.commit()
+
+            purge = plan.action == "purge"
+            if "posts" in plan.targets:
+                self._each_chunk(
+                    db, job, "posts", _posts,
+                    select(_posts.c.id, _posts.c.community_id, _posts.c.author_id)
+                    .where(*plan.selection.where(_posts, plan.action)),
+                    lambda rows: _posts_chunk(
+                        db, [r.id for r in rows], purge,
+                        {r.community_id for r in rows if r.community_id is not None},
+                        {r.author_id for r in rows},
+                    ),
+                )
+            if "comments" in plan.targets:
+                self._each_chunk(
+                    db, job, "comments", _comments,
+                    select(_comments.c.id, _comments.c.post_id, _comments.c.author_id)
+                    .where(*plan.selection.where(_comments, plan.action)),
+                    lambda rows: _comments_chunk(
+                        db, [r.id for r in rows], purge, {r.post_id for r in rows}, {r.author_id for r in rows},
+                    ),
+                )
+            if plan.votes_by is not None:
+                self._each_chunk(
+                    db, job, "votes", _votes,
+                    select(_votes.c.id, _votes.c.post_id, _comments.c.post_id.label("thread_id"),
+                           _posts.c.community_id)
+                    .outerjoin(_comments, _votes.c.comment_id == _comments.c.id)
+                    .outerjoin(_posts, _votes.c.post_id == _posts.c.id)
+                    .where(_votes.c.user_id == plan.votes_by),
+                    lambda rows: _votes_chunk(
+                        db, [r.id for r in rows],
+                        {r.post_id for r in rows if r.post_id is not None},
+                        {r.thread_id for r in rows if r.thread_id is not None},
+                        {r.community_id for r in rows if r.community_id is not None},
+                    ),
+                )
+            self._finish(db, job, "done")
+        except JobInterrupted:
+            db.rollback()
+            self._finish(db, job, "interrupted")
+        except Exception as exc:
+            db.rollback()
+            logger.exception("moderation job %d failed", job_id)
+            self._finish(db, db.get(ModerationJob, job_id), "failed", str(exc))
+        finally:
+            db.close()
+
+    def _each_chunk(self, db, job: ModerationJob, name: str, table, query, handle) -> None:
+        last_id = 0
+        while True:
+            if self._stop.is_set():
+                raise JobInterrupted()
+            rows = db.execute(
+                query.where(table.c.id > last_id).order_by(table.c.id).limit(self.chunk_size)
+            ).all()
+            if not rows:
+                return
+            handle(rows)
+            last_id = rows[-1].id
+            progress = dict(job.progress)
+            entry = dict(progress.get(name, {"total": 0, "done": 0}))
+            entry["done"] += len(rows)
+            progress[name] = entry
+            job.progress = progress     # Reassigned: JSON columns don't track in-place edits
+            db.commit()
+
+    def _totals(self, db, plan: Plan) -> dict:
+        totals = {}
+        for name, table in (("posts", _posts), ("comments", _comments)):
+            if name in plan.targets:
+                count = db.scalar(select(func.count()).select_from(table).where(*plan.selection.where(table, plan.action)))
+                totals[name] = {"total": count, "done": 0}
+        if plan.votes_by is not None:
+            count = db.scalar(select(func.count()).select_from(_votes).where(_votes.c.user_id == plan.votes_by))
+            totals["votes"] = {"total": count, "done": 0}
+        return totals
+
+    def _finish(self, db, job: Optional[ModerationJob], status: str, error: Optional[str] = None) -> None:
+        if job is None:
+            return
+        job.status = status
+        job.error = error
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+
+
+runner = ModerationRunner()
@@ -0,0 +1,149 @@
+"""
+Batched notification fan-out.
+
+create_comment only drops a dict on an in-memory queue; a background thread
+drains it, inserting rows in one multi-row INSERT and bumping each
+recipient's users.unread_notifications counter once per batch. A batch that
+fails is retried row by row, so only the offending rows are dropped.
+Entries still queued when the process dies are lost — notifications are
+best-effort.
+"""
+import logging
+import os
+import queue
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+
+from sqlalchemy import case, func, insert, select, update
+
+from backend.core.cache_bus import bus
+from backend.core.database import SessionLocal
+from backend.models.notification import Notification
+from backend.models.user import User
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_BATCH_SIZE     = int(os.getenv("NOTIFY_BATCH_SIZE", 500))
+NOTIFY_FLUSH_INTERVAL = float(os.getenv("NOTIFY_FLUSH_INTERVAL", 0.25))   # seconds
+
+
+def unread_key(user_id: int) -> str:
+    return f"user:{user_id}:notifications"
+
+
+def adjust_unread(db, deltas: dict[int, int]) -> None:
+    """Apply per-user changes to the unread counter (never below zero) and invalidate caches."""
+    users = User.__table__
+    for user_id in sorted(deltas):          # Fixed lock order across concurrent batches
+        delta = deltas[user_id]
+        if not delta:
+            continue
+        new_value = users.c.unread_notifications + delta
+        if delta < 0:
+            new_value = case((new_value < 0, 0), else_=new_value)
+        db.execute(
+            update(users)
+            .where(users.c.id == user_id)
+            .values(unread_notifications=new_value, updated_at=users.c.updated_at)   # Not a profile edit
+        )
+    bus.invalidate(db, *(unread_key(u) for u, d in deltas.items() if d))
+
+
+def recount_unread(conn) -> int:
+    """Reset unread counters that disagree with the inbox (run by `cli upgrade`). Returns users fixed."""
+    users, notes = User.__table__, Notification.__table__
+    actual = (
+        select(func.count())
+        .where(notes.c.user_id == users.c.id, notes.c.is_read == False)
+        .scalar_subquery()
+    )
+    return conn.execute(
+        update(users)
+        .where(users.c.unread_notifications != actual)
+        .values(unread_notifications=actual, updated_at=users.c.updated_at)
+    ).rowcount
+
+
+class NotificationDispatcher:
+    def __init__(self, batch_size: int = NOTIFY_BATCH_SIZE, flush_interval: float = NOTIFY_FLUSH_INTERVAL):
+        self.batch_size     = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.SimpleQueue[dict]" = queue.SimpleQueue()
+        self._stop   = threading.Event()
+        self._thread = None
+
+    def enqueue(self, user_id: int, actor_id: int, post_id: int, comment_id: int, kind: str) -> None:
+        self._queue.put({
+            "user_id":    user_id,
+            "actor_id":   actor_id,
+            "post_id":    post_id,
+            "comment_id": comment_id,
+            "kind":       kind,
+            "is_read":    False,
+            "created_at": datetime.now(timezone.utc),
+        })
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="notification-dispatch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.drain()    # Whatever arrived after the thread's last pass
+
+    def drain(self) -> None:
+        """Flush everything queued right now on the calling thread."""
+        while True:
+            batch = self._take(block=False)
+            if not batch:
+                return
+            self._flush(batch)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._take(block=True)
+            if batch:
+                self._flush(batch)
+
+    def _take(self, block: bool) -> list[dict]:
+        batch = []
+        try:
+            if block:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _flush(self, batch: list[dict]) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(insert(Notification), batch)
+            adjust_unread(db, Counter(n["user_id"] for n in batch))
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.warning("batch of %d notifications failed; inserting one by one", len(batch), exc_info=True)
+            self._flush_each(db, batch)
+        finally:
+            db.close()
+
+    def _flush_each(self, db, batch: list[dict]) -> None:
+        # One bad row (e.g. its comment was purged meanwhile) must not cost the rest
+        for row in batch:
+            try:
+                db.execute(insert(Notification), [row])
+                adjust_unread(db, {row["user_id"]: 1})
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                logger.error("dropped notification %s for user %s (comment %s): %s",
+                             row["kind"], row["user_id"], row["comment_id"], exc)
+
+
+dispatcher = NotificationDispatcher()
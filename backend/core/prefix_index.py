@@ -0,0 +1,246 @@
+"""
+In-process prefix index for @mention / username autocomplete.
+
+A sorted array of lowercased keys (username, and display name when it
+differs) with a parallel array of user ids. A prefix maps to one contiguous
+slice found by two binary searches; the slice is ranked by activity (posts +
+comments).
+
+Prefixes whose slice is too big to rank per request ("a", "th", …) get their
+top CACHE_K ids precomputed when the index is built. Activity bumps and new
+keys are folded into those lists in place (a few dozen comparisons per
+prefix of the author's name), so a busy author never sends the next lookup
+back to a full rank. Lists are only dropped when a user leaves one (rename,
+deactivation); the next lookup re-ranks that slice outside the lock.
+
+Pure data structure, no database: core/user_index.py loads and refreshes it.
+Footprint is dominated by the key strings — about 260 B per user measured as
+RSS growth (see benchmarks/user_suggest.py).
+"""
+import heapq
+import threading
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Iterable, Optional
+
+SCAN_LIMIT = 256     # Slices bigger than this are served from the top-k cache
+CACHE_K    = 50      # Results kept per cached prefix (max suggestion limit)
+_HIGH      = "\U0010ffff"
+
+
+class UserPrefixIndex:
+    def __init__(self):
+        self._lock      = threading.RLock()
+        self._keys:  list[str] = []
+        self._ids        = array("i")
+        self._usernames: list[Optional[str]] = []    # Indexed by user id
+        self._display:   list[Optional[str]] = []
+        self._activity   = array("l")
+        self._top: dict[str, list[int]] = {}         # Prefix -> best CACHE_K ids, best first
+        # Users changed since generation N — lets a top list ranked off the lock catch up
+        self._generation = 0
+        self._changes: deque[tuple[int, int]] = deque(maxlen=10_000)
+        self.ready = False
+
+    # ── Building ──────────────────────────────────────────────────────────────
+    def build(self, rows: Iterable[tuple[int, str, Optional[str], int]]) -> None:
+        """Replace the contents with (id, username, display_name, activity) rows."""
+        usernames, display, activity, entries = [], [], array("l"), []
+        for user_id, username, display_name, score in rows:
+            if user_id >= len(usernames):
+                grow = user_id + 1 - len(usernames)
+                usernames.extend([None] * grow)
+                display.extend([None] * grow)
+                activity.extend([0] * grow)
+            usernames[user_id] = username
+            display[user_id] = display_name
+            activity[user_id] = score
+            for key in self._keys_for(username, display_name):
+                entries.append((key, user_id))
+        entries.sort()
+        keys = [k for k, _ in entries]
+        ids  = array("i", (i for _, i in entries))
+        del entries
+        top = self._warm(keys, ids, activity)
+
+        with self._lock:
+            self._keys      = keys
+            self._ids       = ids
+            self._usernames = usernames
+            self._display   = display
+            self._activity  = activity
+            self._top       = top
+            self._generation += 1
+            self._changes.clear()
+            self.ready      = True
+
+    @staticmethod
+    def _warm(keys: list[str], ids, activity) -> dict[str, list[int]]:
+        """Top lists for every prefix whose slice exceeds SCAN_LIMIT (children of big slices only)."""
+        top = {}
+        ranges = [(0, len(keys), 0)]     # Slices whose keys share a prefix of length n
+        while ranges:
+            lo, hi, n = ranges.pop()
+            i = lo
+            while i < hi:
+                if len(keys[i]) <= n:
+                    i += 1
+                    continue
+                prefix = keys[i][:n + 1]
+                j = bisect_left(keys, prefix + _HIGH, i, hi)
+                if j - i > SCAN_LIMIT:
+                    top[prefix] = _rank(ids[i:j], CACHE_K, activity)
+                    ranges.append((i, j, n + 1))
+                i = j
+        return top
+
+    @staticmethod
+    def _keys_for(username: str, display_name: Optional[str]) -> list[str]:
+        keys = [username]
+        if display_name:
+            lowered = display_name.lower()
+            if lowered != username:
+                keys.append(lowered)
+        return keys
+
+    # ── Updates ───────────────────────────────────────────────────────────────
+    def upsert(self, user_id: int, username: str, display_name: Optional[str]) -> None:
+        with self._lock:
+            self._grow(user_id)
+            old = self._usernames[user_id]
+            if old is not None:
+                if old == username and self._display[user_id] == display_name:
+                    return
+                self._remove_keys(user_id)
+            self._usernames[user_id] = username
+            self._display[user_id] = display_name
+            for key in self._keys_for(username, display_name):
+                i = bisect_left(self._keys, key)
+                self._keys.insert(i, key)
+                self._ids.insert(i, user_id)
+            self._touch(user_id)
+
+    def remove(self, user_id: int) -> None:
+        with self._lock:
+            if user_id < len(self._usernames) and self._usernames[user_id] is not None:
+                self._remove_keys(user_id)
+                self._usernames[user_id] = None
+                self._display[user_id] = None
+                self._touch(user_id)
+
+    def bump(self, user_id: int, amount: int = 1) -> None:
+        """Record activity (a new post or comment) for ranking."""
+        with self._lock:
+            if user_id < len(self._usernames) and self._usernames[user_id] is not None:
+                self._activity[user_id] += amount
+                if amount < 0:
+                    # Sinking may let an uncached user overtake: those lists need a re-rank
+                    for key in self._keys_for(self._usernames[user_id], self._display[user_id]):
+                        self._forget(key, user_id)
+                self._touch(user_id)
+
+    def set_activity(self, user_id: int, activity: int) -> None:
+        """Overwrite a user's activity with a fresh count (e.g. after moderation removed content)."""
+        with self._lock:
+            if user_id < len(self._usernames) and self._usernames[user_id] is not None:
+                delta = activity - self._activity[user_id]
+                if delta:
+                    self.bump(user_id, delta)
+
+    def _grow(self, user_id: int) -> None:
+        if user_id >= len(self._usernames):
+            grow = user_id + 1 - len(self._usernames)
+            self._usernames.extend([None] * grow)
+            self._display.extend([None] * grow)
+            self._activity.extend([0] * grow)
+
+    def _remove_keys(self, user_id: int) -> None:
+        for key in self._keys_for(self._usernames[user_id], self._display[user_id]):
+            i = bisect_left(self._keys, key)
+            while i < len(self._keys) and self._keys[i] == key:
+                if self._ids[i] == user_id:
+                    del self._keys[i]
+                    del self._ids[i]
+                    break
+                i += 1
+            self._forget(key, user_id)
+
+    def _forget(self, key: str, user_id: int) -> None:
+        """Drop the cached lists under `key` that hold `user_id` — only a full rank can refill them."""
+        for n in range(1, len(key) + 1):
+            top = self._top.get(key[:n])
+            if top is not None and user_id in top:
+                del self._top[key[:n]]
+
+    def _touch(self, user_id: int) -> None:
+        """Fold a user's current activity into every cached list under their keys."""
+        self._generation += 1
+        self._changes.append((self._generation, user_id))
+        username = self._usernames[user_id]
+        if username is None:
+            return
+        for key in self._keys_for(username, self._display[user_id]):
+            for n in range(1, len(key) + 1):
+                top = self._top.get(key[:n])
+                if top is not None:
+                    self._place(top, user_id)
+
+    def _place(self, top: list[int], user_id: int) -> None:
+        activity = self._activity
+        rank = (activity[user_id], -user_id)
+        if user_id in top:
+            top.remove(user_id)
+        elif len(top) >= CACHE_K and rank <= (activity[top[-1]], -top[-1]):
+            return
+        i = 0
+        while i < len(top) and (activity[top[i]], -top[i]) > rank:
+            i += 1
+        top.insert(i, user_id)
+        del top[CACHE_K:]
+
+    # ── Lookup ────────────────────────────────────────────────────────────────
+    def suggest(self, q: str, limit: int = 8) -> list[tuple[int, str, Optional[str]]]:
+        """Best `limit` (id, username, display_name) matches for a prefix, most active first."""
+        prefix = q.strip().lower()
+        if not prefix:
+            return []
+        limit = min(limit, CACHE_K)
+        with self._lock:
+            lo = bisect_left(self._keys, prefix)
+            hi = bisect_left(self._keys, prefix + _HIGH, lo)
+            if hi - lo <= SCAN_LIMIT:
+                return self._named(_rank(self._ids[lo:hi], limit, self._activity))
+            ranked = self._top.get(prefix)
+            if ranked is not None:
+                return self._named(ranked[:limit])
+            ids, generation = self._ids[lo:hi], self._generation
+
+        # Uncached big slice: rank a copy without blocking other lookups and updates
+        ranked = _rank(ids, CACHE_K, self._activity)
+        with self._lock:
+            if self._catch_up(prefix, ranked, generation):
+                self._top[prefix] = ranked
+            return self._named(ranked[:limit])
+
+    def _catch_up(self, prefix: str, ranked: list[int], generation: int) -> bool:
+        """Apply changes made while `ranked` was computed. False if it can't be trusted."""
+        if self._changes and self._changes[0][0] > generation + 1:
+            return False                 # Change log overflowed
+        for changed_at, user_id in self._changes:
+            if changed_at <= generation:
+                continue
+            username = self._usernames[user_id] if user_id < len(self._usernames) else None
+            keys = self._keys_for(username, self._display[user_id]) if username is not None else []
+            if any(k.startswith(prefix) for k in keys):
+                self._place(ranked, user_id)
+            elif user_id in ranked:
+                return False             # Left the slice: a replacement needs a full rank
+        return True
+
+    def _named(self, ids: list[int]) -> list[tuple[int, str, Optional[str]]]:
+        return [(i, self._usernames[i], self._display[i]) for i in ids]
+
+
+def _rank(ids, k: int, activity) -> list[int]:
+    return heapq.nlargest(k, set(ids), key=lambda i: (activity[i], -i))
@@ -0,0 +1,256 @@
+import json
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from backend.core.database import pool_wait
+from backend.core.security import decode_token
+
+# ---------------------------------------------------------------------------
+# Configuration — override via environment variables in production
+# ---------------------------------------------------------------------------
+RATE_LIMIT_ENABLED     = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "0") == "1"   # honour X-Forwarded-For
+SHED_LOW_IN_FLIGHT     = int(os.getenv("SHED_LOW_IN_FLIGHT", 60))     # shed low priority above this
+SHED_MAX_IN_FLIGHT     = int(os.getenv("SHED_MAX_IN_FLIGHT", 200))    # shed everything but high above this
+SHED_MAX_POOL_WAIT_MS  = float(os.getenv("SHED_MAX_POOL_WAIT_MS", 250))
+SHED_RETRY_AFTER       = int(os.getenv("SHED_RETRY_AFTER", 2))        # seconds
+
+
+@dataclass(frozen=True)
+class Rate:
+    """Token-bucket parameters: refill `per_second` tokens, hold at most `burst`."""
+    per_second: float
+    burst:      int
+
+    @classmethod
+    def per_minute(cls, n: int, burst: Optional[int] = None) -> "Rate":
+        return cls(n / 60.0, burst or n)
+
+
+@dataclass(frozen=True)
+class RouteLimit:
+    method:   str
+    path:     str                    # FastAPI-style template, e.g. /api/comments/post/{post_id}
+    per_ip:   Optional[Rate] = None
+    per_user: Optional[Rate] = None
+    priority: str            = "normal"
+    shares:   Optional[str]  = None  # "METHOD /path" of another route whose buckets this one draws from
+
+    def compile(self) -> re.Pattern:
+        return re.compile("^" + re.sub(r"\{[^/]+\}", "[^/]+", self.path) + "$")
+
+
+# ---------------------------------------------------------------------------
+# Per-route limits. Unlisted routes are never rate limited; their priority
+# defaults to "low" for GET and "normal" for everything else.
+# ---------------------------------------------------------------------------
+ROUTE_LIMITS = [
+    RouteLimit("POST", "/api/auth/login",    per_ip=Rate.per_minute(10, burst=20)),
+    RouteLimit("POST", "/api/auth/register", per_ip=Rate.per_minute(5,  burst=10)),
+    RouteLimit("POST", "/api/auth/refresh",  per_ip=Rate.per_minute(30), priority="high"),
+    RouteLimit("GET",  "/api/auth/me",       priority="high"),
+    RouteLimit("POST", "/api/votes/",        per_ip=Rate.per_minute(240), per_user=Rate.per_minute(60, burst=30)),
+    RouteLimit("POST", "/api/posts/",        per_user=Rate.per_minute(5,  burst=10)),
+    RouteLimit("POST", "/api/comments/post/{post_id}", per_user=Rate.per_minute(20, burst=20)),
+    RouteLimit("GET",  "/api/comments/post/{post_id}", per_ip=Rate.per_minute(120, burst=60), priority="low"),
+    RouteLimit("GET",  "/api/posts/{post_id}",         per_ip=Rate.per_minute(240, burst=120), priority="low"),
+    # The post page bundle embeds the comment thread, so it spends the same budget
+    RouteLimit("GET",  "/api/pages/post/{post_id}",    per_ip=Rate.per_minute(120, burst=60), priority="low",
+               shares="GET /api/comments/post/{post_id}"),
+]
+
+
+# ---------------------------------------------------------------------------
+# Limiter state backends
+# ---------------------------------------------------------------------------
+class RateLimitBackend:
+    """Storage for token buckets. Subclass to share state across workers (e.g. Redis)."""
+
+    async def consume(self, buckets: list[tuple[str, Rate]], cost: float = 1.0) -> float:
+        """Take `cost` tokens from every (key, rate) bucket — or, if any is short, from none.
+
+        Returns 0 when the request is allowed, otherwise the number of
+        seconds until all of them will have refilled enough.
+        """
+        raise NotImplementedError
+
+
+class InMemoryBackend(RateLimitBackend):
+    """Per-process buckets, least recently used first. Over max_keys, refilled and then LRU buckets go."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()   # key -> [tokens, updated_at, full_at]
+
+    async def consume(self, buckets: list[tuple[str, Rate]], cost: float = 1.0) -> float:
+        now = time.monotonic()
+        levels, wait = [], 0.0
+        for key, rate in buckets:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = float(rate.burst)
+            else:
+                tokens = min(rate.burst, bucket[0] + (now - bucket[1]) * rate.per_second)
+            if tokens < cost:
+                wait = max(wait, (cost - tokens) / rate.per_second)
+            levels.append(tokens)
+        if wait:
+            return wait
+
+        for (key, rate), tokens in zip(buckets, levels):
+            tokens -= cost
+            self._buckets[key] = [tokens, now, now + (rate.burst - tokens) / rate.per_second]
+            self._buckets.move_to_end(key)
+        if len(self._buckets) > self.max_keys:
+            self._evict(now)
+        return 0.0
+
+    def _evict(self, now: float) -> None:
+        # A bucket that would be full again is indistinguishable from a fresh one
+        for key in [k for k, b in self._buckets.items() if b[2] <= now]:
+            del self._buckets[key]
+        # Still over (IP churn with active buckets): drop the least recently used,
+        # down to 90% so the scan above doesn't run on every new key
+        while len(self._buckets) > self.max_keys * 0.9:
+            self._buckets.popitem(last=False)
+
+
+# ---------------------------------------------------------------------------
+# Admission control
+# ---------------------------------------------------------------------------
+class LoadShedder:
+    """Tracks in-flight API requests and refuses work the process can't absorb."""
+
+    def __init__(
+        self,
+        low_in_flight:    int   = SHED_LOW_IN_FLIGHT,
+        max_in_flight:    int   = SHED_MAX_IN_FLIGHT,
+        max_pool_wait_ms: float = SHED_MAX_POOL_WAIT_MS,
+    ):
+        self.low_in_flight    = low_in_flight
+        self.max_in_flight    = max_in_flight
+        self.max_pool_wait_ms = max_pool_wait_ms
+        self.in_flight        = 0
+
+    def should_shed(self, priority: str) -> bool:
+        if priority == "high":
+            return False
+        if self.in_flight >= self.max_in_flight:
+            return True
+        if priority == "low":
+            return (
+                self.in_flight >= self.low_in_flight
+                or pool_wait.recent_ms >= self.max_pool_wait_ms
+            )
+        return False
+
+
+# ---------------------------------------------------------------------------
+# ASGI middleware
+# ---------------------------------------------------------------------------
+class RateLimitMiddleware:
+    """Applies per-route token buckets, then admission control, to /api/ requests."""
+
+    def __init__(
+        self,
+        app,
+        routes:  list[RouteLimit]           = ROUTE_LIMITS,
+        backend: Optional[RateLimitBackend] = None,
+        shedder: Optional[LoadShedder]      = None,
+        enabled: bool                       = RATE_LIMIT_ENABLED,
+    ):
+        self.app     = app
+        self.routes  = [(r.method, r.compile(), r) for r in routes]
+        self.backend = backend or InMemoryBackend()
+        self.shedder = shedder or LoadShedder()
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self._match(method, scope["path"])
+
+        if route is not None:
+            retry_after = await self._consume(scope, route)
+            if retry_after:
+                await _reject(send, 429, retry_after, "Too many requests. Slow down.")
+                return
+
+        priority = route.priority if route else ("low" if method == "GET" else "normal")
+        if self.shedder.should_shed(priority):
+            await _reject(send, 503, SHED_RETRY_AFTER, "Server is busy. Try again shortly.")
+            return
+
+        self.shedder.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.shedder.in_flight -= 1
+
+    def _match(self, method: str, path: str) -> Optional[RouteLimit]:
+        for route_method, pattern, route in self.routes:
+            if route_method == method and pattern.match(path):
+                return route
+        return None
+
+    async def _consume(self, scope, route: RouteLimit) -> float:
+        # Both limits are checked before either is charged: a request the
+        # per-user limit turns away doesn't use up its IP's quota
+        name = route.shares or f"{route.method} {route.path}"
+        buckets = []
+        if route.per_ip is not None:
+            buckets.append((f"ip:{_client_ip(scope)}:{name}", route.per_ip))
+        if route.per_user is not None:
+            user_id = _user_id(scope)
+            if user_id is not None:
+                buckets.append((f"user:{user_id}:{name}", route.per_user))
+        return await self.backend.consume(buckets) if buckets else 0.0
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _client_ip(scope) -> str:
+    if RATE_LIMIT_TRUST_PROXY:
+        forwarded = _header(scope, b"x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _user_id(scope) -> Optional[str]:
+    """Subject of a valid bearer access token — signature check only, no DB hit."""
+    auth = _header(scope, b"authorization")
+    if not auth or not auth.lower().startswith("bearer "):
+        return None
+    payload = decode_token(auth[7:].strip())
+    if not payload or payload.get("type") != "access":
+        return None
+    return payload.get("sub")
+
+
+async def _reject(send, status_code: int, retry_after: float, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,119 @@
+"""
+Sparse fieldsets and author side-loading for list endpoints.
+
+    ?fields=id,title,excerpt,score        only these item fields (id is always kept)
+    ?author_fields=username,avatar_url    only these author fields
+    ?include=authors                      {"items": [...], "authors": [...]} with
+                                          items carrying author_id instead of author
+
+Columns a request doesn't ask for are deferred in the query, so large ones
+(e.g. Post.body) never leave the database.
+"""
+from typing import Optional
+
+from fastapi import HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import defer, joinedload
+
+from backend.models.user import User
+from backend.schemas.user import UserPublic
+
+# Per table: item fields backed by a column worth not loading when unused
+DEFERRABLE = {"posts": ("body",)}
+
+
+def _parse(raw: Optional[str], schema: type[BaseModel]) -> Optional[set[str]]:
+    if raw is None:
+        return None
+    fields = {f.strip() for f in raw.split(",") if f.strip()}
+    unknown = fields - set(schema.model_fields)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(sorted(unknown))}.")
+    return fields | {"id"}
+
+
+def author_load(relationship, fields: Optional[set[str]] = None):
+    """Eager-load an author with only the public columns (or the requested subset)."""
+    names = [f for f in UserPublic.model_fields if fields is None or f in fields]
+    return joinedload(relationship).load_only(*(getattr(User, n) for n in names))
+
+
+class Sparse:
+    def __init__(
+        self,
+        fields:          Optional[set[str]] = None,
+        author_fields:   Optional[set[str]] = None,
+        include_authors: bool = False,
+    ):
+        self.fields          = fields
+        self.author_fields   = author_fields
+        self.include_authors = include_authors
+
+    @property
+    def is_default(self) -> bool:
+        return self.fields is None and self.author_fields is None and not self.include_authors
+
+    def wants(self, field: str) -> bool:
+        return self.fields is None or field in self.fields
+
+    def load_options(self, model) -> list:
+        """Query options: defer unrequested large columns, slim down the author join."""
+        options = [
+            defer(getattr(model, f))
+            for f in DEFERRABLE.get(model.__tablename__, ())
+            if not self.wants(f)
+        ]
+        options.append(author_load(model.author, self.author_fields))
+        return options
+
+    def render(self, items: list[dict], schema: type[BaseModel]):
+        """Shape enriched items. Untouched requests go back through response_model as before."""
+        if self.is_default:
+            return items
+        authors: Optional[dict] = {} if self.include_authors else None
+        out = [self._project(i, schema, authors) for i in items]
+        if authors is not None:
+            out = {"items": out, "authors": list(authors.values())}
+        return JSONResponse(jsonable_encoder(out))
+
+    def _project(self, item: dict, schema: type[BaseModel], authors: Optional[dict]) -> dict:
+        # Read only what was asked for — touching a deferred attribute would cost a query
+        out = {}
+        for name, info in schema.model_fields.items():
+            if not self.wants(name):
+                continue
+            if name == "author":
+                author = self._author(item["author"])
+                if authors is None:
+                    out["author"] = author
+                else:
+                    authors.setdefault(author["id"], author)
+                    out["author_id"] = author["id"]
+            elif name == "replies":
+                out["replies"] = [self._project(r, schema, authors) for r in item["replies"]]
+            else:
+                out[name] = item.get(name, info.default)
+        return out
+
+    def _author(self, user: User) -> dict:
+        return {
+            f: getattr(user, f)
+            for f in UserPublic.model_fields
+            if self.author_fields is None or f in self.author_fields
+        }
+
+
+def sparse_fieldset(schema: type[BaseModel]):
+    """Build a dependency parsing ?fields / ?author_fields / ?include against `schema`."""
+
+    def dependency(
+        fields:        Optional[str] = Query(None, description=f"Comma-separated {schema.__name__} fields"),
+        author_fields: Optional[str] = Query(None, description="Comma-separated author (UserPublic) fields"),
+        include:       Optional[str] = Query(None, pattern="^authors$",
+                                             description="`authors`: list each author once, items get author_id"),
+    ) -> Sparse:
+        return Sparse(_parse(fields, schema), _parse(author_fields, UserPublic), include == "authors")
+
+    return dependency
@@ -0,0 +1,93 @@
+"""
+In-place upgrade of a database created by an earlier release.
+
+Base.metadata.create_all() (run at startup) only creates missing tables — it
+never touches one that exists, so columns and indexes added to existing
+models since a database was created have to be added here:
+
+    python -m backend.cli upgrade [--dry-run]
+
+Compares the live schema with the models, then:
+
+  * creates missing tables;
+  * adds missing columns (ALTER TABLE … ADD COLUMN, with server defaults and
+    foreign keys) — new columns must be nullable or carry a server default;
+  * creates missing indexes;
+  * backfills derived columns for rows written before they existed.
+
+Safe to rerun: every step skips what is already there. Startup refuses to
+serve a database with missing columns (check_schema) rather than failing on
+every query that reads them.
+"""
+from typing import Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateTable
+
+from backend.core.bulk import TABLES, backfill_excerpts, backfill_links
+from backend.core.database import engine
+from backend.core.notifications import recount_unread
+
+
+def pending_changes(conn: Connection) -> list[str]:
+    """DDL needed to bring the live schema up to the models, in execution order."""
+    inspector = inspect(conn)
+    existing = set(inspector.get_table_names())
+    statements = []
+    for name, table in TABLES.items():
+        if name not in existing:
+            statements.append(str(CreateTable(table).compile(dialect=conn.dialect)).strip())
+            statements.extend(str(CreateIndex(i).compile(dialect=conn.dialect)) for i in table.indexes)
+            continue
+        columns = {c["name"] for c in inspector.get_columns(name)}
+        for column in table.columns:
+            if column.name not in columns:
+                statements.append(f"ALTER TABLE {name} ADD COLUMN {_column_spec(conn, column)}")
+        indexes = {i["name"] for i in inspector.get_indexes(name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                statements.append(str(CreateIndex(index).compile(dialect=conn.dialect)))
+    return statements
+
+
+def _column_spec(conn: Connection, column) -> str:
+    spec = str(CreateColumn(column).compile(dialect=conn.dialect))
+    for fk in column.foreign_keys:
+        target = fk.column
+        spec += f" REFERENCES {target.table.name} ({target.name})"
+        if fk.ondelete:
+            spec += f" ON DELETE {fk.ondelete}"
+    return spec
+
+
+def upgrade(dry_run: bool = False, relink: bool = False, log=print) -> list[str]:
+    """Apply pending DDL (one transaction), then the backfills. Returns the DDL.
+
+    relink re-canonicalizes every link post instead of only those without a
+    canonical link — needed once after the rules in core/links.py change.
+    """
+    with engine.begin() as conn:
+        statements = pending_changes(conn)
+        for statement in statements:
+            log(statement)
+            if not dry_run:
+                conn.exec_driver_sql(statement)
+    if dry_run:
+        return statements
+
+    with engine.begin() as conn:
+        log(f"backfilled post excerpts: {backfill_excerpts(conn)}")
+        log(f"backfilled canonical links: {backfill_links(conn, recompute=relink)}")
+        log(f"recounted unread notifications: {recount_unread(conn)} users")
+    return statements
+
+
+def check_schema() -> Optional[str]:
+    """Why the database can't be served as it is, or None."""
+    with engine.connect() as conn:
+        missing = [s for s in pending_changes(conn) if s.startswith("ALTER TABLE")]
+    if missing:
+        return (f"The database schema is behind this release ({len(missing)} missing column(s)). "
+                "Run `python -m backend.cli upgrade` first.")
+    return None
@@ -0,0 +1,134 @@
+"""
+Per-worker username autocomplete index: loading and cross-worker refresh.
+
+The data structure itself is core/prefix_index.py. It is built in the
+background at startup, re-reads users other workers changed (heard via the
+cache bus) — names and activity, so content removed by moderation stops
+counting — and is bumped locally for new posts and comments.
+"""
+import logging
+import queue
+import threading
+from typing import Iterable, Optional
+
+from sqlalchemy import func
+
+from backend.core.cache_bus import bus
+from backend.core.database import SessionLocal
+from backend.core.prefix_index import UserPrefixIndex
+from backend.models.user import User
+from backend.models.post import Post
+from backend.models.comment import Comment
+
+logger = logging.getLogger(__name__)
+
+user_index = UserPrefixIndex()
+
+
+# ---------------------------------------------------------------------------
+# Loading and cross-worker refresh
+# ---------------------------------------------------------------------------
+def _activity(db, user_ids: Optional[set[int]] = None) -> dict[int, int]:
+    """Live posts + comments per author (all authors, or just `user_ids`)."""
+    activity: dict[int, int] = {}
+    for model in (Post, Comment):
+        query = db.query(model.author_id, func.count(model.id)).filter(model.is_deleted == False)
+        if user_ids is not None:
+            query = query.filter(model.author_id.in_(user_ids))
+        for author_id, n in query.group_by(model.author_id):
+            activity[author_id] = activity.get(author_id, 0) + n
+    return activity
+
+
+def _load_rows(db) -> Iterable[tuple[int, str, Optional[str], int]]:
+    activity = _activity(db)
+    rows = (
+        db.query(User.id, User.username, User.display_name)
+        .filter(User.is_active == True)
+        .execution_options(yield_per=10_000)
+    )
+    for user_id, username, display_name in rows:
+        yield user_id, username, display_name, activity.get(user_id, 0)
+
+
+def load_user_index() -> None:
+    db = SessionLocal()
+    try:
+        user_index.build(_load_rows(db))
+        logger.info("user prefix index loaded")
+    finally:
+        db.close()
+
+
+class _Refresher:
+    """Re-reads users changed anywhere (heard via the cache bus), a batch at a time."""
+
+    def __init__(self, poll_interval: float = 0.5):
+        self.poll_interval = poll_interval
+        self._queue: "queue.SimpleQueue[int]" = queue.SimpleQueue()
+        self._stop   = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def on_invalidate(self, key: str) -> None:
+        parts = key.split(":")
+        if len(parts) == 2 and parts[0] == "user" and parts[1].isdigit():
+            self._queue.put(int(parts[1]))
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="user-index-load", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self) -> None:
+        try:
+            load_user_index()
+        except Exception:
+            logger.exception("user prefix index failed to load; /suggest falls back to SQL")
+        while not self._stop.is_set():
+            try:
+                ids = {self._queue.get(timeout=self.poll_interval)}
+            except queue.Empty:
+                continue
+            while True:
+                try:
+                    ids.add(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._refresh(ids)
+            except Exception:
+                logger.exception("user prefix index refresh failed")
+
+    def _refresh(self, ids: set[int]) -> None:
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(User.id, User.username, User.display_name, User.is_active)
+                .filter(User.id.in_(ids))
+                .all()
+            )
+            activity = _activity(db, {user_id for user_id, _, _, is_active in rows if is_active})
+        finally:
+            db.close()
+        seen = set()
+        for user_id, username, display_name, is_active in rows:
+            seen.add(user_id)
+            if is_active:
+                user_index.upsert(user_id, username, display_name)
+                user_index.set_activity(user_id, activity.get(user_id, 0))
+            else:
+                user_index.remove(user_id)
+        for user_id in ids - seen:
+            user_index.remove(user_id)
+
+
+refresher = _Refresher()
+bus.subscribe(refresher.on_invalidate)
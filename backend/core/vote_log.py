@@ -0,0 +1,317 @@
+"""
+Vote event log and time-bucketed rollups.
+
+The vote path appends a VoteEvent in the same transaction as the vote
+(record_vote). A rollup pass then folds every event past the watermark into
+minute / hour / day VoteRollup buckets and advances the watermark, all in
+one transaction, so each event is counted exactly once. Only events older
+than VOTE_ROLLUP_LAG are taken: ids are handed out before commit, and the
+lag lets slower transactions land before the watermark passes their ids.
+
+Compaction removes raw events and minute / hour buckets once they are past
+their retention; day buckets are kept, so history is always complete at
+day resolution. Score history and "rising" read only the rollups.
+"""
+import logging
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import case, delete, func, insert, literal, select, update
+
+from backend.core.database import SessionLocal
+from backend.models.vote import Vote
+from backend.models.post import Post
+from backend.models.comment import Comment
+from backend.models.vote_event import VoteEvent, VoteRollup, VoteRollupState
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+VOTE_ROLLUP_INTERVAL      = float(os.getenv("VOTE_ROLLUP_INTERVAL", 60))   # seconds between passes
+VOTE_ROLLUP_LAG           = float(os.getenv("VOTE_ROLLUP_LAG", 10))        # seconds
+VOTE_EVENT_RETENTION_DAYS = int(os.getenv("VOTE_EVENT_RETENTION_DAYS", 7))
+ROLLUP_BATCH_SIZE         = 10_000
+
+GRANULARITIES = {"minute": 60, "hour": 3_600, "day": 86_400}
+RETENTION     = {                      # How long fine buckets are kept (day: forever)
+    "minute": timedelta(days=2),
+    "hour":   timedelta(days=90),
+}
+
+_votes   = Vote.__table__
+_events  = VoteEvent.__table__
+_rollups = VoteRollup.__table__
+_state   = VoteRollupState.__table__
+_EPOCH   = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_STATE_NAME = "votes"
+
+
+def _utc(dt: datetime) -> datetime:
+    # SQLite hands back naive datetimes for timezone-aware columns
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def bucket_start(dt: datetime, granularity: str) -> datetime:
+    seconds = GRANULARITIES[granularity]
+    offset = int((_utc(dt) - _EPOCH).total_seconds()) // seconds * seconds
+    return _EPOCH + timedelta(seconds=offset)
+
+
+# ── Writing ───────────────────────────────────────────────────────────────────
+def record_vote(db, target_type: str, target_id: int, user_id: Optional[int], delta: int) -> None:
+    """Log a score change; committed (or rolled back) with the caller's vote."""
+    if delta:
+        db.add(VoteEvent(target_type=target_type, target_id=target_id, user_id=user_id, delta=delta))
+
+
+def record_vote_removal(db, condition) -> None:
+    """Log the reversal of the votes matching `condition`, about to be deleted in bulk (INSERT ... SELECT)."""
+    now = datetime.now(timezone.utc)
+    for column, target_type in ((_votes.c.post_id, "post"), (_votes.c.comment_id, "comment")):
+        db.execute(
+            insert(_events).from_select(
+                ["target_type", "target_id", "user_id", "delta", "created_at"],
+                select(
+                    literal(target_type, _events.c.target_type.type), column, _votes.c.user_id,
+                    -_votes.c.direction, literal(now, _events.c.created_at.type),
+                ).where(condition, column.isnot(None)),
+            )
+        )
+
+
+# ── Rollup ────────────────────────────────────────────────────────────────────
+def _upsert(db, rows: list[dict]) -> None:
+    """Add rows' up/down counts into existing buckets, creating missing ones."""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(_rollups)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[c.name for c in _rollups.primary_key],
+            set_={
+                "upvotes":   _rollups.c.upvotes + stmt.excluded.upvotes,
+                "downvotes": _rollups.c.downvotes + stmt.excluded.downvotes,
+            },
+        )
+        db.execute(stmt, rows)
+        return
+    for row in rows:    # Portable fallback
+        key = [_rollups.c[c.name] == row[c.name] for c in _rollups.primary_key]
+        changed = db.execute(
+            update(_rollups).where(*key).values(
+                upvotes=_rollups.c.upvotes + row["upvotes"],
+                downvotes=_rollups.c.downvotes + row["downvotes"],
+            )
+        ).rowcount
+        if not changed:
+            db.execute(insert(_rollups), [row])
+
+
+def _lock_state(db) -> Optional[int]:
+    """Watermark, row-locked for this transaction; None if another worker holds it."""
+    query = select(_state.c.last_event_id).where(_state.c.name == _STATE_NAME)
+    watermark = db.execute(query.with_for_update(skip_locked=True)).scalar()
+    if watermark is None and db.execute(query).first() is None:
+        db.execute(insert(_state), [{"name": _STATE_NAME, "last_event_id": 0}])
+        db.commit()
+        watermark = db.execute(query.with_for_update(skip_locked=True)).scalar()
+    return watermark
+
+
+def roll_up(batch_size: int = ROLLUP_BATCH_SIZE) -> int:
+    """Fold pending events into the rollups; returns how many were processed."""
+    processed = 0
+    db = SessionLocal()
+    try:
+        while True:
+            watermark = _lock_state(db)
+            if watermark is None:
+                return processed        # Another worker is rolling up
+            # Stop short of the first event that is still too new, so the
+            # watermark never jumps over one (ids aren't strictly time-ordered)
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=VOTE_ROLLUP_LAG)
+            too_new = db.execute(
+                select(func.min(_events.c.id)).where(_events.c.id > watermark, _events.c.created_at >= cutoff)
+            ).scalar()
+            query = (
+                select(_events.c.id, _events.c.target_type, _events.c.target_id,
+                       _events.c.delta, _events.c.created_at)
+                .where(_events.c.id > watermark)
+                .order_by(_events.c.id)
+                .limit(batch_size)
+            )
+            if too_new is not None:
+                query = query.where(_events.c.id < too_new)
+            events = db.execute(query).all()
+            if not events:
+                db.rollback()
+                return processed
+
+            buckets: dict[tuple, list[int]] = defaultdict(lambda: [0, 0])
+            for event in events:
+                for granularity in GRANULARITIES:
+                    counts = buckets[(event.target_type, event.target_id, granularity,
+                                      bucket_start(event.created_at, granularity))]
+                    counts[0 if event.delta > 0 else 1] += abs(event.delta)
+            _upsert(db, [
+                {"target_type": t, "target_id": i, "granularity": g, "bucket_start": b,
+                 "upvotes": up, "downvotes": down}
+                for (t, i, g, b), (up, down) in buckets.items()
+            ])
+            db.execute(
+                update(_state).where(_state.c.name == _STATE_NAME)
+                .values(last_event_id=events[-1].id, updated_at=datetime.now(timezone.utc))
+            )
+            db.commit()
+            processed += len(events)
+            if len(events) < batch_size:
+                return processed
+    finally:
+        db.close()
+
+
+def compact(now: Optional[datetime] = None) -> dict[str, int]:
+    """Delete rolled-up raw events and fine buckets past their retention."""
+    now = now or datetime.now(timezone.utc)
+    removed = {}
+    db = SessionLocal()
+    try:
+        watermark = db.execute(select(_state.c.last_event_id).where(_state.c.name == _STATE_NAME)).scalar() or 0
+        cutoff = now - timedelta(days=VOTE_EVENT_RETENTION_DAYS)
+        removed["events"] = db.execute(
+            delete(_events).where(_events.c.created_at < cutoff, _events.c.id <= watermark)
+        ).rowcount
+        for granularity, keep in RETENTION.items():
+            removed[f"{granularity}_buckets"] = db.execute(
+                delete(_rollups).where(_rollups.c.granularity == granularity,
+                                       _rollups.c.bucket_start < now - keep)
+            ).rowcount
+        db.commit()
+    finally:
+        db.close()
+    return removed
+
+
+def seed_from_votes() -> int:
+    """One-off for existing installs: turn current votes into day buckets.
+
+    Votes carry no timestamp, so each target's current score lands in the day
+    it was created. Refuses to run once the log has any data.
+    """
+    db = SessionLocal()
+    try:
+        if db.execute(select(_events.c.id).limit(1)).first() or db.execute(select(_rollups.c.target_id).limit(1)).first():
+            raise RuntimeError("Vote log already has data; seeding would double count.")
+        up   = func.sum(case((_votes.c.direction > 0, _votes.c.direction), else_=0))
+        down = func.sum(case((_votes.c.direction < 0, -_votes.c.direction), else_=0))
+        rows = []
+        for model, column, target_type in ((Post, _votes.c.post_id, "post"), (Comment, _votes.c.comment_id, "comment")):
+            for target_id, created_at, ups, downs in db.execute(
+                select(column, model.created_at, up, down)
+                .join(model.__table__, model.id == column)
+                .group_by(column, model.created_at)
+            ):
+                rows.append({
+                    "target_type": target_type, "target_id": target_id, "granularity": "day",
+                    "bucket_start": bucket_start(created_at, "day"), "upvotes": ups or 0, "downvotes": downs or 0,
+                })
+        for i in range(0, len(rows), ROLLUP_BATCH_SIZE):
+            _upsert(db, rows[i:i + ROLLUP_BATCH_SIZE])
+        db.commit()
+        return len(rows)
+    finally:
+        db.close()
+
+
+# ── Reading ───────────────────────────────────────────────────────────────────
+def score_history(db, post_id: int, granularity: str, since: datetime) -> list[dict]:
+    """Buckets with activity since `since`, each with the running score at its end.
+
+    The running score starts from (all day buckets) - (buckets since `since`):
+    every event is in both, so that is the score just before the window.
+    """
+    since = bucket_start(since, granularity)
+    key = [_rollups.c.target_type == "post", _rollups.c.target_id == post_id]
+    total = db.execute(
+        select(func.coalesce(func.sum(_rollups.c.upvotes - _rollups.c.downvotes), 0))
+        .where(*key, _rollups.c.granularity == "day")
+    ).scalar()
+    rows = db.execute(
+        select(_rollups.c.bucket_start, _rollups.c.upvotes, _rollups.c.downvotes)
+        .where(*key, _rollups.c.granularity == granularity, _rollups.c.bucket_start >= since)
+        .order_by(_rollups.c.bucket_start)
+    ).all()
+    score = total - sum(r.upvotes - r.downvotes for r in rows)
+    points = []
+    for row in rows:
+        score += row.upvotes - row.downvotes
+        points.append({
+            "bucket_start": _utc(row.bucket_start),
+            "upvotes":      row.upvotes,
+            "downvotes":    row.downvotes,
+            "score":        score,
+        })
+    return points
+
+
+def rising(db, hours: int, limit: int, offset: int = 0) -> list[tuple[int, int]]:
+    """(post_id, net score gained) for the posts that gained the most in the last `hours`."""
+    since = bucket_start(datetime.now(timezone.utc) - timedelta(hours=hours), "hour")
+    net = func.sum(_rollups.c.upvotes - _rollups.c.downvotes).label("net")
+    return [
+        tuple(row) for row in db.execute(
+            select(_rollups.c.target_id, net)
+            .where(_rollups.c.target_type == "post", _rollups.c.granularity == "hour",
+                   _rollups.c.bucket_start >= since)
+            .group_by(_rollups.c.target_id)
+            .having(net > 0)
+            .order_by(net.desc(), _rollups.c.target_id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Background job
+# ---------------------------------------------------------------------------
+class RollupWorker:
+    """Rolls up every `interval` seconds and compacts about once an hour."""
+
+    def __init__(self, interval: float = VOTE_ROLLUP_INTERVAL):
+        self.interval = interval
+        self._stop    = threading.Event()
+        self._thread  = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vote-rollup", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        passes_per_compaction = max(1, int(3_600 / self.interval))
+        passes = 0
+        while not self._stop.wait(self.interval):
+            try:
+                roll_up()
+                passes += 1
+                if passes % passes_per_compaction == 0:
+                    compact()
+            except Exception:
+                logger.exception("vote rollup pass failed")
+
+
+rollup_worker = RollupWorker()
@@ -5,13 +5,34 @@ from contextlib import asynccontextmanager
 import os
 
 from backend.core.database import engine, Base
-from backend.routers import auth, users, posts, comments, votes
+from backend.core.upgrade import check_schema
+from backend.core.ratelimit import RateLimitMiddleware
+from backend.core.flight_recorder import FlightRecorderMiddleware
+from backend.core.cache_bus import bus
+from backend.core.notifications import dispatcher
+from backend.core.moderation import runner as moderation_runner
+from backend.core.vote_log import rollup_worker
+from backend.core.user_index import refresher as user_index_refresher
+from backend.routers import auth, users, posts, comments, votes, admin, pages, notifications, communities
 
 # Create all tables on startup
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
+    problem = check_schema()          # create_all never alters existing tables
+    if problem:
+        raise RuntimeError(problem)
+    bus.start()
+    dispatcher.start()
+    moderation_runner.start()
+    rollup_worker.start()
+    user_index_refresher.start()      # Loads the @mention index in the background
     yield
+    user_index_refresher.stop()
+    rollup_worker.stop()
+    moderation_runner.stop()
+    dispatcher.stop()
+    bus.stop()
 
 app = FastAPI(
     title="TrackWeave API",
@@ -20,6 +41,12 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Slow-request recorder — innermost, so it times the app rather than rejected requests
+app.add_middleware(FlightRecorderMiddleware)
+
+# Per-route token buckets + load shedding (registered before CORS so CORS wraps its 429/503s)
+app.add_middleware(RateLimitMiddleware)
+
 # Allow the frontend (served from a different port in dev) to call the API
 app.add_middleware(
     CORSMiddleware,
@@ -33,8 +60,12 @@ app.add_middleware(
 app.include_router(auth.router,     prefix="/api/auth",     tags=["Auth"])
 app.include_router(users.router,    prefix="/api/users",    tags=["Users"])
 app.include_router(posts.router,    prefix="/api/posts",    tags=["Posts"])
+app.include_router(communities.router, prefix="/api/c",     tags=["Communities"])
 app.include_router(comments.router, prefix="/api/comments", tags=["Comments"])
 app.include_router(votes.router,    prefix="/api/votes",    tags=["Votes"])
+app.include_router(pages.router,    prefix="/api/pages",    tags=["Pages"])
+app.include_router(notifications.router, prefix="/api/notifications", tags=["Notifications"])
+app.include_router(admin.router,    prefix="/api/admin",    tags=["Admin"])
 
 # Serve the frontend static files from /frontend
 frontend_dir = os.path.join(os.path.dirname(__file__), "..", "frontend")
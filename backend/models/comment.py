@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Boolean, Index
+from sqlalchemy.orm import relationship, backref
 
 from backend.core.database import Base
 
@@ -22,5 +22,13 @@ class Comment(Base):
     # Relationships
     author  = relationship("User",    back_populates="comments")
     post    = relationship("Post",    back_populates="comments")
-    replies = relationship("Comment", backref="parent", remote_side=[id])
+    replies = relationship("Comment", backref=backref("parent", remote_side=[id]),
+                           order_by="Comment.created_at")
     votes   = relationship("Vote",    back_populates="comment", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Thread pages: top-level comments of a post, oldest first, then each one's replies.
+        # Lets a page of a huge thread read only its own subtrees.
+        Index("ix_comments_thread", "post_id", "parent_id", "created_at"),
+        Index("ix_comments_parent", "parent_id"),
+    )
@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+
+from backend.core.database import Base
+
+
+class Community(Base):
+    """
+    A place posts live in — a genre, an artist or a label.
+    Posts without a community only appear in the global feed.
+    """
+    __tablename__ = "communities"
+
+    id          = Column(Integer, primary_key=True, index=True)
+    slug        = Column(String(40), unique=True, index=True, nullable=False)   # /c/{slug}
+    name        = Column(String(80), nullable=False)
+    description = Column(Text, nullable=True)
+    kind        = Column(String(10), default="genre", nullable=False)          # "genre" | "artist" | "label"
+    created_by  = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at  = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    # Relationships
+    posts = relationship("Post", back_populates="community")
@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON
+
+from backend.core.database import Base
+
+
+class ModerationJob(Base):
+    """
+    One bulk moderation run (see core/moderation.py), kept as an audit trail.
+    progress is {"posts": {"total": n, "done": k}, ...} and is committed together
+    with each chunk, so it is exact and readable from any worker; updated_at moves
+    with it and doubles as the running worker's heartbeat.
+    status: pending → running → done | failed | interrupted (failed / interrupted → pending on retry)
+    """
+    __tablename__ = "moderation_jobs"
+
+    id          = Column(Integer, primary_key=True)
+    kind        = Column(String(20), nullable=False)    # "ban_user" or "bulk"
+    action      = Column(String(20), nullable=False)    # "soft_delete" or "purge"
+    params      = Column(JSON, nullable=False)
+    status      = Column(String(20), default="pending", nullable=False)
+    progress    = Column(JSON, default=dict, nullable=False)
+    error       = Column(Text, nullable=True)
+    created_by  = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    created_at  = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at  = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
+                         onupdate=lambda: datetime.now(timezone.utc))
+    finished_at = Column(DateTime(timezone=True), nullable=True)
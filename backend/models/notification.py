@@ -0,0 +1,32 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Index
+from sqlalchemy.orm import relationship
+
+from backend.core.database import Base
+
+
+class Notification(Base):
+    """
+    One inbox entry for `user_id`, caused by `actor_id`.
+    kind: "post_reply" (comment on your post) or "comment_reply" (reply to your comment).
+    Written in batches by core/notifications.py; users.unread_notifications mirrors
+    the number of unread rows so the badge never needs a COUNT(*).
+    """
+    __tablename__ = "notifications"
+
+    id         = Column(Integer, primary_key=True)
+    user_id    = Column(Integer, ForeignKey("users.id",    ondelete="CASCADE"), nullable=False)
+    actor_id   = Column(Integer, ForeignKey("users.id",    ondelete="CASCADE"), nullable=False)
+    post_id    = Column(Integer, ForeignKey("posts.id",    ondelete="CASCADE"), nullable=False)
+    comment_id = Column(Integer, ForeignKey("comments.id", ondelete="CASCADE"), nullable=False)
+    kind       = Column(String(20), nullable=False)
+    is_read    = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    # Relationships
+    actor = relationship("User", foreign_keys=[actor_id])
+
+    __table_args__ = (
+        # Inbox paging: WHERE user_id = ? AND id < cursor ORDER BY id DESC
+        Index("ix_notifications_user_id_id", "user_id", "id"),
+    )
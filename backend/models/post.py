@@ -1,8 +1,23 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
-from sqlalchemy.orm import relationship
+from typing import Optional
+from sqlalchemy import BigInteger, Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index
+from sqlalchemy.orm import relationship, validates
 
 from backend.core.database import Base
+from backend.core.links import canonicalize
+
+EXCERPT_LENGTH = 280
+
+
+def make_excerpt(body: Optional[str]) -> Optional[str]:
+    """First ~EXCERPT_LENGTH characters of the body, whitespace collapsed, cut on a word boundary."""
+    if not body:
+        return None
+    text = " ".join(body.split())
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+    cut = text.rfind(" ", 0, EXCERPT_LENGTH)
+    return text[:cut if cut > EXCERPT_LENGTH // 2 else EXCERPT_LENGTH].rstrip() + "…"
 
 
 class Post(Base):
@@ -11,8 +26,15 @@ class Post(Base):
     id         = Column(Integer, primary_key=True, index=True)
     title      = Column(String(300), nullable=False)
     body       = Column(Text, nullable=True)          # Optional body text
-    link_url   = Column(String(2048), nullable=True)  # Optional link post
+    excerpt    = Column(String(300), nullable=True)   # Derived from body — feed listings read this instead
+    link_url   = Column(String(2048), nullable=True)  # Optional link post, as submitted
+    # Derived from link_url (core/links.py) — repost detection and "every discussion of this track"
+    link_canonical = Column(String(2048), nullable=True)
+    link_provider  = Column(String(20), nullable=True)    # "spotify", "youtube", … when recognised
+    link_item_id   = Column(String(120), nullable=True)   # "track:4uLU6hMC", "video:dQw4w9WgXcQ", …
+    link_hash      = Column(BigInteger, nullable=True)    # 64-bit hash of link_canonical
     author_id  = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    community_id = Column(Integer, ForeignKey("communities.id", ondelete="SET NULL"), nullable=True)
     is_deleted = Column(Boolean, default=False, nullable=False)
 
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
@@ -21,5 +43,29 @@ class Post(Base):
 
     # Relationships
     author   = relationship("User",    back_populates="posts")
+    community = relationship("Community", back_populates="posts")
     comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan")
     votes    = relationship("Vote",    back_populates="post", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Community feed: WHERE community_id = ? AND is_deleted = false ORDER BY created_at DESC.
+        # Each community reads only its own slice, however busy the rest of the site is.
+        Index("ix_posts_community_feed", "community_id", "is_deleted", "created_at"),
+        # Repost check / by-link listing: WHERE link_hash = ? (then link_canonical = ? to rule out collisions).
+        # An 8-byte key keeps the index small however long the URLs are.
+        Index("ix_posts_link_hash", "link_hash", "created_at"),
+    )
+
+    @validates("body")
+    def _sync_excerpt(self, key, body):
+        self.excerpt = make_excerpt(body)
+        return body
+
+    @validates("link_url")
+    def _sync_link(self, key, link_url):
+        link = canonicalize(link_url)
+        self.link_canonical = link.url      if link else None
+        self.link_provider  = link.provider if link else None
+        self.link_item_id   = link.item_id  if link else None
+        self.link_hash      = link.hash     if link else None
+        return link_url
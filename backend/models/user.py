@@ -21,6 +21,7 @@ class User(Base):
     # Account state
     is_active     = Column(Boolean, default=True, nullable=False)
     is_admin      = Column(Boolean, default=False, nullable=False)
+    unread_notifications = Column(Integer, default=0, server_default="0", nullable=False)
     created_at    = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at    = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
                            onupdate=lambda: datetime.now(timezone.utc))
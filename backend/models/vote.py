@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, SmallInteger, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, SmallInteger, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 
 from backend.core.database import Base
@@ -28,4 +28,6 @@ class Vote(Base):
         UniqueConstraint("user_id", "post_id",    name="uq_vote_user_post"),
         # One vote per (user, comment)
         UniqueConstraint("user_id", "comment_id", name="uq_vote_user_comment"),
+        # Comment scores for one page of a thread
+        Index("ix_votes_comment", "comment_id"),
     )
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, SmallInteger, String
+
+from backend.core.database import Base
+
+# BIGINT on PostgreSQL; SQLite only auto-increments INTEGER PRIMARY KEY
+_EventId = BigInteger().with_variant(Integer, "sqlite")
+
+
+class VoteEvent(Base):
+    """
+    Append-only log of score changes, one row per vote action.
+    delta is the change to the target's score: +1 / -1 for a new vote or a
+    removal, ±2 when a vote flips. Rolled into VoteRollup by core/vote_log.py,
+    then compacted away once older than the retention period.
+    No foreign keys: the log outlives (and never blocks deleting) its targets.
+    """
+    __tablename__ = "vote_events"
+
+    id          = Column(_EventId, primary_key=True)
+    target_type = Column(String(10), nullable=False)     # "post" or "comment"
+    target_id   = Column(Integer, nullable=False)
+    user_id     = Column(Integer, nullable=True)
+    delta       = Column(SmallInteger, nullable=False)
+    created_at  = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    __table_args__ = (
+        # Compaction: DELETE ... WHERE created_at < cutoff
+        Index("ix_vote_events_created_at", "created_at"),
+    )
+
+
+class VoteRollup(Base):
+    """
+    Score movement of one target in one time bucket. Every event is counted
+    in a minute, an hour and a day bucket; fine buckets are compacted after a
+    while, day buckets are kept forever (sum of a target's day buckets = its score).
+    """
+    __tablename__ = "vote_rollups"
+
+    target_type  = Column(String(10), primary_key=True)
+    target_id    = Column(Integer, primary_key=True)
+    granularity  = Column(String(6), primary_key=True)    # "minute" | "hour" | "day"
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    upvotes      = Column(Integer, default=0, nullable=False)    # Sum of positive deltas
+    downvotes    = Column(Integer, default=0, nullable=False)    # Sum of negative deltas, as a positive number
+
+    __table_args__ = (
+        # Rising: WHERE target_type = 'post' AND granularity = 'hour' AND bucket_start >= ?
+        Index("ix_vote_rollups_window", "target_type", "granularity", "bucket_start"),
+    )
+
+
+class VoteRollupState(Base):
+    """Single-row watermark: events with id <= last_event_id are in the rollups."""
+    __tablename__ = "vote_rollup_state"
+
+    name          = Column(String(20), primary_key=True)
+    last_event_id = Column(_EventId, default=0, nullable=False)
+    updated_at    = Column(DateTime(timezone=True), nullable=True)
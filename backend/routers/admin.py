@@ -0,0 +1,143 @@
+import os
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy.orm import Session
+
+from backend.core.bulk import TABLES, export_ndjson
+from backend.core.database import get_db
+from backend.core.deps import get_current_admin
+from backend.core.flight_recorder import (
+    PROFILE_MAX_SECONDS, PROFILE_MIN_INTERVAL_MS, ProfilerBusy, sampler, slow_requests,
+)
+from backend.core.moderation import deactivate_user, runner as moderation
+from backend.models.user import User
+from backend.models.moderation import ModerationJob
+from backend.schemas.admin import BanRequest, BulkModeration, ModerationJobOut, SlowRequestList
+
+router = APIRouter()
+
+
+# ── GET /api/admin/export ─────────────────────────────────────────────────────
+@router.get("/export")
+def export_content(
+    tables: str  = Query(",".join(TABLES), description="Comma-separated subset of: " + ", ".join(TABLES)),
+    _admin: User = Depends(get_current_admin),
+):
+    requested = {t.strip() for t in tables.split(",") if t.strip()}
+    unknown = requested - set(TABLES)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown tables: {', '.join(sorted(unknown))}.")
+
+    # Keep FK order regardless of how the caller listed them
+    ordered = [t for t in TABLES if t in requested]
+    return StreamingResponse(
+        export_ndjson(ordered),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="trackweave-export.ndjson"'},
+    )
+
+
+# ── GET /api/admin/slow-requests ──────────────────────────────────────────────
+@router.get("/slow-requests", response_model=SlowRequestList)
+def list_slow_requests(
+    limit:  int  = Query(50, ge=1, le=500),
+    _admin: User = Depends(get_current_admin),
+):
+    """Slowest recent requests seen by the worker that answers this call."""
+    return {"pid": os.getpid(), "items": slow_requests.entries()[:limit]}
+
+
+# ── DELETE /api/admin/slow-requests ───────────────────────────────────────────
+@router.delete("/slow-requests", status_code=204)
+def clear_slow_requests(_admin: User = Depends(get_current_admin)):
+    slow_requests.clear()
+
+
+# ── POST /api/admin/profile ───────────────────────────────────────────────────
+@router.post("/profile", response_class=PlainTextResponse)
+def profile_worker(
+    seconds:     float = Query(5, gt=0, le=PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(5, ge=PROFILE_MIN_INTERVAL_MS, le=1000),
+    _admin:      User  = Depends(get_current_admin),
+):
+    """Sample every thread of this worker for `seconds` and return collapsed stacks.
+
+    Pipe the body into flamegraph.pl or load it in speedscope.
+    """
+    try:
+        stacks, samples = sampler.run(seconds, interval_ms)
+    except ProfilerBusy:
+        raise HTTPException(status_code=409, detail="A profile is already running on this worker.")
+    return PlainTextResponse(stacks, headers={"X-Profile-Pid": str(os.getpid()), "X-Profile-Samples": str(samples)})
+
+
+# ── POST /api/admin/users/{user_id}/ban ───────────────────────────────────────
+@router.post("/users/{user_id}/ban", response_model=ModerationJobOut, status_code=202)
+def ban_user(
+    user_id: int,
+    payload: BanRequest,
+    db:      Session = Depends(get_db),
+    admin:   User    = Depends(get_current_admin),
+):
+    """Deactivate the account now; soft-delete or purge its posts, comments (and votes) in a job."""
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found.")
+    if user.is_admin:
+        raise HTTPException(status_code=400, detail="Admin accounts can't be banned.")
+
+    deactivate_user(db, user_id)
+    params = {"user_id": user_id, **payload.model_dump(mode="json")}
+    return moderation.submit(db, "ban_user", params, admin.id)
+
+
+# ── POST /api/admin/moderation ────────────────────────────────────────────────
+@router.post("/moderation", response_model=ModerationJobOut, status_code=202)
+def bulk_moderate(
+    payload: BulkModeration,
+    db:      Session = Depends(get_db),
+    admin:   User    = Depends(get_current_admin),
+):
+    return moderation.submit(db, "bulk", payload.model_dump(mode="json"), admin.id)
+
+
+# ── GET /api/admin/moderation/jobs ────────────────────────────────────────────
+@router.get("/moderation/jobs", response_model=List[ModerationJobOut])
+def list_moderation_jobs(
+    limit:  int     = Query(20, ge=1, le=100),
+    db:     Session = Depends(get_db),
+    _admin: User    = Depends(get_current_admin),
+):
+    return db.query(ModerationJob).order_by(ModerationJob.id.desc()).limit(limit).all()
+
+
+# ── GET /api/admin/moderation/jobs/{job_id} ───────────────────────────────────
+@router.get("/moderation/jobs/{job_id}", response_model=ModerationJobOut)
+def get_moderation_job(
+    job_id: int,
+    db:     Session = Depends(get_db),
+    _admin: User    = Depends(get_current_admin),
+):
+    """Poll for progress — progress is stored with each chunk, so any worker can answer."""
+    job = db.get(ModerationJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+
+# ── POST /api/admin/moderation/jobs/{job_id}/retry ────────────────────────────
+@router.post("/moderation/jobs/{job_id}/retry", response_model=ModerationJobOut, status_code=202)
+def retry_moderation_job(
+    job_id: int,
+    db:     Session = Depends(get_db),
+    _admin: User    = Depends(get_current_admin),
+):
+    """Run a failed, interrupted or abandoned job again; it picks up where the data stands."""
+    job = db.get(ModerationJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if not moderation.retry(db, job):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}; only failed or stalled jobs can be retried.")
+    return job
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from backend.core.database import get_db
+from backend.core.cache_bus import bus
 from backend.core.security import (
     hash_password, verify_password,
     create_access_token, create_refresh_token, decode_token,
@@ -29,6 +30,8 @@ def register(payload: UserRegister, db: Session = Depends(get_db)):
         display_name    = payload.display_name or payload.username,
     )
     db.add(user)
+    db.flush()
+    bus.invalidate(db, f"user:{user.id}")     # Adds them to every worker's @mention index
     db.commit()
     db.refresh(user)
     return user
@@ -1,12 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from typing import Optional
 
 from backend.core.database import get_db
+from backend.core.cache_bus import bus
+from backend.core.comment_stream import stream_thread
+from backend.core.notifications import dispatcher
+from backend.core.user_index import user_index
+from backend.core.sparse import Sparse, sparse_fieldset, author_load
 from backend.core.deps import get_current_user
 from backend.models.user import User
 from backend.models.post import Post
 from backend.models.comment import Comment
+from backend.models.vote import Vote
 from backend.schemas.comment import CommentCreate, CommentUpdate, CommentOut
 from backend.routers.posts import _optional_user
 
@@ -34,10 +42,94 @@ def _enrich_comment(comment: Comment, current_user: Optional[User]) -> dict:
     }
 
 
+def _top_level(post_id: int):
+    """Visible top-level comments of a post, in thread order."""
+    return (
+        select(Comment.id)
+        .where(Comment.post_id == post_id, Comment.parent_id.is_(None), Comment.is_deleted == False)
+        .order_by(Comment.created_at, Comment.id)
+    )
+
+
+def _thread_ids(post_id: int, skip: int = 0, limit: Optional[int] = None):
+    """Ids of one page of top-level comments and every visible reply beneath them.
+
+    The page is cut in SQL and a recursive CTE walks down from it, so a page
+    of a huge thread never reads the rest. Replies under a deleted comment
+    stay hidden.
+    """
+    roots = _top_level(post_id).offset(skip or None).limit(limit).subquery()
+    thread = select(roots.c.id).cte("thread", recursive=True)
+    thread = thread.union_all(
+        select(Comment.id)
+        .join(thread, Comment.parent_id == thread.c.id)
+        .where(Comment.is_deleted == False)
+    )
+    return select(thread.c.id)
+
+
+def _comment_tree(
+    db:           Session,
+    post_id:      int,
+    current_user: Optional[User],
+    skip:         int = 0,
+    limit:        Optional[int] = None,
+    options:      Optional[list] = None,
+) -> tuple[list[dict], bool]:
+    """One page of a thread in three queries (comments+authors, scores, viewer votes).
+
+    Returns the page's top-level comments with their replies nested, and
+    whether more top-level comments follow.
+    """
+    ids = _thread_ids(post_id, skip, limit)
+    comments = (
+        db.query(Comment)
+        .options(*(options or [author_load(Comment.author)]))
+        .filter(Comment.id.in_(ids))
+        .order_by(Comment.created_at.asc(), Comment.id.asc())
+        .all()
+    )
+    scores = dict(
+        db.query(Vote.comment_id, func.sum(Vote.direction))
+        .filter(Vote.comment_id.in_(ids))
+        .group_by(Vote.comment_id)
+    )
+    user_votes = {}
+    if current_user:
+        user_votes = dict(
+            db.query(Vote.comment_id, Vote.direction)
+            .filter(Vote.comment_id.in_(ids), Vote.user_id == current_user.id)
+        )
+
+    nodes = {
+        c.id: {
+            **c.__dict__,
+            "score":     scores.get(c.id) or 0,
+            "user_vote": user_votes.get(c.id),
+            "author":    c.author,
+            "replies":   [],
+        }
+        for c in comments
+    }
+    top_level = []
+    for c in comments:
+        if c.parent_id is None:
+            top_level.append(nodes[c.id])
+        else:
+            nodes[c.parent_id]["replies"].append(nodes[c.id])
+
+    has_more = limit is not None and db.scalar(_top_level(post_id).offset(skip + limit).limit(1)) is not None
+    return top_level, has_more
+
+
 # ── GET /api/comments/post/{post_id} ─────────────────────────────────────────
 @router.get("/post/{post_id}", response_model=list[CommentOut])
 def get_comments_for_post(
     post_id: int,
+    skip:    int           = Query(0, ge=0),
+    limit:   Optional[int] = Query(None, ge=1, le=500),
+    stream:  bool          = Query(False, description="Write the thread out as it is read (constant memory, for huge threads)"),
+    sparse:  Sparse  = Depends(sparse_fieldset(CommentOut)),
     db:      Session = Depends(get_db),
     current_user: Optional[User] = Depends(_optional_user),
 ):
@@ -45,14 +137,15 @@ def get_comments_for_post(
     if not post:
         raise HTTPException(status_code=404, detail="Post not found.")
 
+    if stream:
+        if sparse.include_authors:
+            raise HTTPException(status_code=422, detail="include=authors needs the whole thread; not available with stream.")
+        viewer_id = current_user.id if current_user else None
+        return StreamingResponse(stream_thread(post_id, viewer_id, skip, limit, sparse), media_type="application/json")
+
     # Return only top-level comments; replies are nested inside
-    top_level = (
-        db.query(Comment)
-        .filter(Comment.post_id == post_id, Comment.parent_id == None, Comment.is_deleted == False)
-        .order_by(Comment.created_at.asc())
-        .all()
-    )
-    return [_enrich_comment(c, current_user) for c in top_level]
+    top_level, _ = _comment_tree(db, post_id, current_user, skip, limit, sparse.load_options(Comment))
+    return sparse.render(top_level, CommentOut)
 
 
 # ── POST /api/comments/post/{post_id} ─────────────────────────────────────────
@@ -67,6 +160,7 @@ def create_comment(
     if not post:
         raise HTTPException(status_code=404, detail="Post not found.")
 
+    parent = None
     if payload.parent_id:
         parent = db.query(Comment).filter(Comment.id == payload.parent_id).first()
         if not parent or parent.post_id != post_id:
@@ -79,8 +173,19 @@ def create_comment(
         parent_id = payload.parent_id,
     )
     db.add(comment)
+    bus.invalidate(db, f"post:{post_id}", f"post:{post_id}:comments")
     db.commit()
     db.refresh(comment)
+    user_index.bump(current_user.id)
+
+    # Fan-out happens on the dispatcher thread; nobody is notified about their own comment
+    notified = {current_user.id}
+    if parent and parent.author_id not in notified:
+        dispatcher.enqueue(parent.author_id, current_user.id, post_id, comment.id, "comment_reply")
+        notified.add(parent.author_id)
+    if post.author_id not in notified:
+        dispatcher.enqueue(post.author_id, current_user.id, post_id, comment.id, "post_reply")
+
     return _enrich_comment(comment, current_user)
 
 
@@ -99,6 +204,7 @@ def update_comment(
         raise HTTPException(status_code=403, detail="Not authorized.")
 
     comment.body = payload.body
+    bus.invalidate(db, f"post:{comment.post_id}:comments")
     db.commit()
     db.refresh(comment)
     return _enrich_comment(comment, current_user)
@@ -118,4 +224,5 @@ def delete_comment(
         raise HTTPException(status_code=403, detail="Not authorized.")
 
     comment.is_deleted = True
+    bus.invalidate(db, f"post:{comment.post_id}", f"post:{comment.post_id}:comments")
     db.commit()
@@ -0,0 +1,127 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from backend.core.database import get_db
+from backend.core.cache_bus import bus, community_feed_key, VersionedCache
+from backend.core.deps import get_current_admin
+from backend.core.sparse import Sparse, sparse_fieldset
+from backend.models.user import User
+from backend.models.post import Post
+from backend.models.vote import Vote
+from backend.models.community import Community
+from backend.schemas.community import CommunityCreate, CommunityOut
+from backend.schemas.post import PostOut
+from backend.routers.posts import _enrich_posts, _optional_user
+
+router = APIRouter()
+
+# Ordered post ids per community page. Entries are tagged with that community's
+# own feed key, so posts and votes elsewhere never evict a niche community's pages.
+_feed_cache = VersionedCache(bus, maxsize=4_096)
+
+
+def _with_counts(db: Session, communities: list[Community]) -> list[dict]:
+    ids = [c.id for c in communities]
+    counts = dict(
+        db.query(Post.community_id, func.count(Post.id))
+        .filter(Post.community_id.in_(ids), Post.is_deleted == False)
+        .group_by(Post.community_id)
+    ) if ids else {}
+    return [{**c.__dict__, "post_count": counts.get(c.id, 0)} for c in communities]
+
+
+def _get_community(db: Session, slug: str) -> Community:
+    community = db.query(Community).filter(Community.slug == slug.lower()).first()
+    if not community:
+        raise HTTPException(status_code=404, detail="Community not found.")
+    return community
+
+
+def _ranked_ids(db: Session, community_id: int, sort: str, skip: int, limit: int) -> list[int]:
+    query = db.query(Post.id).filter(Post.community_id == community_id, Post.is_deleted == False)
+    if sort == "top":
+        query = (
+            query.outerjoin(Vote, Vote.post_id == Post.id)
+            .group_by(Post.id)
+            .order_by(func.coalesce(func.sum(Vote.direction), 0).desc(), Post.created_at.desc())
+        )
+    else:
+        query = query.order_by(Post.created_at.desc())    # Served by ix_posts_community_feed
+    return [post_id for post_id, in query.offset(skip).limit(limit)]
+
+
+# ── GET /api/c ────────────────────────────────────────────────────────────────
+@router.get("/", response_model=list[CommunityOut])
+def list_communities(
+    kind:  Optional[str] = Query(None, pattern="^(genre|artist|label)$"),
+    q:     Optional[str] = Query(None, min_length=1, max_length=80, description="Name or slug prefix"),
+    skip:  int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    db:    Session = Depends(get_db),
+):
+    query = db.query(Community)
+    if kind:
+        query = query.filter(Community.kind == kind)
+    if q:
+        pattern = q.strip().lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        query = query.filter(or_(
+            Community.slug.like(pattern, escape="\\"),
+            func.lower(Community.name).like(pattern, escape="\\"),
+        ))
+    communities = query.order_by(Community.name).offset(skip).limit(limit).all()
+    return _with_counts(db, communities)
+
+
+# ── POST /api/c ───────────────────────────────────────────────────────────────
+@router.post("/", response_model=CommunityOut, status_code=status.HTTP_201_CREATED)
+def create_community(
+    payload: CommunityCreate,
+    db:      Session = Depends(get_db),
+    admin:   User    = Depends(get_current_admin),
+):
+    if db.query(Community.id).filter(Community.slug == payload.slug).first():
+        raise HTTPException(status_code=409, detail="That community already exists.")
+    community = Community(**payload.model_dump(), created_by=admin.id)
+    db.add(community)
+    db.commit()
+    db.refresh(community)
+    return {**community.__dict__, "post_count": 0}
+
+
+# ── GET /api/c/{slug} ─────────────────────────────────────────────────────────
+@router.get("/{slug}", response_model=CommunityOut)
+def get_community(slug: str, db: Session = Depends(get_db)):
+    return _with_counts(db, [_get_community(db, slug)])[0]
+
+
+# ── GET /api/c/{slug}/posts ───────────────────────────────────────────────────
+@router.get("/{slug}/posts", response_model=list[PostOut])
+def community_posts(
+    slug:   str,
+    skip:   int = Query(0, ge=0),
+    limit:  int = Query(20, ge=1, le=100),
+    sort:   str = Query("new", pattern="^(new|top)$"),
+    sparse: Sparse = Depends(sparse_fieldset(PostOut)),
+    db:     Session = Depends(get_db),
+    current_user: Optional[User] = Depends(_optional_user),
+):
+    community_id = db.query(Community.id).filter(Community.slug == slug.lower()).scalar()
+    if community_id is None:
+        raise HTTPException(status_code=404, detail="Community not found.")
+
+    page_key = f"{community_id}:{sort}:{skip}:{limit}"
+    ids = _feed_cache.get(page_key)
+    if ids is None:
+        token = _feed_cache.token()
+        ids = _ranked_ids(db, community_id, sort, skip, limit)
+        _feed_cache.set(page_key, ids, [community_feed_key(community_id)], token)
+
+    posts = {
+        p.id: p
+        for p in db.query(Post).options(*sparse.load_options(Post))
+        .filter(Post.id.in_(ids), Post.is_deleted == False)
+    }
+    ordered = [posts[i] for i in ids if i in posts]
+    return sparse.render(_enrich_posts(db, ordered, current_user), PostOut)
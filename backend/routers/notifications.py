@@ -0,0 +1,97 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from backend.core.cache_bus import bus, VersionedCache
+from backend.core.database import get_db
+from backend.core.deps import get_current_user, get_token_user_id
+from backend.core.notifications import adjust_unread, unread_key
+from backend.core.sparse import author_load
+from backend.models.user import User
+from backend.models.notification import Notification
+from backend.schemas.notification import NotificationMarkRead, NotificationPage, UnreadCount
+
+router = APIRouter()
+
+# (is_active, unread) per user id — polled from every page, so usually served without the DB
+_unread_cache = VersionedCache(bus, maxsize=50_000)
+
+
+# ── GET /api/notifications ────────────────────────────────────────────────────
+@router.get("/", response_model=NotificationPage)
+def list_notifications(
+    cursor:      Optional[int] = Query(None, description="next_cursor from the previous page"),
+    limit:       int           = Query(20, ge=1, le=100),
+    unread_only: bool          = False,
+    db:          Session = Depends(get_db),
+    current_user: User   = Depends(get_current_user),
+):
+    query = (
+        db.query(Notification)
+        .options(author_load(Notification.actor))
+        .filter(Notification.user_id == current_user.id)
+    )
+    if cursor is not None:
+        query = query.filter(Notification.id < cursor)
+    if unread_only:
+        query = query.filter(Notification.is_read == False)
+
+    items = query.order_by(Notification.id.desc()).limit(limit + 1).all()
+    has_more = len(items) > limit
+    items = items[:limit]
+    return {"items": items, "next_cursor": items[-1].id if has_more else None}
+
+
+# ── GET /api/notifications/unread-count ───────────────────────────────────────
+@router.get("/unread-count", response_model=UnreadCount)
+def unread_count(
+    user_id: int     = Depends(get_token_user_id),
+    db:      Session = Depends(get_db),
+):
+    key = unread_key(user_id)
+    cached = _unread_cache.get(key)
+    if cached is None:
+        token = _unread_cache.token()
+        cached = (
+            db.query(User.is_active, User.unread_notifications)
+            .filter(User.id == user_id)
+            .first()
+        )
+        if cached is not None:
+            cached = tuple(cached)
+            _unread_cache.set(key, cached, [key, f"user:{user_id}"], token)
+
+    if cached is None or not cached[0]:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return {"unread": cached[1]}
+
+
+# ── POST /api/notifications/read ──────────────────────────────────────────────
+@router.post("/read", response_model=UnreadCount)
+def mark_read(
+    payload:      NotificationMarkRead,
+    db:           Session = Depends(get_db),
+    current_user: User    = Depends(get_current_user),
+):
+    if not payload.all and not payload.ids:
+        raise HTTPException(status_code=422, detail="Provide ids or set all=true.")
+
+    stmt = (
+        update(Notification)
+        .where(Notification.user_id == current_user.id, Notification.is_read == False)
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    if not payload.all:
+        stmt = stmt.where(Notification.id.in_(payload.ids))
+
+    changed = db.execute(stmt).rowcount
+    adjust_unread(db, {current_user.id: -changed})
+    db.commit()
+    db.refresh(current_user)
+    return {"unread": current_user.unread_notifications}
@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, defer
+from typing import Optional
+
+from backend.core.database import get_db
+from backend.core.sparse import author_load
+from backend.models.user import User
+from backend.models.post import Post
+from backend.schemas.page import PostPage, FeedPage, ProfilePage
+from backend.routers.posts import _enrich_posts, _optional_user
+from backend.routers.comments import _comment_tree
+
+router = APIRouter()
+
+# Every handler here shares one session (FastAPI caches get_db per request,
+# so _optional_user resolves the viewer on the same connection) and batches
+# its reads, so a page view costs one auth decode and one pool checkout.
+
+
+# ── GET /api/pages/post/{post_id} ─────────────────────────────────────────────
+@router.get("/post/{post_id}", response_model=PostPage)
+def post_page(
+    post_id:       int,
+    comment_limit: int = Query(50, ge=1, le=500),
+    db:            Session = Depends(get_db),
+    current_user:  Optional[User] = Depends(_optional_user),
+):
+    post = (
+        db.query(Post)
+        .options(author_load(Post.author))
+        .filter(Post.id == post_id, Post.is_deleted == False)
+        .first()
+    )
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found.")
+
+    comments, has_more = _comment_tree(db, post_id, current_user, limit=comment_limit)
+    return {
+        "viewer":            current_user,
+        "post":              _enrich_posts(db, [post], current_user)[0],
+        "comments":          comments,
+        "has_more_comments": has_more,
+    }
+
+
+# ── GET /api/pages/feed ───────────────────────────────────────────────────────
+@router.get("/feed", response_model=FeedPage)
+def feed_page(
+    skip:  int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    sort:  str = Query("new", pattern="^(new|top)$"),
+    db:    Session = Depends(get_db),
+    current_user: Optional[User] = Depends(_optional_user),
+):
+    # Listings render excerpts, so bodies stay in the database
+    posts = (
+        db.query(Post)
+        .options(defer(Post.body), author_load(Post.author))
+        .filter(Post.is_deleted == False)
+        .order_by(Post.created_at.desc())
+        .offset(skip).limit(limit)
+        .all()
+    )
+    enriched = _enrich_posts(db, posts, current_user)
+    if sort == "top":
+        enriched.sort(key=lambda p: p["score"], reverse=True)
+    return {"viewer": current_user, "posts": enriched}
+
+
+# ── GET /api/pages/profile/{username} ─────────────────────────────────────────
+@router.get("/profile/{username}", response_model=ProfilePage)
+def profile_page(
+    username: str,
+    skip:     int = Query(0, ge=0),
+    limit:    int = Query(20, ge=1, le=100),
+    db:       Session = Depends(get_db),
+    current_user: Optional[User] = Depends(_optional_user),
+):
+    user = db.query(User).filter(User.username == username.lower()).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found.")
+
+    posts = (
+        db.query(Post)
+        .options(defer(Post.body))
+        .filter(Post.author_id == user.id, Post.is_deleted == False)
+        .order_by(Post.created_at.desc())
+        .offset(skip).limit(limit)
+        .all()
+    )
+    # Post.author resolves from the identity map — `user` is already loaded
+    return {"viewer": current_user, "user": user, "posts": _enrich_posts(db, posts, current_user)}
@@ -1,16 +1,24 @@
+from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Literal, Optional
 
 from backend.core.database import get_db
+from backend.core.links import canonicalize
+from backend.core.cache_bus import bus, community_feed_key
+from backend.core.sparse import Sparse, sparse_fieldset
+from backend.core.user_index import user_index
+from backend.core.vote_log import RETENTION, rising, score_history
 from backend.core.deps import get_current_user
 from backend.core.security import decode_token
 from backend.models.user import User
 from backend.models.post import Post
 from backend.models.comment import Comment
 from backend.models.vote import Vote
-from backend.schemas.post import PostCreate, PostUpdate, PostOut
+from backend.models.community import Community
+from backend.schemas.post import PostCreate, PostCreated, PostUpdate, PostOut, ScoreHistory
 
 router = APIRouter()
 
@@ -49,26 +57,105 @@ def _enrich_post(post: Post, current_user: Optional[User]) -> dict:
     }
 
 
+def _enrich_posts(db: Session, posts: list[Post], current_user: Optional[User]) -> list[dict]:
+    """Batched _enrich_post: three grouped queries for the whole page instead of lazy loads per post."""
+    ids = [p.id for p in posts]
+    if not ids:
+        return []
+    scores = dict(
+        db.query(Vote.post_id, func.sum(Vote.direction))
+        .filter(Vote.post_id.in_(ids))
+        .group_by(Vote.post_id)
+    )
+    counts = dict(
+        db.query(Comment.post_id, func.count(Comment.id))
+        .filter(Comment.post_id.in_(ids), Comment.is_deleted == False)
+        .group_by(Comment.post_id)
+    )
+    user_votes = {}
+    if current_user:
+        user_votes = dict(
+            db.query(Vote.post_id, Vote.direction)
+            .filter(Vote.user_id == current_user.id, Vote.post_id.in_(ids))
+        )
+    return [
+        {
+            **p.__dict__,
+            "score":         scores.get(p.id) or 0,
+            "comment_count": counts.get(p.id, 0),
+            "user_vote":     user_votes.get(p.id),
+            "author":        p.author,
+        }
+        for p in posts
+    ]
+
+
 # ── GET /api/posts — feed ──────────────────────────────────────────────────
 @router.get("/", response_model=list[PostOut])
 def list_posts(
     skip:  int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     sort:  str = Query("new", pattern="^(new|top)$"),
+    sparse: Sparse = Depends(sparse_fieldset(PostOut)),
     db:    Session = Depends(get_db),
     current_user: Optional[User] = Depends(_optional_user),
 ):
-    query = db.query(Post).filter(Post.is_deleted == False)
+    query = db.query(Post).options(*sparse.load_options(Post)).filter(Post.is_deleted == False)
     posts = query.order_by(Post.created_at.desc()).offset(skip).limit(limit).all()
 
+    enriched = _enrich_posts(db, posts, current_user)
     if sort == "top":
-        posts.sort(key=lambda p: sum(v.direction for v in p.votes), reverse=True)
+        enriched.sort(key=lambda p: p["score"], reverse=True)
+    return sparse.render(enriched, PostOut)
+
+
+# ── GET /api/posts/rising ──────────────────────────────────────────────────
+@router.get("/rising", response_model=list[PostOut])
+def list_rising(
+    hours:  int = Query(6, ge=1, le=72, description="Look-back window"),
+    skip:   int = Query(0, ge=0),
+    limit:  int = Query(20, ge=1, le=100),
+    sparse: Sparse = Depends(sparse_fieldset(PostOut)),
+    db:     Session = Depends(get_db),
+    current_user: Optional[User] = Depends(_optional_user),
+):
+    """Posts gaining the most score in the last `hours`, ranked from the hourly vote rollups."""
+    ranked = rising(db, hours, limit, skip)
+    posts = {
+        p.id: p
+        for p in db.query(Post).options(*sparse.load_options(Post))
+        .filter(Post.id.in_([post_id for post_id, _ in ranked]), Post.is_deleted == False)
+    }
+    ordered = [posts[post_id] for post_id, _ in ranked if post_id in posts]
+    return sparse.render(_enrich_posts(db, ordered, current_user), PostOut)
+
 
-    return [_enrich_post(p, current_user) for p in posts]
+# ── GET /api/posts/by-link ─────────────────────────────────────────────────
+@router.get("/by-link", response_model=list[PostOut])
+def list_by_link(
+    url:    str = Query(..., max_length=2048, description="Any spelling of the link — it is canonicalized"),
+    skip:   int = Query(0, ge=0),
+    limit:  int = Query(20, ge=1, le=100),
+    sparse: Sparse = Depends(sparse_fieldset(PostOut)),
+    db:     Session = Depends(get_db),
+    current_user: Optional[User] = Depends(_optional_user),
+):
+    """Every discussion of the same track / page, newest first."""
+    link = canonicalize(url)
+    if link is None:
+        raise HTTPException(status_code=422, detail="Not a valid http(s) link.")
+    posts = (
+        db.query(Post).options(*sparse.load_options(Post))
+        .filter(Post.link_hash == link.hash, Post.link_canonical == link.url, Post.is_deleted == False)
+        .order_by(Post.created_at.desc())
+        .offset(skip).limit(limit)
+        .all()
+    )
+    return sparse.render(_enrich_posts(db, posts, current_user), PostOut)
 
 
 # ── POST /api/posts ────────────────────────────────────────────────────────
-@router.post("/", response_model=PostOut, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=PostCreated, status_code=status.HTTP_201_CREATED)
 def create_post(
     payload:      PostCreate,
     db:           Session = Depends(get_db),
@@ -77,16 +164,44 @@ def create_post(
     if not payload.body and not payload.link_url:
         raise HTTPException(status_code=422, detail="Post must have either a body or a link URL.")
 
+    community_id = None
+    if payload.community:
+        community_id = db.query(Community.id).filter(Community.slug == payload.community.lower()).scalar()
+        if community_id is None:
+            raise HTTPException(status_code=422, detail="Unknown community.")
+
+    earlier = []
+    link = canonicalize(payload.link_url)
+    if link is not None:
+        # One index probe on the 8-byte hash; the string compare only rules out collisions
+        earlier = [
+            post_id for post_id, in db.query(Post.id)
+            .filter(Post.link_hash == link.hash, Post.link_canonical == link.url, Post.is_deleted == False)
+            .order_by(Post.created_at.desc())
+            .limit(5)
+        ]
+        if earlier and payload.reject_duplicate:
+            raise HTTPException(
+                status_code=409,
+                detail="This link has already been posted.",
+                headers={"X-Duplicate-Of": ",".join(map(str, earlier))},
+            )
+
     post = Post(
-        title     = payload.title,
-        body      = payload.body,
-        link_url  = payload.link_url,
-        author_id = current_user.id,
+        title        = payload.title,
+        body         = payload.body,
+        link_url     = payload.link_url,
+        author_id    = current_user.id,
+        community_id = community_id,
     )
     db.add(post)
+    bus.invalidate(db, "feed")
+    if community_id is not None:
+        bus.invalidate(db, community_feed_key(community_id))
     db.commit()
     db.refresh(post)
-    return _enrich_post(post, current_user)
+    user_index.bump(current_user.id)
+    return {**_enrich_post(post, current_user), "duplicate_of": earlier}
 
 
 # ── GET /api/posts/{post_id} ───────────────────────────────────────────────
@@ -102,6 +217,30 @@ def get_post(
     return _enrich_post(post, current_user)
 
 
+# ── GET /api/posts/{post_id}/score-history ─────────────────────────────────
+@router.get("/{post_id}/score-history", response_model=ScoreHistory)
+def get_score_history(
+    post_id:     int,
+    granularity: Literal["minute", "hour", "day"] = "hour",
+    since:       Optional[datetime] = Query(None, description="Default: 6 h / 7 days / 90 days back"),
+    db:          Session = Depends(get_db),
+):
+    if not db.query(Post.id).filter(Post.id == post_id, Post.is_deleted == False).first():
+        raise HTTPException(status_code=404, detail="Post not found.")
+
+    now = datetime.now(timezone.utc)
+    if since is None:
+        since = now - {"minute": timedelta(hours=6), "hour": timedelta(days=7), "day": timedelta(days=90)}[granularity]
+    elif since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if granularity in RETENTION and since < now - RETENTION[granularity]:
+        raise HTTPException(
+            status_code=422,
+            detail=f"{granularity} buckets are kept for {RETENTION[granularity].days} days; use a coarser granularity.",
+        )
+    return {"post_id": post_id, "granularity": granularity, "points": score_history(db, post_id, granularity, since)}
+
+
 # ── PATCH /api/posts/{post_id} ─────────────────────────────────────────────
 @router.patch("/{post_id}", response_model=PostOut)
 def update_post(
@@ -121,6 +260,7 @@ def update_post(
     if payload.body is not None:
         post.body = payload.body
 
+    bus.invalidate(db, "feed", f"post:{post.id}")
     db.commit()
     db.refresh(post)
     return _enrich_post(post, current_user)
@@ -140,4 +280,7 @@ def delete_post(
         raise HTTPException(status_code=403, detail="Not authorized.")
 
     post.is_deleted = True
+    bus.invalidate(db, "feed", f"post:{post.id}", f"post:{post.id}:comments")
+    if post.community_id is not None:
+        bus.invalidate(db, community_feed_key(post.community_id))
     db.commit()
@@ -1,21 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, status
 from sqlalchemy.orm import Session
 from typing import Optional
 import base64, imghdr
 
 from backend.core.database import get_db
+from backend.core.cache_bus import bus
+from backend.core.sparse import Sparse, sparse_fieldset
+from backend.core.user_index import user_index
 from backend.core.deps import get_current_user
 from backend.models.user import User
 from backend.models.post import Post
-from backend.schemas.user import UserPublic, UserPrivate, UserProfileUpdate
+from backend.schemas.user import UserPublic, UserPrivate, UserProfileUpdate, UserSuggestion
 from backend.schemas.post import PostOut
-from backend.routers.posts import _enrich_post, _optional_user
+from backend.routers.posts import _enrich_posts, _optional_user
 
 router = APIRouter()
 
 MAX_AVATAR_BYTES = 2 * 1024 * 1024   # 2 MB
 
 
+# ── GET /api/users/suggest ────────────────────────────────────────────────────
+# Declared before /{username} so "suggest" isn't taken for a username
+@router.get("/suggest", response_model=list[UserSuggestion])
+def suggest_users(
+    q:     str = Query(..., min_length=1, max_length=60),
+    limit: int = Query(8, ge=1, le=20),
+    db:    Session = Depends(get_db),
+):
+    if user_index.ready:
+        return [
+            {"id": i, "username": u, "display_name": d}
+            for i, u, d in user_index.suggest(q, limit)
+        ]
+
+    # Index still loading (first seconds after startup) — plain prefix query
+    pattern = q.strip().lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    return (
+        db.query(User.id, User.username, User.display_name)
+        .filter(User.username.like(pattern, escape="\\"), User.is_active == True)
+        .order_by(User.username)
+        .limit(limit)
+        .all()
+    )
+
+
 # ── GET /api/users/{username} ─────────────────────────────────────────────────
 @router.get("/{username}", response_model=UserPublic)
 def get_profile(username: str, db: Session = Depends(get_db)):
@@ -39,6 +67,7 @@ def update_profile(
     if payload.avatar_url is not None:
         current_user.avatar_url = payload.avatar_url
 
+    bus.invalidate(db, f"user:{current_user.id}")
     db.commit()
     db.refresh(current_user)
     return current_user
@@ -61,6 +90,7 @@ async def upload_avatar(
 
     data_uri = f"data:image/{fmt};base64,{base64.b64encode(content).decode()}"
     current_user.avatar_url = data_uri
+    bus.invalidate(db, f"user:{current_user.id}")
     db.commit()
     db.refresh(current_user)
     return current_user
@@ -72,6 +102,7 @@ def user_posts(
     username: str,
     skip: int = 0,
     limit: int = 20,
+    sparse: Sparse = Depends(sparse_fieldset(PostOut)),
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(_optional_user),
 ):
@@ -81,9 +112,10 @@ def user_posts(
 
     posts = (
         db.query(Post)
+        .options(*sparse.load_options(Post))
         .filter(Post.author_id == user.id, Post.is_deleted == False)
         .order_by(Post.created_at.desc())
         .offset(skip).limit(limit)
         .all()
     )
-    return [_enrich_post(p, current_user) for p in posts]
+    return sparse.render(_enrich_posts(db, posts, current_user), PostOut)
@@ -2,7 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from backend.core.database import get_db
+from backend.core.cache_bus import bus, community_feed_key
 from backend.core.deps import get_current_user
+from backend.core.vote_log import record_vote
 from backend.models.user import User
 from backend.models.post import Post
 from backend.models.comment import Comment
@@ -45,13 +47,24 @@ def cast_vote(
             .first()
         )
 
+    if payload.post_id:
+        bus.invalidate(db, f"post:{payload.post_id}")
+        if target.community_id is not None:
+            bus.invalidate(db, community_feed_key(target.community_id))   # Its "top" ranking
+    else:
+        bus.invalidate(db, f"post:{target.post_id}:comments")
+
+    target_type, target_id = ("post", payload.post_id) if payload.post_id else ("comment", payload.comment_id)
+
     # direction=0 means remove the vote
     if payload.direction == 0:
         if existing:
+            record_vote(db, target_type, target_id, current_user.id, -existing.direction)
             db.delete(existing)
             db.commit()
         message = "Vote removed."
     elif existing:
+        record_vote(db, target_type, target_id, current_user.id, payload.direction - existing.direction)
         existing.direction = payload.direction
         db.commit()
         message = "Vote updated."
@@ -63,6 +76,7 @@ def cast_vote(
             direction  = payload.direction,
         )
         db.add(new_vote)
+        record_vote(db, target_type, target_id, current_user.id, payload.direction)
         db.commit()
         message = "Vote cast."
 
@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import Optional, List, Any, Literal
+from pydantic import BaseModel, Field, model_validator
+
+
+# ── Request schemas ───────────────────────────────────────────────────────────
+
+class BanRequest(BaseModel):
+    action: Literal["soft_delete", "purge"] = "soft_delete"
+    votes:  bool                            = True    # Also delete every vote the user cast
+
+
+class BulkModeration(BaseModel):
+    """Posts and/or comments matching every given criterion."""
+    action:         Literal["soft_delete", "purge"]        = "soft_delete"
+    targets:        List[Literal["posts", "comments"]]     = Field(["posts", "comments"], min_length=1)
+    ids:            Optional[List[int]]                    = Field(None, max_length=10_000)
+    author_id:      Optional[int]                          = None
+    created_after:  Optional[datetime]                     = None
+    created_before: Optional[datetime]                     = None
+
+    @model_validator(mode="after")
+    def _check_scope(self):
+        if self.ids is None and self.author_id is None and self.created_after is None and self.created_before is None:
+            raise ValueError("Give ids, author_id or a created_after / created_before range.")
+        if self.ids is not None and len(set(self.targets)) != 1:
+            raise ValueError("ids need a single target (posts or comments).")
+        return self
+
+
+# ── Response schemas ──────────────────────────────────────────────────────────
+
+class ModerationJobOut(BaseModel):
+    id:          int
+    kind:        str                  # "ban_user" or "bulk"
+    action:      str
+    params:      dict[str, Any]
+    status:      Literal["pending", "running", "done", "failed", "interrupted"]
+    progress:    dict[str, dict[str, int]]    # table -> {"total": n, "done": k}
+    error:       Optional[str]
+    created_by:  Optional[int]
+    created_at:  datetime
+    finished_at: Optional[datetime]
+
+    model_config = {"from_attributes": True}
+
+
+class SlowStatement(BaseModel):
+    offset_ms:   float      # Since the request started
+    duration_ms: float
+    statement:   str
+    params:      Optional[str]
+
+
+class SlowRequest(BaseModel):
+    at:             datetime
+    method:         str
+    path:           str
+    route:          Optional[str]      # Route template, e.g. /api/posts/{post_id}
+    path_params:    dict[str, Any]
+    query:          str
+    status:         Optional[int]      # None if the app raised before responding
+    duration_ms:    float
+    sql_ms:         float
+    pool_wait_ms:   float
+    response_bytes: int
+    sql:            List[SlowStatement]
+    sql_dropped:    int                # Statements past the per-request cap
+
+
+class SlowRequestList(BaseModel):
+    pid:   int                         # Each worker keeps its own log
+    items: List[SlowRequest]
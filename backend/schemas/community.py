@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Optional, Literal
+from pydantic import BaseModel, Field
+
+
+# ── Request schemas ───────────────────────────────────────────────────────────
+
+class CommunityCreate(BaseModel):
+    slug:        str           = Field(..., pattern=r"^[a-z0-9][a-z0-9_-]{1,39}$")
+    name:        str           = Field(..., min_length=1, max_length=80)
+    description: Optional[str] = Field(None, max_length=2_000)
+    kind:        Literal["genre", "artist", "label"] = "genre"
+
+
+# ── Response schemas ──────────────────────────────────────────────────────────
+
+class CommunityOut(BaseModel):
+    id:          int
+    slug:        str
+    name:        str
+    description: Optional[str]
+    kind:        str
+    post_count:  int            # computed
+    created_at:  datetime
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import Optional, List, Literal
+from pydantic import BaseModel, Field
+
+from backend.schemas.user import UserPublic
+
+
+# ── Request schemas ───────────────────────────────────────────────────────────
+
+class NotificationMarkRead(BaseModel):
+    ids: Optional[List[int]] = Field(None, max_length=1000)   # Specific notifications…
+    all: bool                = False                          # …or the whole inbox
+
+
+# ── Response schemas ──────────────────────────────────────────────────────────
+
+class NotificationOut(BaseModel):
+    id:         int
+    kind:       Literal["post_reply", "comment_reply"]
+    actor:      UserPublic
+    post_id:    int
+    comment_id: int
+    is_read:    bool
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class NotificationPage(BaseModel):
+    items:       List[NotificationOut]
+    next_cursor: Optional[int]   # Pass as ?cursor= for the next (older) page
+
+
+class UnreadCount(BaseModel):
+    unread: int
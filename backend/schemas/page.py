@@ -0,0 +1,26 @@
+from typing import Optional, List
+from pydantic import BaseModel
+
+from backend.schemas.user import UserPublic, UserPrivate
+from backend.schemas.post import PostOut
+from backend.schemas.comment import CommentOut
+
+
+# ── Page bundles: everything one HTML page needs in a single response ─────────
+
+class PostPage(BaseModel):
+    viewer:            Optional[UserPrivate]   # None for anonymous visitors
+    post:              PostOut
+    comments:          List[CommentOut]        # First page of top-level comments, replies nested
+    has_more_comments: bool
+
+
+class FeedPage(BaseModel):
+    viewer: Optional[UserPrivate]
+    posts:  List[PostOut]
+
+
+class ProfilePage(BaseModel):
+    viewer: Optional[UserPrivate]
+    user:   UserPublic
+    posts:  List[PostOut]
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List, Literal
 from pydantic import BaseModel, Field
 
 from backend.schemas.user import UserPublic
@@ -11,6 +11,8 @@ class PostCreate(BaseModel):
     title:    str            = Field(..., min_length=1, max_length=300)
     body:     Optional[str]  = Field(None, max_length=40_000)
     link_url: Optional[str]  = Field(None, max_length=2048)
+    community: Optional[str] = Field(None, max_length=40)   # Community slug; None = global only
+    reject_duplicate: bool   = False   # 409 instead of posting when the link is already being discussed
 
 
 class PostUpdate(BaseModel):
@@ -23,9 +25,12 @@ class PostUpdate(BaseModel):
 class PostOut(BaseModel):
     id:            int
     title:         str
-    body:          Optional[str]
+    body:          Optional[str] = None   # Omitted from listings that only ask for excerpt
+    excerpt:       Optional[str] = None   # Server-generated from body
     link_url:      Optional[str]
+    link_provider: Optional[str] = None   # Recognised music provider of link_url, if any
     author:        UserPublic
+    community_id:  Optional[int] = None
     score:         int          # computed: sum of vote directions
     comment_count: int          # computed
     user_vote:     Optional[int] = None   # +1, -1, or None if not authenticated
@@ -33,3 +38,20 @@ class PostOut(BaseModel):
     updated_at:    datetime
 
     model_config = {"from_attributes": True}
+
+
+class PostCreated(PostOut):
+    duplicate_of: List[int] = []      # Newest earlier posts of the same link (repost warning)
+
+
+class ScorePoint(BaseModel):
+    bucket_start: datetime
+    upvotes:      int
+    downvotes:    int
+    score:        int           # Running score at the end of the bucket
+
+
+class ScoreHistory(BaseModel):
+    post_id:     int
+    granularity: Literal["minute", "hour", "day"]
+    points:      List[ScorePoint]   # Only buckets with activity, oldest first
@@ -58,10 +58,18 @@ class UserPrivate(UserPublic):
     """Extended info returned only to the authenticated user themselves."""
     email:    str
     is_admin: bool
+    unread_notifications: int = 0
 
     model_config = {"from_attributes": True}
 
 
+class UserSuggestion(BaseModel):
+    """Autocomplete entry — served from the in-memory prefix index."""
+    id:           int
+    username:     str
+    display_name: Optional[str]
+
+
 # ── Token schemas ─────────────────────────────────────────────────────────────
 
 class Token(BaseModel):
@@ -0,0 +1,172 @@
+"""
+Peak memory and time-to-first-byte of GET /api/comments/post/{id}, buffered vs ?stream=true.
+
+    python -m benchmarks.comment_stream [--comments 50000] [--db sqlite:////tmp/tw_bench_comments.db]
+
+Seeds one post with a large nested thread (once; reused while the count
+matches), then runs each handler in a fresh subprocess so the peak RSS
+numbers don't contaminate each other. The request goes straight through
+the ASGI app (no HTTP server needed); TTFB is the first non-empty body
+chunk. Both responses are checked to decode to the same JSON.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+BENCH_POST_TITLE = "comment-stream benchmark"
+
+
+def seed(n_comments: int, users: int = 500, seed: int = 11) -> int:
+    from sqlalchemy import func, select
+
+    from backend.core.database import Base, engine
+    from backend.models.user import User
+    from backend.models.community import Community  # noqa: F401 — posts.community_id points here
+    from backend.models.post import Post
+    from backend.models.comment import Comment
+    from backend.models.vote import Vote
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        post_id = conn.scalar(select(Post.id).where(Post.title == BENCH_POST_TITLE))
+        if post_id and conn.scalar(select(func.count()).where(Comment.post_id == post_id)) == n_comments:
+            return post_id
+
+    rng = random.Random(seed)
+    start = datetime.now(timezone.utc) - timedelta(days=30)
+    with engine.begin() as conn:
+        first_user = (conn.scalar(select(func.max(User.id))) or 0) + 1
+        conn.execute(User.__table__.insert(), [
+            {"id": first_user + i, "username": f"bench{first_user + i}", "email": f"bench{first_user + i}@example.com",
+             "hashed_password": "x", "display_name": f"Bench {i}", "created_at": start}
+            for i in range(users)
+        ])
+        post_id = conn.execute(Post.__table__.insert().values(
+            title=BENCH_POST_TITLE, body="…", author_id=first_user, created_at=start, updated_at=start,
+        )).inserted_primary_key[0]
+
+        # ~20% top-level; replies mostly go to recent comments, which makes deep chains
+        first_comment = (conn.scalar(select(func.max(Comment.id))) or 0) + 1
+        rows, votes = [], []
+        for i in range(n_comments):
+            cid = first_comment + i
+            parent = None
+            if i and rng.random() > 0.2:
+                parent = first_comment + max(0, i - 1 - int(rng.expovariate(1 / 20)))
+            at = start + timedelta(seconds=i * 30)
+            rows.append({
+                "id": cid, "post_id": post_id, "parent_id": parent, "author_id": first_user + rng.randrange(users),
+                "body": " ".join(rng.choice(("great", "track", "the bassline", "on repeat", "live version", "🔥"))
+                                 for _ in range(rng.randint(5, 40))),
+                "is_deleted": rng.random() < 0.01, "created_at": at, "updated_at": at,
+            })
+            for u in rng.sample(range(users), rng.choice((0, 0, 1, 3))):
+                votes.append({"user_id": first_user + u, "comment_id": cid, "direction": rng.choice((1, 1, -1))})
+            if len(rows) >= 5_000:
+                conn.execute(Comment.__table__.insert(), rows)
+                rows.clear()
+        if rows:
+            conn.execute(Comment.__table__.insert(), rows)
+        for i in range(0, len(votes), 5_000):
+            conn.execute(Vote.__table__.insert(), votes[i:i + 5_000])
+    return post_id
+
+
+async def _request(app, path: str, query: str, out) -> tuple[float, float, int]:
+    """Drive one GET through the ASGI app. Returns (ttfb_s, total_s, bytes)."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    sent = False
+    first = None
+    size = 0
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()    # The client never disconnects
+
+    async def send(message):
+        nonlocal first, size
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+        elif message["type"] == "http.response.body" and message.get("body"):
+            if first is None:
+                first = time.perf_counter()
+            size += len(message["body"])
+            out.write(message["body"])
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return first - start, time.perf_counter() - start, size
+
+
+def measure(mode: str, post_id: int, body_path: str) -> dict:
+    from backend.main import app
+
+    path = f"/api/comments/post/{post_id}"
+    stream = "&stream=true" if mode == "stream" else ""
+    with open(os.devnull, "wb") as sink:     # Warm up imports, mappers and statement caches
+        asyncio.run(_request(app, path, "limit=1" + stream, sink))
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss    # KiB on Linux
+    with open(body_path, "wb") as out:
+        ttfb, total, size = asyncio.run(_request(app, path, stream.lstrip("&"), out))
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"mode": mode, "ttfb": ttfb, "total": total, "bytes": size,
+            "baseline_kib": baseline, "peak_growth_kib": peak - baseline}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--comments", type=int, default=50_000)
+    parser.add_argument("--db", default=os.getenv("DATABASE_URL", "sqlite:////tmp/tw_bench_comments.db"))
+    parser.add_argument("--measure", choices=("buffered", "stream"), help=argparse.SUPPRESS)
+    parser.add_argument("--post-id", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--body", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.db
+    os.environ["RATE_LIMIT_ENABLED"] = "0"
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.post_id, args.body)))
+        return
+
+    t = time.perf_counter()
+    post_id = seed(args.comments)
+    print(f"thread             {args.comments:,} comments (post {post_id}, ready in {time.perf_counter() - t:.1f} s)")
+    print(f"database           {args.db.split('@')[-1]}")
+
+    results, bodies = {}, {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("buffered", "stream"):
+            bodies[mode] = os.path.join(tmp, f"{mode}.json")
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.comment_stream", "--db", args.db,
+                 "--measure", mode, "--post-id", str(post_id), "--body", bodies[mode]],
+                capture_output=True, text=True, check=True, env=os.environ,
+            )
+            results[mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+        with open(bodies["buffered"]) as a, open(bodies["stream"]) as b:
+            same = json.dumps(json.load(a), sort_keys=True) == json.dumps(json.load(b), sort_keys=True)
+
+    print(f"{'':18} {'TTFB':>10} {'total':>10} {'body':>10} {'peak RSS growth':>16}")
+    for mode, r in results.items():
+        print(f"{mode:18} {r['ttfb'] * 1000:8.0f} ms {r['total'] * 1000:7.0f} ms "
+              f"{r['bytes'] / 2**20:6.1f} MiB {r['peak_growth_kib'] / 1024:12.1f} MiB")
+    print(f"identical JSON     {'yes' if same else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Memory footprint and latency of the @mention prefix index.
+
+    python -m benchmarks.user_suggest [--users 1000000]
+
+Builds UserPrefixIndex from synthetic users (no database needed), then
+reports the process RSS the index retains (strings included), build time,
+suggest() latency percentiles by prefix length — alone and right after the
+matching users were bumped by new posts — and the cost of a live upsert.
+"""
+import argparse
+import gc
+import os
+import random
+import resource
+import string
+import time
+
+from backend.core.prefix_index import UserPrefixIndex
+
+SYLLABLES = ["ka", "ro", "mi", "da", "lu", "ne", "so", "ti", "ba", "ze", "vo", "ly", "an", "el", "or"]
+
+
+def synthetic_users(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    for user_id in range(1, n + 1):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        username = f"{name}{rng.randint(0, 9999)}"[:30]
+        # Most people keep the default display name (= username); some pick their own
+        if rng.random() < 0.3:
+            display = " ".join(w.capitalize() for w in rng.sample(SYLLABLES, 2)) + " " + rng.choice(string.ascii_uppercase)
+        else:
+            display = username
+        yield user_id, username, display, int(rng.paretovariate(1.2))
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def percentile(samples: list[float], p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    args = parser.parse_args()
+
+    gc.collect()
+    baseline = rss_bytes()
+    start = time.perf_counter()
+    index = UserPrefixIndex()
+    index.build(synthetic_users(args.users))     # Rows are consumed as generated: only the index stays
+    build_s = time.perf_counter() - start
+    gc.collect()
+    retained = rss_bytes() - baseline
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 - baseline
+
+    print(f"users              {args.users:,}")
+    print(f"index keys         {len(index._keys):,}")
+    print(f"cached prefixes    {len(index._top):,}")
+    print(f"build time         {build_s:.2f} s")
+    print(f"retained RSS       {retained / 2**20:.1f} MiB ({retained / args.users:.0f} B/user)")
+    print(f"peak RSS growth    {peak / 2**20:.1f} MiB")
+
+    rng = random.Random(1)
+    sample_ids = rng.sample(range(1, args.users + 1), 2_000)
+    by_length = {n: [index._usernames[i][:n] for i in sample_ids] for n in (1, 2, 3, 5)}
+    per_run = args.queries // len(by_length) // 2
+    for n, prefixes in by_length.items():
+        for bumped in (False, True):
+            timings = []
+            for i in range(per_run):
+                if bumped:                 # An author under this prefix just posted
+                    index.bump(sample_ids[i % len(sample_ids)])
+                q = prefixes[i % len(prefixes)]
+                t = time.perf_counter()
+                index.suggest(q, 8)
+                timings.append((time.perf_counter() - t) * 1e6)
+            label = "after bump" if bumped else "          "
+            print(f"suggest len={n} {label}  p50 {percentile(timings, .5):7.1f} µs   p99 {percentile(timings, .99):8.1f} µs")
+
+    timings = []
+    for i in range(2_000):
+        user_id = sample_ids[i]
+        t = time.perf_counter()
+        index.bump(user_id)
+        timings.append((time.perf_counter() - t) * 1e6)
+    print(f"bump               p50 {percentile(timings, .5):7.1f} µs   p99 {percentile(timings, .99):8.1f} µs")
+
+    timings = []
+    for user_id in range(args.users + 1, args.users + 201):
+        t = time.perf_counter()
+        index.upsert(user_id, f"newbie{user_id}", None)
+        timings.append((time.perf_counter() - t) * 1e6)
+    print(f"upsert             p50 {percentile(timings, .5):7.1f} µs   p99 {percentile(timings, .99):8.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
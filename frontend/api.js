@@ -47,7 +47,9 @@ async function apiFetch(path, options = {}, retry = true) {
   if (!res.ok) {
     let detail = `HTTP ${res.status}`;
     try { const body = await res.json(); detail = body.detail || detail; } catch {}
-    throw new Error(detail);
+    const err = new Error(detail);
+    err.status = res.status;
+    throw err;
   }
 
   if (res.status === 204) return null;
@@ -71,6 +73,16 @@ async function tryRefresh() {
 }
 
 // ── Public API ────────────────────────────────────────────────────────────────
+// Listings show excerpts, so ask the server to leave full post bodies out
+const LIST_FIELDS = "id,title,excerpt,link_url,author,score,comment_count,user_vote,created_at,updated_at";
+
+// Preview text for a post card: the server's excerpt, else the start of the body when the response has one
+function postExcerpt(p) {
+  if (p.excerpt) return p.excerpt;
+  const text = (p.body || "").split(/\s+/).join(" ").trim();
+  return text.length > 280 ? text.slice(0, 280).trimEnd() + "…" : text;
+}
+
 const API = {
   // Auth
   register: (data)         => apiFetch("/auth/register",  { method: "POST", body: JSON.stringify(data) }),
@@ -89,15 +101,21 @@ const API = {
     return fetch(`${API_BASE}/users/me/avatar`, { method: "POST", headers, body: fd })
       .then(r => r.ok ? r.json() : r.json().then(b => Promise.reject(new Error(b.detail))));
   },
-  userPosts: (username, skip = 0) => apiFetch(`/users/${username}/posts?skip=${skip}`),
+  userPosts: (username, skip = 0) => apiFetch(`/users/${username}/posts?skip=${skip}&fields=${LIST_FIELDS}`),
 
   // Posts
-  getPosts:   (skip = 0, sort = "new") => apiFetch(`/posts/?skip=${skip}&sort=${sort}`),
+  getPosts:   (skip = 0, sort = "new") => apiFetch(`/posts/?skip=${skip}&sort=${sort}&fields=${LIST_FIELDS}`),
   getPost:    (id)                     => apiFetch(`/posts/${id}`),
+  postsByLink: (url, skip = 0)         => apiFetch(`/posts/by-link?url=${encodeURIComponent(url)}&skip=${skip}&fields=${LIST_FIELDS}`),
   createPost: (data)                   => apiFetch("/posts/",     { method: "POST",  body: JSON.stringify(data) }),
   updatePost: (id, data)               => apiFetch(`/posts/${id}`,{ method: "PATCH", body: JSON.stringify(data) }),
   deletePost: (id)                     => apiFetch(`/posts/${id}`,{ method: "DELETE" }),
 
+  // Communities
+  communities:    (q = "")                   => apiFetch(`/c/${q ? `?q=${encodeURIComponent(q)}` : ""}`),
+  community:      (slug)                     => apiFetch(`/c/${slug}`),
+  communityPosts: (slug, skip = 0, sort = "new") => apiFetch(`/c/${slug}/posts?skip=${skip}&sort=${sort}&fields=${LIST_FIELDS}`),
+
   // Comments
   getComments:   (postId)        => apiFetch(`/comments/post/${postId}`),
   createComment: (postId, data)  => apiFetch(`/comments/post/${postId}`, { method: "POST",  body: JSON.stringify(data) }),
@@ -106,6 +124,17 @@ const API = {
 
   // Votes
   vote: (data) => apiFetch("/votes/", { method: "POST", body: JSON.stringify(data) }),
+
+  // Notifications
+  notifications:     (cursor = null) => apiFetch(`/notifications/${cursor ? `?cursor=${cursor}` : ""}`),
+  unreadCount:       ()              => apiFetch("/notifications/unread-count"),
+  markRead:          (ids)           => apiFetch("/notifications/read", { method: "POST", body: JSON.stringify({ ids }) }),
+  markAllRead:       ()              => apiFetch("/notifications/read", { method: "POST", body: JSON.stringify({ all: true }) }),
+
+  // Page bundles — page data + the viewer in one request (see loadPage)
+  postPage:    (id)                     => apiFetch(`/pages/post/${id}`),
+  feedPage:    (skip = 0, sort = "new") => apiFetch(`/pages/feed?skip=${skip}&sort=${sort}`),
+  profilePage: (username)               => apiFetch(`/pages/profile/${username}`),
 };
 
 // ── UI helpers ────────────────────────────────────────────────────────────────
@@ -152,6 +181,17 @@ function signOut() {
   window.location.href = "/";
 }
 
+// Like initAuth, but takes the viewer from a page bundle instead of calling /auth/me.
+// Bundles never 401, so a stored token with no viewer means it expired: refresh once.
+async function loadPage(fetchBundle) {
+  let page = await fetchBundle();
+  if (Auth.isLoggedIn() && !page.viewer && await tryRefresh()) page = await fetchBundle();
+  if (page.viewer) Auth.saveUser(page.viewer);
+  else Auth.clear();
+  renderNavAuth();
+  return page;
+}
+
 // Bootstrap auth state from the server on every page load
 async function initAuth() {
   if (Auth.isLoggedIn()) {
@@ -0,0 +1,53 @@
+"""
+Test setup: a throwaway SQLite database (never DATABASE_URL — the schema is
+dropped between tests), no rate limiting, no cross-worker cache bus.
+Set TEST_DATABASE_URL to run against another database.
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = os.getenv(
+    "TEST_DATABASE_URL",
+    "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="trackweave-tests-"), "test.db"),
+)
+os.environ["RATE_LIMIT_ENABLED"] = "0"
+os.environ["CACHE_BUS_BACKEND"] = "none"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.core.database import Base, SessionLocal, engine
+from backend.main import app
+from backend.models.user import User
+
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(db):
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def login(client, db):
+    """login("alice", admin=False) -> auth headers for a freshly registered user."""
+
+    def _login(username: str, admin: bool = False) -> dict:
+        client.post("/api/auth/register", json={
+            "username": username, "email": f"{username}@example.com", "password": "Passw0rdX",
+        })
+        if admin:
+            db.query(User).filter(User.username == username).update({"is_admin": True})
+            db.commit()
+        token = client.post("/api/auth/login", json={"identifier": username, "password": "Passw0rdX"}).json()
+        return {"Authorization": f"Bearer {token['access_token']}"}
+
+    return _login
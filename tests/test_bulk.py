@@ -0,0 +1,116 @@
+import time
+
+import pytest
+from sqlalchemy import inspect, select
+
+from backend.core import bulk
+from backend.core.bulk import TABLES, export_ndjson, import_ndjson
+from backend.core.database import Base, engine
+from backend.core.vote_log import roll_up
+
+
+def snapshot() -> dict[str, list[tuple]]:
+    with engine.connect() as conn:
+        return {
+            name: [tuple(r) for r in conn.execute(select(table).order_by(*table.primary_key.columns))]
+            for name, table in TABLES.items()
+        }
+
+
+def seed_site(client, login, monkeypatch):
+    admin, bob = login("admin", admin=True), login("bobby")
+    post = client.post("/api/posts/", json={"title": "t", "body": "line1\nline\t2 \\ x"}, headers=bob).json()
+    comment = client.post(f"/api/comments/post/{post['id']}", json={"body": "hi"}, headers=admin).json()
+    client.post(f"/api/comments/post/{post['id']}", json={"body": "re", "parent_id": comment["id"]}, headers=bob)
+    client.post("/api/votes/", json={"direction": 1, "post_id": post["id"]}, headers=admin)
+    client.post("/api/votes/", json={"direction": -1, "comment_id": comment["id"]}, headers=bob)
+    monkeypatch.setattr("backend.core.vote_log.VOTE_ROLLUP_LAG", -60)
+    assert roll_up() == 2
+    job = client.post("/api/admin/moderation", headers=admin, json={
+        "action": "soft_delete", "targets": ["comments"], "ids": [comment["id"]],
+    }).json()
+    for _ in range(100):
+        if client.get(f"/api/admin/moderation/jobs/{job['id']}", headers=admin).json()["status"] == "done":
+            break
+        time.sleep(0.05)
+
+
+def dump() -> list[str]:
+    return b"".join(export_ndjson()).decode().splitlines(keepends=True)
+
+
+def reset_schema():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def test_export_import_round_trip(client, login, monkeypatch):
+    seed_site(client, login, monkeypatch)
+    before = snapshot()
+    assert all(before[name] for name in ("vote_events", "vote_rollups", "vote_rollup_state", "moderation_jobs"))
+    lines = dump()
+
+    reset_schema()
+    counts = import_ndjson(lines)
+    assert counts == {name: len(rows) for name, rows in before.items() if rows}
+    assert snapshot() == before
+
+
+def test_resume_after_crash_between_commit_and_checkpoint(client, login, monkeypatch, tmp_path):
+    seed_site(client, login, monkeypatch)
+    before = snapshot()
+    lines = dump()
+    reset_schema()
+
+    checkpoint = str(tmp_path / "import.ckpt")
+    real_write, writes = bulk._write_checkpoint, []
+
+    def crash_on_third(path, line):
+        writes.append(line)
+        if len(writes) == 3:
+            raise RuntimeError("killed")     # Third batch is committed, its checkpoint never written
+        real_write(path, line)
+
+    monkeypatch.setattr(bulk, "_write_checkpoint", crash_on_third)
+    try:
+        import_ndjson(lines, checkpoint=checkpoint, batch_size=1)
+    except RuntimeError:
+        pass
+    monkeypatch.setattr(bulk, "_write_checkpoint", real_write)
+
+    import_ndjson(lines, checkpoint=checkpoint, batch_size=1)
+    assert snapshot() == before
+
+
+def index_names() -> set[str]:
+    with engine.connect() as conn:
+        inspector = inspect(conn)
+        return {i["name"] for name in TABLES for i in inspector.get_indexes(name)}
+
+
+def test_indexes_stay_unless_asked_and_come_back_after_a_failed_load(client, login, monkeypatch):
+    seed_site(client, login, monkeypatch)
+    lines = dump()
+    reset_schema()
+    expected = {index.name for table in TABLES.values() for index in table.indexes}
+    seen = []
+
+    def watching(lines):
+        for line in lines:
+            seen.append(index_names())
+            yield line
+
+    import_ndjson(watching(lines))
+    assert all(names == expected for names in seen)     # Live site: never read without its indexes
+
+    reset_schema()
+    seen.clear()
+
+    def failing(lines):
+        yield from watching(lines[:3])
+        raise RuntimeError("disk full")
+
+    with pytest.raises(RuntimeError):
+        import_ndjson(failing(lines), drop_indexes=True)
+    assert seen and seen[-1] < expected                  # Dropped during the load...
+    assert index_names() == expected                     # ...and rebuilt despite the failure
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+from sqlalchemy import text
+
+from backend.core.cache_bus import InvalidationBus, UnixSocketBackend, VersionedCache, bus
+
+
+@pytest.fixture
+def heard():
+    keys = []
+    bus.subscribe(keys.append)
+    yield keys
+    bus._subscribers.remove(keys.append)
+
+
+def test_keys_publish_on_commit_and_are_dropped_on_rollback(db, heard):
+    db.execute(text("SELECT 1"))
+    bus.invalidate(db, "test:rolled-back")
+    assert heard == []
+    db.rollback()
+    assert heard == []
+
+    db.execute(text("SELECT 1"))
+    bus.invalidate(db, "test:a", "test:b")
+    assert heard == []
+    db.commit()
+    assert sorted(heard) == ["test:a", "test:b"]
+
+    db.execute(text("SELECT 1"))
+    db.commit()    # Nothing left staged from the previous transaction
+    assert sorted(heard) == ["test:a", "test:b"]
+
+
+def test_remote_invalidation_makes_cached_entry_stale():
+    local, writer = InvalidationBus(), InvalidationBus()
+    cache = VersionedCache(local)
+
+    token = cache.token()
+    cache.set("page", [1, 2, 3], ["test:feed"], token)
+    cache.set("other", "kept", ["test:elsewhere"], token)
+    assert cache.get("page") == [1, 2, 3]
+
+    for payload in writer._payloads(["test:feed"]):
+        local._apply(payload, remote=True)
+    assert cache.get("page") is None
+    assert cache.get("other") == "kept"
+    assert local.version("test:feed") > 0
+
+    # A value read before the invalidation landed must not be cached over it
+    cache.set("page", [1, 2, 3], ["test:feed"], token)
+    assert cache.get("page") is None
+
+    # Our own payloads echoing back through the transport are ignored
+    before = local.seq("test:feed")
+    for payload in local._payloads(["test:feed"]):
+        local._apply(payload, remote=True)
+    assert local.seq("test:feed") == before
+
+
+def test_reset_makes_everything_stale():
+    local = InvalidationBus()
+    cache = VersionedCache(local)
+    cache.set("page", "value", ["test:feed"], cache.token())
+    local.reset()
+    assert cache.get("page") is None
+
+
+def test_unix_socket_round_trip(tmp_path):
+    first, second = InvalidationBus(UnixSocketBackend(str(tmp_path))), InvalidationBus(UnixSocketBackend(str(tmp_path)))
+    heard = {"first": [], "second": []}
+    first.subscribe(heard["first"].append)
+    second.subscribe(heard["second"].append)
+    first.start()
+    second.start()
+    try:
+        first.publish("test:x")
+        deadline = time.monotonic() + 5
+        while not heard["second"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert heard["second"] == ["test:x"]
+        assert heard["first"] == ["test:x"]     # Applied locally, not again from the socket
+        assert second.version("test:x") == first.version("test:x")
+    finally:
+        first.stop()
+        second.stop()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def thread(client, login, monkeypatch):
+    """A nested thread with votes, a deleted subtree and a few top-level pages."""
+    monkeypatch.setattr("backend.core.comment_stream._FLUSH_BYTES", 256)   # Several chunks per response
+    alice, bob = login("alice"), login("bobby")
+    post_id = client.post("/api/posts/", json={"title": "t", "body": "b"}, headers=alice).json()["id"]
+    url = f"/api/comments/post/{post_id}"
+
+    def comment(body, parent=None, who=alice):
+        return client.post(url, json={"body": body, "parent_id": parent}, headers=who).json()["id"]
+
+    for i in range(4):
+        top = comment(f"top {i} \"quoted\" ünïcode", who=bob if i % 2 else alice)
+        child = comment(f"reply {i}", top, who=bob)
+        comment(f"deep {i}", comment(f"deeper {i}", child))
+        comment(f"sibling {i}", top)
+        if i == 2:
+            client.delete(f"/api/comments/{child}", headers=bob)     # Hides its whole subtree
+        client.post("/api/votes/", json={"direction": 1, "comment_id": top}, headers=bob)
+        client.post("/api/votes/", json={"direction": -1, "comment_id": child}, headers=alice)
+    client.delete(f"/api/comments/{comment('deleted top', who=bob)}", headers=bob)
+    return url, alice
+
+
+def fetch(client, url, params, headers=None):
+    buffered = client.get(url, params=params, headers=headers)
+    streamed = client.get(url, params={**params, "stream": "true"}, headers=headers)
+    assert buffered.status_code == streamed.status_code == 200
+    assert streamed.headers["content-type"] == "application/json"
+    return buffered.json(), json.loads(streamed.content)
+
+
+CASES = [
+    {},
+    {"skip": 1, "limit": 2},
+    {"skip": 3},
+    {"skip": 10},
+    {"fields": "id,body,score,replies"},
+    {"fields": "id,author,created_at", "author_fields": "username"},
+    {"fields": "id,user_vote,replies", "author_fields": "username"},
+]
+
+
+def test_streamed_thread_matches_buffered(client, thread):
+    url, alice = thread
+    for headers in (None, alice):
+        for params in CASES:
+            buffered, streamed = fetch(client, url, params, headers)
+            assert streamed == buffered, (params, headers is not None)
+
+    whole, _ = fetch(client, url, {}, alice)
+    assert [c["body"] for c in whole] == [f"top {i} \"quoted\" ünïcode" for i in range(4)]
+    assert [r["body"] for r in whole[2]["replies"]] == ["sibling 2"]
+    assert whole[1]["replies"][0]["user_vote"] == -1 and whole[1]["score"] == 1
+
+
+def test_stream_refuses_side_loaded_authors(client, thread):
+    url, _ = thread
+    assert client.get(url, params={"stream": "true", "include": "authors"}).status_code == 422
@@ -0,0 +1,35 @@
+def thread(client, login):
+    """Post with top-level comments c0..c4, replies under c1 and c3, and c3 deleted."""
+    alice = login("alice")
+    post = client.post("/api/posts/", json={"title": "t", "body": "b"}, headers=alice).json()
+    url = f"/api/comments/post/{post['id']}"
+    top = [client.post(url, json={"body": f"c{i}"}, headers=alice).json()["id"] for i in range(5)]
+    reply = client.post(url, json={"body": "r1", "parent_id": top[1]}, headers=alice).json()["id"]
+    client.post(url, json={"body": "r1a", "parent_id": reply}, headers=alice)
+    client.post(url, json={"body": "r3", "parent_id": top[3]}, headers=alice)
+    client.post("/api/votes/", json={"direction": 1, "comment_id": reply}, headers=alice)
+    client.delete(f"/api/comments/{top[3]}", headers=alice)
+    return post["id"], alice
+
+
+def bodies(nodes) -> list:
+    return [(n["body"], bodies(n["replies"])) for n in nodes]
+
+
+def test_pages_of_top_level_comments_carry_their_subtrees(client, login):
+    post_id, alice = thread(client, login)
+    url = f"/api/comments/post/{post_id}"
+    assert bodies(client.get(url).json()) == [
+        ("c0", []), ("c1", [("r1", [("r1a", [])])]), ("c2", []), ("c4", []),
+    ]
+    page = client.get(url, params={"skip": 1, "limit": 2}, headers=alice).json()
+    assert bodies(page) == [("c1", [("r1", [("r1a", [])])]), ("c2", [])]
+    assert page[0]["replies"][0]["score"] == 1 and page[0]["replies"][0]["user_vote"] == 1
+
+
+def test_post_page_reports_more_comments(client, login):
+    post_id, _ = thread(client, login)
+    page = client.get(f"/api/pages/post/{post_id}", params={"comment_limit": 3}).json()
+    assert [c["body"] for c in page["comments"]] == ["c0", "c1", "c2"] and page["has_more_comments"]
+    page = client.get(f"/api/pages/post/{post_id}", params={"comment_limit": 4}).json()
+    assert [c["body"] for c in page["comments"]] == ["c0", "c1", "c2", "c4"] and not page["has_more_comments"]
@@ -0,0 +1,104 @@
+import pytest
+
+from backend.models.community import Community
+from backend.models.post import Post
+from backend.models.user import User
+
+
+@pytest.fixture
+def admin(login):
+    return login("admin", admin=True)
+
+
+def create(client, headers, slug, **fields):
+    return client.post("/api/c/", json={"slug": slug, "name": slug.title(), **fields}, headers=headers)
+
+
+def post_in(client, headers, community, title) -> int:
+    payload = {"title": title, "body": "b"}
+    if community:
+        payload["community"] = community
+    return client.post("/api/posts/", json=payload, headers=headers).json()["id"]
+
+
+def titles(client, slug, **params) -> list[str]:
+    return [p["title"] for p in client.get(f"/api/c/{slug}/posts", params=params).json()]
+
+
+def sneak_post(db, slug, title) -> None:
+    """Insert without going through the API, so nothing is invalidated."""
+    community_id = db.query(Community.id).filter(Community.slug == slug).scalar()
+    author_id = db.query(User.id).filter(User.username == "admin").scalar()
+    db.add(Post(title=title, body="b", author_id=author_id, community_id=community_id))
+    db.commit()
+
+
+def test_create_validates_slugs_and_rejects_duplicates(client, login, admin):
+    assert create(client, login("alice"), "dnb").status_code == 403
+    for slug in ["DnB", "-dnb", "d", "drum and bass", "x" * 41]:
+        assert create(client, admin, slug).status_code == 422, slug
+    assert create(client, admin, "dnb", kind="podcast").status_code == 422
+
+    created = create(client, admin, "dnb", description="Rollers", kind="genre")
+    assert created.status_code == 201
+    assert created.json() | {"id": 0, "created_at": ""} == {
+        "id": 0, "slug": "dnb", "name": "Dnb", "description": "Rollers", "kind": "genre",
+        "post_count": 0, "created_at": "",
+    }
+    assert create(client, admin, "dnb").status_code == 409
+    assert client.get("/api/c/DNB").json()["slug"] == "dnb"
+    assert client.get("/api/c/nope").status_code == 404
+
+
+def test_posts_are_partitioned_by_community(client, login, admin):
+    create(client, admin, "dnb")
+    create(client, admin, "house", kind="label")
+    alice = login("alice")
+    for title, community in [("d1", "dnb"), ("h1", "house"), ("g1", None), ("d2", "DNB")]:
+        post_in(client, alice, community, title)
+
+    assert titles(client, "dnb") == ["d2", "d1"]
+    assert titles(client, "house") == ["h1"]
+    assert client.get("/api/c/nope/posts").status_code == 404
+    bad = client.post("/api/posts/", json={"title": "x", "body": "b", "community": "nope"}, headers=alice)
+    assert bad.status_code == 422
+
+    listing = {c["slug"]: c["post_count"] for c in client.get("/api/c/").json()}
+    assert listing == {"dnb": 2, "house": 1}
+    assert [c["slug"] for c in client.get("/api/c/", params={"kind": "label"}).json()] == ["house"]
+    assert [c["slug"] for c in client.get("/api/c/", params={"q": "DN"}).json()] == ["dnb"]
+
+
+def test_feed_cache_is_invalidated_per_community(client, login, admin, db):
+    create(client, admin, "dnb")
+    create(client, admin, "house")
+    alice, bob = login("alice"), login("bob")
+    first = post_in(client, alice, "dnb", "first")
+    second = post_in(client, alice, "dnb", "second")
+    assert titles(client, "dnb") == ["second", "first"]
+    assert titles(client, "dnb", sort="top") == ["second", "first"]
+
+    # Pages are cached: a row written behind the API's back stays invisible…
+    sneak_post(db, "dnb", "sneaked")
+    assert titles(client, "dnb") == ["second", "first"]
+    # …and other communities' writes don't evict them
+    elsewhere = post_in(client, alice, "house", "elsewhere")
+    client.post("/api/votes/", json={"direction": 1, "post_id": elsewhere}, headers=bob)
+    assert titles(client, "dnb") == ["second", "first"]
+    assert titles(client, "dnb", sort="top") == ["second", "first"]
+
+    # Creating a post in the community
+    post_in(client, alice, "dnb", "third")
+    assert titles(client, "dnb") == ["third", "sneaked", "second", "first"]
+
+    # Voting re-ranks "top"
+    assert titles(client, "dnb", sort="top")[0] == "third"
+    client.post("/api/votes/", json={"direction": 1, "post_id": first}, headers=bob)
+    assert titles(client, "dnb", sort="top")[0] == "first"
+    client.post("/api/votes/", json={"direction": 0, "post_id": first}, headers=bob)
+    assert titles(client, "dnb", sort="top")[0] != "first"
+
+    # Deleting takes it out of the pages
+    assert client.delete(f"/api/posts/{second}", headers=alice).status_code == 204
+    assert "second" not in titles(client, "dnb")
+    assert "second" not in titles(client, "dnb", sort="top")
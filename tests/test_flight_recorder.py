@@ -0,0 +1,122 @@
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from backend.core import flight_recorder
+from backend.core.database import engine
+from backend.core.flight_recorder import FlightRecorderMiddleware, SlowRequestLog, sampler, slow_requests
+from backend.schemas.admin import SlowRequestList
+
+
+def recorded_app(log: SlowRequestLog) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/slow/{n}")
+    def slow(n: int):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT :n AS slow_marker"), {"n": n})
+            time.sleep(0.1)
+            conn.execute(text("SELECT 2 AS slow_marker_again"))
+        return {"n": n}
+
+    @app.get("/api/fast")
+    def fast():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1 AS fast_marker"))
+        return {}
+
+    app.add_middleware(FlightRecorderMiddleware, log=log, enabled=True)
+    return app
+
+
+def test_only_slow_requests_are_recorded_with_their_sql():
+    log = SlowRequestLog(size=10, min_ms=50, window=60)
+    client = TestClient(recorded_app(log))
+    client.get("/api/fast")
+    client.get("/api/slow/7", params={"q": "x"})
+    client.get("/api/fast")
+
+    [entry] = log.entries()
+    assert entry["route"] == "/api/slow/{n}" and entry["path_params"] == {"n": "7"}
+    assert entry["query"] == "q=x" and entry["status"] == 200 and entry["response_bytes"] == len(b'{"n":7}')
+    assert entry["duration_ms"] >= 100
+    statements = [s["statement"] for s in entry["sql"]]
+    assert len(statements) == 2 and "slow_marker" in statements[0] and "slow_marker_again" in statements[1]
+    assert "7" in entry["sql"][0]["params"]
+    assert entry["sql"][1]["offset_ms"] >= 100 > entry["sql"][0]["offset_ms"]
+    assert entry["sql_ms"] == pytest.approx(sum(s["duration_ms"] for s in entry["sql"]), abs=0.05)
+
+
+def test_trace_does_not_leak_between_requests(db):
+    log = SlowRequestLog(size=10, min_ms=0, window=60)
+    client = TestClient(recorded_app(log))
+    client.get("/api/slow/1")
+    assert flight_recorder._current.get() is None
+    db.execute(text("SELECT 1 AS outside_marker"))    # Outside any request: traced nowhere
+    client.get("/api/fast")
+
+    fast, slow = sorted(log.entries(), key=lambda e: e["duration_ms"])
+    assert [s["statement"] for s in fast["sql"]] == ["SELECT 1 AS fast_marker"]
+    assert all("marker" in s["statement"] and "fast" not in s["statement"] for s in slow["sql"])
+    assert not any("outside_marker" in s["statement"] for e in log.entries() for s in e["sql"])
+
+
+def test_board_keeps_only_the_slowest_and_expires():
+    log = SlowRequestLog(size=3, min_ms=10, window=60)
+    for ms in [50, 12, 80, 5, 30, 70, 11]:
+        if log.would_keep(ms):
+            log.add(ms, {"duration_ms": ms})
+    assert [e["duration_ms"] for e in log.entries()] == [80, 70, 50]
+    assert not log.would_keep(40) and log.would_keep(60)
+    assert len(log._heap) == 3
+
+    log.window = 0
+    time.sleep(0.01)
+    assert log.entries() == []
+
+
+def test_statement_cap_counts_the_rest(monkeypatch):
+    monkeypatch.setattr(flight_recorder, "FLIGHT_RECORDER_MAX_SQL", 1)
+    log = SlowRequestLog(size=10, min_ms=0, window=60)
+    TestClient(recorded_app(log)).get("/api/slow/3")
+    [entry] = log.entries()
+    assert len(entry["sql"]) == 1 and entry["sql_dropped"] == 1
+
+
+def test_admin_endpoints(client, login, monkeypatch):
+    user, admin = login("alice"), login("root", admin=True)
+    monkeypatch.setattr(slow_requests, "min_ms", 0)
+    slow_requests.clear()
+    client.get("/api/posts/")
+
+    for headers, expected in [({}, 401), (user, 403)]:
+        assert client.get("/api/admin/slow-requests", headers=headers).status_code == expected
+        assert client.delete("/api/admin/slow-requests", headers=headers).status_code == expected
+        assert client.post("/api/admin/profile", params={"seconds": 0.05}, headers=headers).status_code == expected
+
+    body = client.get("/api/admin/slow-requests", headers=admin).json()
+    page = SlowRequestList.model_validate(body)
+    routes = [i.route for i in page.items]
+    assert "/api/posts/" in routes
+    assert not any(i.path.startswith("/api/admin/") for i in page.items)
+    listing = page.items[routes.index("/api/posts/")]
+    assert listing.sql and listing.status == 200
+    assert client.get("/api/admin/slow-requests", params={"limit": 1}, headers=admin).json()["items"] == body["items"][:1]
+
+    assert client.delete("/api/admin/slow-requests", headers=admin).status_code == 204
+    assert client.get("/api/admin/slow-requests", headers=admin).json()["items"] == []
+
+    response = client.post("/api/admin/profile", params={"seconds": 0.1, "interval_ms": 5}, headers=admin)
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/plain")
+    assert int(response.headers["X-Profile-Samples"]) > 0
+    lines = response.text.splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+    sampler._lock.acquire()
+    try:
+        assert client.post("/api/admin/profile", params={"seconds": 0.05}, headers=admin).status_code == 409
+    finally:
+        sampler._lock.release()
@@ -0,0 +1,82 @@
+import pytest
+
+from backend.core.links import CanonicalLink, canonicalize, link_hash
+
+
+@pytest.mark.parametrize("raw", [
+    "https://open.spotify.com/track/4uLU6hMCjMI75M1A2tKUQC",
+    "http://OPEN.SPOTIFY.COM/track/4uLU6hMCjMI75M1A2tKUQC/",
+    "https://open.spotify.com/intl-de/track/4uLU6hMCjMI75M1A2tKUQC?si=abc123&context=x&nd=1",
+    "open.spotify.com/embed/track/4uLU6hMCjMI75M1A2tKUQC",
+    "spotify:track:4uLU6hMCjMI75M1A2tKUQC",
+])
+def test_spotify_spellings_share_one_canonical_link(raw):
+    assert canonicalize(raw) == CanonicalLink(
+        "https://open.spotify.com/track/4uLU6hMCjMI75M1A2tKUQC", "spotify", "track:4uLU6hMCjMI75M1A2tKUQC",
+    )
+
+
+@pytest.mark.parametrize("raw", [
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ&feature=share&si=x",
+    "https://m.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://music.youtube.com/watch?v=dQw4w9WgXcQ&list=RDAMVM",
+    "https://youtu.be/dQw4w9WgXcQ?si=abc",
+    "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+])
+def test_youtube_links_reduce_to_the_video(raw):
+    link = canonicalize(raw)
+    assert (link.url, link.provider, link.item_id) == (
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "youtube", "video:dQw4w9WgXcQ",
+    )
+
+
+def test_other_providers():
+    assert canonicalize("https://www.deezer.com/fr/track/3135556").item_id == "track:3135556"
+    assert canonicalize("https://music.apple.com/us/album/some-album/1440857781?i=1440857786").item_id == "song:1440857786"
+    assert canonicalize("https://listen.tidal.com/track/77646170").url == "https://tidal.com/browse/track/77646170"
+
+
+def test_generic_urls_are_normalized():
+    link = canonicalize("HTTP://WWW.Example.com:443//blog//post/?b=2&a=1&utm_source=x&fbclid=y#top")
+    assert link == CanonicalLink("https://example.com/blog/post?a=1&b=2")
+    assert canonicalize("https://example.com:8443/").url == "https://example.com:8443/"
+    assert canonicalize("https://bücher.example/").url == "https://xn--bcher-kva.example/"
+    assert canonicalize("http://[::1]:8080/x").url == "https://[::1]:8080/x"
+
+
+def test_generic_parameter_names_survive_off_their_tracking_hosts():
+    # ref / source / context / si select content on plenty of sites
+    for query in ("ref=v2.1", "source=flac", "context=live", "si=7", "feature=remix", "pp=1", "nd=2"):
+        assert canonicalize(f"https://example.com/track?{query}").url == f"https://example.com/track?{query}"
+    assert canonicalize("https://soundcloud.com/artist/track?si=abc&ref=clipboard").url == "https://soundcloud.com/artist/track"
+    assert canonicalize("https://x.com/a/status/1?s=20&t=abc").url == "https://x.com/a/status/1"
+    assert canonicalize("https://artist.bandcamp.com/track/song?from=embed").url == "https://artist.bandcamp.com/track/song"
+    assert canonicalize("https://www.youtube.com/playlist?list=PL1&si=x").url == "https://youtube.com/playlist?list=PL1"
+
+
+@pytest.mark.parametrize("raw", [None, "", "not a url", "ftp://example.com/x", "https://", "https://exa mple.com/"])
+def test_unusable_links(raw):
+    assert canonicalize(raw) is None
+
+
+def test_hash_is_a_stable_signed_64_bit_integer():
+    url = "https://open.spotify.com/track/4uLU6hMCjMI75M1A2tKUQC"
+    assert link_hash(url) == canonicalize(url).hash == link_hash(url)
+    assert -2**63 <= link_hash(url) < 2**63
+    assert link_hash(url) != link_hash(url + "x")
+
+
+def test_reposts_are_flagged_not_refused(client, login):
+    alice = login("alice")
+    first = client.post("/api/posts/", json={"title": "a", "link_url": "spotify:track:4uLU6hMCjMI75M1A2tKUQC"}, headers=alice)
+    assert first.status_code == 201 and first.json()["duplicate_of"] == []
+
+    again = {"title": "b", "link_url": "https://open.spotify.com/track/4uLU6hMCjMI75M1A2tKUQC?si=x"}
+    second = client.post("/api/posts/", json=again, headers=alice)
+    assert second.status_code == 201 and second.json()["duplicate_of"] == [first.json()["id"]]
+
+    refused = client.post("/api/posts/", json={**again, "reject_duplicate": True}, headers=alice)
+    assert refused.status_code == 409
+    assert refused.headers["x-duplicate-of"] == f"{second.json()['id']},{first.json()['id']}"
+    by_link = client.get("/api/posts/by-link", params={"url": "spotify:track:4uLU6hMCjMI75M1A2tKUQC"}).json()
+    assert [p["id"] for p in by_link] == [second.json()["id"], first.json()["id"]]
@@ -0,0 +1,157 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.core import notifications
+from backend.core.moderation import runner
+from backend.models.comment import Comment
+from backend.models.moderation import ModerationJob
+from backend.models.post import Post
+from backend.models.user import User
+from backend.models.vote import Vote
+
+
+def wait_for(client, admin, job_id) -> dict:
+    for _ in range(100):
+        job = client.get(f"/api/admin/moderation/jobs/{job_id}", headers=admin).json()
+        if job["status"] not in ("pending", "running"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} still {job['status']}")
+
+
+def posts_by(client, headers, n) -> list[int]:
+    return [client.post("/api/posts/", json={"title": f"p{i}", "body": "b"}, headers=headers).json()["id"] for i in range(n)]
+
+
+def orphan_job(db, author_id, status, updated_at=None) -> int:
+    """A job row as a worker that died (or was stopped) mid-job leaves it."""
+    job = ModerationJob(
+        kind="bulk", action="soft_delete", status=status, progress={}, updated_at=updated_at,
+        params={"action": "soft_delete", "targets": ["posts"], "author_id": author_id},
+    )
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def restart_runner():
+    runner.stop()
+    runner.start()
+
+
+def test_unfinished_jobs_resume_after_restart(client, login, db):
+    admin, bob = login("admin", admin=True), login("bobby")
+    posts_by(client, bob, 3)
+    bob_id = client.get("/api/auth/me", headers=bob).json()["id"]
+    stale = datetime.now(timezone.utc) - timedelta(hours=1)
+    jobs = [orphan_job(db, bob_id, "pending"), orphan_job(db, bob_id, "interrupted"),
+            orphan_job(db, bob_id, "running", updated_at=stale)]
+    live = orphan_job(db, bob_id, "running", updated_at=datetime.now(timezone.utc))
+
+    restart_runner()
+    for job_id in jobs:
+        assert wait_for(client, admin, job_id)["status"] == "done"
+    assert db.query(Post).filter(Post.is_deleted == False).count() == 0
+    # Another worker is still making progress on this one
+    assert client.get(f"/api/admin/moderation/jobs/{live}", headers=admin).json()["status"] == "running"
+
+
+def test_retry_reruns_failed_jobs_only(client, login, db):
+    admin, bob = login("admin", admin=True), login("bobby")
+    posts_by(client, bob, 2)
+    bob_id = client.get("/api/auth/me", headers=bob).json()["id"]
+    failed = orphan_job(db, bob_id, "failed")
+    db.query(ModerationJob).filter(ModerationJob.id == failed).update({"error": "boom"})
+    db.commit()
+
+    response = client.post(f"/api/admin/moderation/jobs/{failed}/retry", headers=admin)
+    assert response.status_code == 202 and response.json()["status"] == "pending"
+    job = wait_for(client, admin, failed)
+    assert job["status"] == "done" and job["error"] is None and job["progress"]["posts"]["done"] == 2
+
+    again = client.post(f"/api/admin/moderation/jobs/{failed}/retry", headers=admin)
+    assert again.status_code == 409
+    assert client.post("/api/admin/moderation/jobs/999/retry", headers=admin).status_code == 404
+
+
+def suggested(client, q) -> list[str]:
+    return [u["username"] for u in client.get("/api/users/suggest", params={"q": q}).json()]
+
+
+def eventually(check) -> None:
+    for _ in range(100):
+        if check():
+            return
+        time.sleep(0.05)
+    assert check()
+
+
+@pytest.mark.parametrize("action", ["purge", "soft_delete"])
+def test_ban_removes_content_votes_and_notifications(client, login, db, action):
+    admin, alice, bob, bobcat, carol = (login(u, admin=u == "admin") for u in ("admin", "alice", "bob", "bobcat", "carol"))
+    ids = {u: client.get("/api/auth/me", headers=h).json()["id"] for u, h in
+           [("alice", alice), ("bob", bob), ("carol", carol)]}
+    client.post("/api/c/", json={"slug": "dnb", "name": "Drum & Bass"}, headers=admin)
+
+    bobs_post = client.post("/api/posts/", json={"title": "bob", "body": "b", "community": "dnb"}, headers=bob).json()
+    client.post("/api/posts/", json={"title": "own", "body": "b"}, headers=alice)
+    alices_post = client.post("/api/posts/", json={"title": "spam", "body": "b", "community": "dnb"},
+                              headers=alice).json()
+    posts_by(client, bobcat, 2)
+    thread = f"/api/comments/post/{bobs_post['id']}"
+    read_one = client.post(thread, json={"body": "spam 1"}, headers=alice).json()
+    client.post(thread, json={"body": "spam 2"}, headers=alice)
+    carols = client.post(thread, json={"body": "fine"}, headers=carol).json()
+    for i in range(2):
+        client.post(f"/api/comments/post/{alices_post['id']}", json={"body": f"bob {i}"}, headers=bob)
+    for target in ({"post_id": bobs_post["id"]}, {"comment_id": carols["id"]}):
+        client.post("/api/votes/", json={"direction": 1, **target}, headers=alice)
+    client.post("/api/votes/", json={"direction": 1, "post_id": bobs_post["id"]}, headers=carol)
+
+    notifications.dispatcher.drain()
+    eventually(lambda: client.get("/api/notifications/unread-count", headers=bob).json()["unread"] == 3)
+    mine = client.get("/api/notifications/", headers=bob).json()["items"]
+    read = [n["id"] for n in mine if n["comment_id"] == read_one["id"]]
+    client.post("/api/notifications/read", json={"ids": read}, headers=bob)
+    eventually(lambda: suggested(client, "bob") == ["bob", "bobcat"])     # 1 post + 2 comments vs 2 posts
+    community = client.get("/api/c/dnb/posts", params={"sort": "top"}).json()     # Cached from here on
+    assert [(p["id"], p["score"]) for p in community] == [(bobs_post["id"], 2), (alices_post["id"], 0)]
+
+    response = client.post(f"/api/admin/users/{ids['alice']}/ban", json={"action": action}, headers=admin)
+    assert response.status_code == 202
+    job = wait_for(client, admin, response.json()["id"])
+    assert job["status"] == "done"
+    assert job["progress"] == {"posts": {"total": 2, "done": 2}, "comments": {"total": 2, "done": 2},
+                               "votes": {"total": 2, "done": 2}}
+
+    # Rows
+    db.expire_all()
+    assert db.query(Vote).filter(Vote.user_id == ids["alice"]).count() == 0
+    live = lambda model: db.query(model).filter(model.author_id == ids["alice"], model.is_deleted == False).count()
+    assert live(Post) == 0 and live(Comment) == 0
+    left = db.query(Post).filter(Post.author_id == ids["alice"]).count()
+    assert left == (0 if action == "purge" else 2)
+    bobs_comments = db.query(Comment).filter(Comment.author_id == ids["bob"]).count()
+    assert bobs_comments == (0 if action == "purge" else 2)     # Purge takes the whole thread
+
+    # Counters: only the unread notification about alice's comments comes off
+    assert client.get("/api/notifications/unread-count", headers=bob).json() == {"unread": 1}
+    unread = client.get("/api/notifications/", params={"unread_only": True}, headers=bob).json()["items"]
+    assert [n["actor"]["username"] for n in unread] == ["carol"]
+    assert db.query(User.unread_notifications).filter(User.id == ids["bob"]).scalar() == 1
+
+    # Listings, including the cached community page
+    feed = client.get("/api/posts/").json()
+    assert all(p["author"]["username"] != "alice" for p in feed)
+    assert next(p for p in feed if p["id"] == bobs_post["id"])["score"] == 1
+    community = client.get("/api/c/dnb/posts", params={"sort": "top"}).json()
+    assert [(p["id"], p["score"]) for p in community] == [(bobs_post["id"], 1)]
+    comments = client.get(thread).json()
+    assert [(c["body"], c["score"]) for c in comments] == [("fine", 0)]
+
+    # @mention ranking: alice is gone; a purge also took bob's two comments under her post
+    eventually(lambda: suggested(client, "ali") == [])
+    expected = ["bobcat", "bob"] if action == "purge" else ["bob", "bobcat"]
+    eventually(lambda: suggested(client, "bob") == expected)
@@ -0,0 +1,111 @@
+import logging
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from backend.core.notifications import NotificationDispatcher, dispatcher
+from backend.models.notification import Notification
+from backend.models.user import User
+
+
+def unread(client, headers) -> int:
+    return client.get("/api/notifications/unread-count", headers=headers).json()["unread"]
+
+
+def settle(db, username: str, expected: int) -> None:
+    """Wait for the dispatcher thread to write `expected` unread notifications."""
+    dispatcher.drain()
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        db.expire_all()
+        if db.query(User.unread_notifications).filter(User.username == username).scalar() == expected:
+            return
+        time.sleep(0.02)
+    raise AssertionError(f"{username} never reached {expected} unread notifications")
+
+
+@pytest.fixture
+def inbox(client, login, db):
+    """alice's post with five comments from bob -> five notifications for alice."""
+    alice, bob = login("alice"), login("bob")
+    post = client.post("/api/posts/", json={"title": "t", "body": "b"}, headers=alice).json()
+    for i in range(5):
+        client.post(f"/api/comments/post/{post['id']}", json={"body": f"c{i}"}, headers=bob)
+    settle(db, "alice", 5)
+    return alice, bob, post
+
+
+def test_inbox_pages_by_cursor(client, inbox):
+    alice, _, _ = inbox
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        page = client.get("/api/notifications/", params=params, headers=alice).json()
+        assert len(page["items"]) <= 2
+        seen += [n["id"] for n in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == 5 and seen == sorted(seen, reverse=True)
+
+    page = client.get("/api/notifications/", params={"limit": 5}, headers=alice).json()
+    assert page["next_cursor"] is None
+    assert {n["actor"]["username"] for n in page["items"]} == {"bob"}
+    assert {n["kind"] for n in page["items"]} == {"post_reply"}
+
+
+def test_mark_read_one_then_all(client, inbox):
+    alice, bob, _ = inbox
+    items = client.get("/api/notifications/", headers=alice).json()["items"]
+
+    assert client.post("/api/notifications/read", json={}, headers=alice).status_code == 422
+    assert client.post("/api/notifications/read", json={"ids": [items[0]["id"]]}, headers=alice).json() == {"unread": 4}
+    # Marking it again, or someone else's notification, changes nothing
+    assert client.post("/api/notifications/read", json={"ids": [items[0]["id"]]}, headers=alice).json() == {"unread": 4}
+    assert client.post("/api/notifications/read", json={"ids": [items[1]["id"]]}, headers=bob).json() == {"unread": 0}
+
+    page = client.get("/api/notifications/", params={"unread_only": True}, headers=alice).json()
+    assert len(page["items"]) == 4 and items[0]["id"] not in {n["id"] for n in page["items"]}
+
+    assert client.post("/api/notifications/read", json={"all": True}, headers=alice).json() == {"unread": 0}
+    assert client.get("/api/notifications/", params={"unread_only": True}, headers=alice).json()["items"] == []
+    assert unread(client, alice) == 0
+
+
+def test_unread_count_is_cached_until_invalidated(client, inbox, db):
+    alice, bob, post = inbox
+    assert unread(client, alice) == 5
+
+    # A write that bypasses the bus is not seen: the count is served from the cache
+    db.query(User).filter(User.username == "alice").update({"unread_notifications": 42})
+    db.commit()
+    assert unread(client, alice) == 5
+
+    # Writes through adjust_unread invalidate it
+    client.post(f"/api/comments/post/{post['id']}", json={"body": "one more"}, headers=bob)
+    settle(db, "alice", 43)
+    assert unread(client, alice) == 43
+
+    assert client.post("/api/notifications/read", json={"all": True}, headers=alice).json() == {"unread": 37}
+    assert unread(client, alice) == 37
+
+
+def test_failed_batch_keeps_the_good_rows(client, inbox, db, caplog):
+    _, _, post = inbox
+    alice_id = db.query(User.id).filter(User.username == "alice").scalar()
+    bob_id = db.query(User.id).filter(User.username == "bob").scalar()
+    comment_id = db.query(Notification.comment_id).first()[0]
+
+    def row(kind):
+        return {"user_id": alice_id, "actor_id": bob_id, "post_id": post["id"], "comment_id": comment_id,
+                "kind": kind, "is_read": False, "created_at": datetime.now(timezone.utc)}
+
+    with caplog.at_level(logging.WARNING, logger="backend.core.notifications"):
+        NotificationDispatcher()._flush([row("post_reply"), row(None), row("comment_reply")])
+
+    db.expire_all()
+    assert db.query(Notification).filter(Notification.user_id == alice_id).count() == 7
+    assert db.query(User.unread_notifications).filter(User.id == alice_id).scalar() == 7
+    dropped = [r for r in caplog.records if r.levelno == logging.ERROR]
+    assert len(dropped) == 1 and "dropped notification None" in dropped[0].getMessage()
@@ -0,0 +1,62 @@
+import random
+
+from backend.core import prefix_index
+from backend.core.prefix_index import UserPrefixIndex
+
+NAMES = ["ka", "ro", "mi", "da", "lu", "ne"]
+
+
+def brute_force(index: UserPrefixIndex, q: str, limit: int) -> list[int]:
+    matches = {
+        i for i, name in enumerate(index._usernames)
+        if name is not None and any(k.startswith(q) for k in index._keys_for(name, index._display[i]))
+    }
+    return sorted(matches, key=lambda i: (-index._activity[i], i))[:limit]
+
+
+def make_index(monkeypatch, n: int = 3_000) -> UserPrefixIndex:
+    monkeypatch.setattr(prefix_index, "SCAN_LIMIT", 32)    # Small slices so plenty of prefixes get cached
+    rng = random.Random(5)
+    rows = []
+    for user_id in range(1, n + 1):
+        name = "".join(rng.choice(NAMES) for _ in range(3)) + str(user_id)
+        display = f"{rng.choice(NAMES)} {rng.choice(NAMES)}" if rng.random() < 0.3 else None
+        rows.append((user_id, name, display, rng.randint(0, 20)))
+    index = UserPrefixIndex()
+    index.build(rows)
+    return index
+
+
+def test_cached_prefixes_match_a_full_rank(monkeypatch):
+    index = make_index(monkeypatch)
+    assert len(index._top) > 10
+    for q in ("k", "ka", "kar", "mi", "lu lu", "x"):
+        assert [i for i, _, _ in index.suggest(q, 20)] == brute_force(index, q, 20)
+
+
+def test_updates_keep_cached_lists_exact(monkeypatch):
+    index = make_index(monkeypatch)
+    rng = random.Random(9)
+    for step in range(2_000):
+        user_id = rng.randint(1, 3_100)
+        roll = rng.random()
+        if roll < 0.8:
+            index.bump(user_id, rng.randint(1, 5))
+        elif roll < 0.9:
+            index.upsert(user_id, "".join(rng.choice(NAMES) for _ in range(2)) + str(user_id), None)
+        else:
+            index.remove(user_id)
+        if step % 50 == 0:
+            for q in ("k", "ka", "rom", "ne", "d"):
+                assert [i for i, _, _ in index.suggest(q, 50)] == brute_force(index, q, 50), (step, q)
+
+
+def test_bumps_update_cached_lists_in_place(monkeypatch):
+    index = make_index(monkeypatch)
+    cached = set(index._top)
+    rng = random.Random(3)
+    for _ in range(1_000):
+        index.bump(rng.randint(1, 3_000), rng.randint(1, 5))
+    assert set(index._top) == cached
+    for prefix in list(cached)[:40]:
+        assert index._top[prefix] == brute_force(index, prefix, 50)
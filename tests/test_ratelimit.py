@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.core import ratelimit
+from backend.core.ratelimit import InMemoryBackend, LoadShedder, Rate, RateLimitMiddleware, RouteLimit
+from backend.core.security import create_access_token
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def consume(backend, *buckets) -> float:
+    return asyncio.run(backend.consume(list(buckets)))
+
+
+def test_bucket_allows_burst_then_reports_refill_time(clock):
+    backend, rate = InMemoryBackend(), Rate(per_second=0.5, burst=2)
+    assert consume(backend, ("k", rate)) == 0
+    assert consume(backend, ("k", rate)) == 0
+    assert consume(backend, ("k", rate)) == pytest.approx(2.0)
+    clock[0] += 2.0
+    assert consume(backend, ("k", rate)) == 0
+    assert consume(backend, ("k", rate)) == pytest.approx(2.0)
+
+
+def test_rejected_request_charges_no_bucket(clock):
+    backend = InMemoryBackend()
+    roomy, tight = Rate(per_second=1, burst=5), Rate(per_second=0.1, burst=1)
+    assert consume(backend, ("ip", roomy), ("user", tight)) == 0
+    for _ in range(3):
+        assert consume(backend, ("ip", roomy), ("user", tight)) == pytest.approx(10.0)
+    assert backend._buckets["ip"][0] == 4          # Only the accepted request was charged
+
+
+def test_active_buckets_are_evicted_least_recently_used(clock):
+    backend, slow = InMemoryBackend(max_keys=10), Rate(per_second=0.001, burst=5)
+    for i in range(50):
+        consume(backend, (f"ip{i}", slow))          # None of these refill in time to be swept
+        assert len(backend._buckets) <= 10
+    assert "ip49" in backend._buckets and "ip0" not in backend._buckets
+
+
+def _app(**middleware) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    def ping():
+        return {"ok": True}
+
+    app.add_middleware(RateLimitMiddleware, enabled=True, **middleware)
+    return TestClient(app)
+
+
+def test_middleware_answers_429_with_retry_after():
+    client = _app(routes=[RouteLimit("GET", "/api/ping", per_ip=Rate.per_minute(1, burst=2))])
+    assert client.get("/api/ping").status_code == 200
+    assert client.get("/api/ping").status_code == 200
+    response = client.get("/api/ping")
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Too many requests. Slow down."}
+    assert 59 <= int(response.headers["retry-after"]) <= 60
+
+
+def test_per_user_rejections_leave_ip_quota_alone():
+    backend = InMemoryBackend()
+    route = RouteLimit("GET", "/api/ping", per_ip=Rate.per_minute(3), per_user=Rate.per_minute(1))
+    client = _app(routes=[route], backend=backend)
+    alice = {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
+    bob   = {"Authorization": f"Bearer {create_access_token({'sub': '2'})}"}
+
+    assert client.get("/api/ping", headers=alice).status_code == 200
+    assert [client.get("/api/ping", headers=alice).status_code for _ in range(5)] == [429] * 5
+    # Same IP: two requests' worth of quota is left for someone else
+    assert client.get("/api/ping", headers=bob).status_code == 200
+    assert client.get("/api/ping").status_code == 200
+    assert client.get("/api/ping").status_code == 429
+
+
+def test_overloaded_process_sheds_with_503():
+    client = _app(routes=[], shedder=LoadShedder(low_in_flight=0, max_in_flight=0))
+    response = client.get("/api/ping")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(ratelimit.SHED_RETRY_AFTER)
+
+
+def test_post_page_bundle_draws_on_the_comment_thread_budget():
+    app = FastAPI()
+
+    @app.get("/api/comments/post/{post_id}")
+    def comments(post_id: int):
+        return []
+
+    @app.get("/api/pages/post/{post_id}")
+    def page(post_id: int):
+        return {}
+
+    app.add_middleware(RateLimitMiddleware, enabled=True)    # The real ROUTE_LIMITS
+    client = TestClient(app)
+    allowed = [client.get(f"/api/{'pages' if i % 2 else 'comments'}/post/1").status_code for i in range(70)]
+    assert allowed.count(200) == 60                          # One burst between the two routes
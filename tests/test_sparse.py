@@ -0,0 +1,77 @@
+import re
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from backend.core.database import engine
+
+LISTINGS = ["/api/posts/", "/api/users/alice/posts"]
+
+
+@pytest.fixture
+def posts(client, login):
+    alice = login("alice")
+    for i in range(3):
+        client.post("/api/posts/", json={"title": f"Post {i}", "body": f"secret body {i} " * 20}, headers=alice)
+    return alice
+
+
+@contextmanager
+def captured_sql():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def selects_body(statements: list[str]) -> bool:
+    return any(re.search(r"\bposts\.body\b", s) for s in statements if s.lstrip().upper().startswith("SELECT"))
+
+
+@pytest.mark.parametrize("url", LISTINGS)
+def test_fields_always_keep_id(client, posts, url):
+    items = client.get(url, params={"fields": "title,score"}).json()
+    assert len(items) == 3
+    assert all(set(i) == {"id", "title", "score"} for i in items)
+
+
+@pytest.mark.parametrize("url", LISTINGS)
+def test_unknown_fields_are_rejected(client, posts, url):
+    assert client.get(url, params={"fields": "title,password_hash"}).status_code == 422
+    assert client.get(url, params={"author_fields": "email"}).status_code == 422
+    assert client.get(url, params={"include": "comments"}).status_code == 422
+
+
+@pytest.mark.parametrize("url", LISTINGS)
+def test_include_authors_lists_each_author_once(client, posts, url):
+    body = client.get(url, params={"fields": "title,author", "author_fields": "username",
+                                   "include": "authors"}).json()
+    assert body["authors"] == [{"id": body["items"][0]["author_id"], "username": "alice"}]
+    assert len(body["items"]) == 3
+    assert all(set(i) == {"id", "title", "author_id"} for i in body["items"])
+
+
+@pytest.mark.parametrize("url", LISTINGS)
+def test_body_is_not_loaded_unless_requested(client, posts, url):
+    with captured_sql() as statements:
+        items = client.get(url, params={"fields": "title,excerpt"}).json()
+    assert all("body" not in i and i["excerpt"] for i in items)
+    assert not selects_body(statements)
+
+    with captured_sql() as statements:
+        items = client.get(url, params={"fields": "title,body"}).json()
+    assert all(i["body"].startswith("secret body") for i in items)
+    assert selects_body(statements)
+
+
+def test_default_response_is_unchanged(client, posts):
+    items = client.get("/api/posts/").json()
+    assert items[0]["body"].startswith("secret body")
+    assert items[0]["author"]["username"] == "alice"
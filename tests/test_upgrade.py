@@ -0,0 +1,88 @@
+from sqlalchemy import MetaData, Table, inspect, select
+
+from backend.core.bulk import TABLES
+from backend.core.database import Base, engine
+from backend.core.links import canonicalize
+from backend.core.notifications import dispatcher
+from backend.core.upgrade import check_schema, pending_changes, upgrade
+from backend.models.post import make_excerpt
+from backend.models.user import User
+
+# The schema as the first release created it: four tables, without the columns added since
+LEGACY = {
+    "users":    {"unread_notifications"},
+    "posts":    {"excerpt", "community_id", "link_canonical", "link_provider", "link_item_id", "link_hash"},
+    "comments": set(),
+    "votes":    set(),
+}
+
+
+def create_legacy_schema() -> MetaData:
+    Base.metadata.drop_all(bind=engine)
+    legacy = MetaData()
+    for name, dropped in LEGACY.items():
+        Table(name, legacy, *(c._copy() for c in TABLES[name].columns if c.name not in dropped))
+    legacy.create_all(bind=engine)
+    return legacy
+
+
+def test_upgrade_brings_a_legacy_database_up_to_the_models(db):
+    legacy = create_legacy_schema()
+    body = "An old post " * 40
+    with engine.begin() as conn:
+        conn.execute(legacy.tables["users"].insert().values(
+            id=1, username="old", email="old@example.com", hashed_password="x", is_active=True, is_admin=False,
+        ))
+        conn.execute(legacy.tables["posts"].insert().values(id=1, title="t", body=body, author_id=1, is_deleted=False))
+        conn.execute(legacy.tables["posts"].insert().values(
+            id=2, title="l", link_url="https://youtu.be/dQw4w9WgXcQ", author_id=1, is_deleted=False,
+        ))
+    assert "backend.cli upgrade" in check_schema()
+
+    assert upgrade(log=lambda line: None)
+    with engine.connect() as conn:
+        assert pending_changes(conn) == []
+        assert conn.execute(select(TABLES["posts"].c.excerpt).where(TABLES["posts"].c.id == 1)).scalar() == make_excerpt(body)
+        link = conn.execute(select(TABLES["posts"]).where(TABLES["posts"].c.id == 2)).one()
+        assert link.link_hash == canonicalize(link.link_url).hash and link.link_item_id == "video:dQw4w9WgXcQ"
+        assert conn.execute(select(TABLES["users"].c.unread_notifications)).scalar() == 0
+    assert check_schema() is None
+    assert {i["name"] for i in inspect(engine).get_indexes("posts")} >= {"ix_posts_community_feed", "ix_posts_link_hash"}
+    assert upgrade(log=lambda line: None) == []      # Rerunnable
+
+
+def test_upgraded_database_serves_the_app(db, client):
+    create_legacy_schema()
+    upgrade(log=lambda line: None)
+    assert client.post("/api/auth/register", json={
+        "username": "fresh", "email": "fresh@example.com", "password": "Passw0rdX",
+    }).status_code == 201
+
+
+def test_upgrade_recounts_unread_notifications(client, login, db):
+    alice, bob = login("alice"), login("bobby")
+    post = client.post("/api/posts/", json={"title": "t", "body": "b"}, headers=alice).json()
+    for i in range(3):
+        client.post(f"/api/comments/post/{post['id']}", json={"body": f"c{i}"}, headers=bob)
+    dispatcher.drain()
+    db.query(User).filter(User.username == "alice").update({"unread_notifications": 0})
+    db.commit()
+
+    upgrade(log=lambda line: None)
+    assert client.get("/api/notifications/unread-count", headers=alice).json() == {"unread": 3}
+
+
+def test_relink_recanonicalizes_posts_made_under_older_rules(client, login, db):
+    alice = login("alice")
+    url = "https://example.com/track?source=flac&utm_medium=x"
+    post_id = client.post("/api/posts/", json={"title": "t", "link_url": url}, headers=alice).json()["id"]
+    posts = TABLES["posts"]
+    with engine.begin() as conn:      # As stored when `source` was stripped everywhere
+        conn.execute(posts.update().where(posts.c.id == post_id).values(
+            link_canonical="https://example.com/track", link_hash=canonicalize("https://example.com/track").hash,
+        ))
+
+    upgrade(log=lambda line: None)
+    assert client.get("/api/posts/by-link", params={"url": url}).json() == []
+    upgrade(relink=True, log=lambda line: None)
+    assert [p["id"] for p in client.get("/api/posts/by-link", params={"url": url}).json()] == [post_id]
@@ -0,0 +1,22 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from backend.core.user_index import refresher
+from backend.main import app
+
+
+def refresher_threads() -> list[threading.Thread]:
+    return [t for t in threading.enumerate() if t.name == "user-index-load"]
+
+
+def test_refresher_thread_stops_with_the_app(db):
+    before = len(refresher_threads())
+    for _ in range(3):
+        with TestClient(app):
+            thread = refresher._thread
+            refresher.start()                   # Already running: no second thread
+            assert refresher._thread is thread
+            assert len(refresher_threads()) == before + 1
+        assert not thread.is_alive()
+    assert len(refresher_threads()) == before
@@ -0,0 +1,112 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from backend.core.vote_log import bucket_start, rising, roll_up, score_history
+from backend.models.vote_event import VoteEvent, VoteRollup
+
+
+def log(db, *events):
+    """events: (target_id, delta, created_at) for posts."""
+    db.add_all(VoteEvent(target_type="post", target_id=t, user_id=1, delta=d, created_at=at) for t, d, at in events)
+    db.commit()
+
+
+def buckets(db, granularity) -> dict:
+    rows = db.query(VoteRollup).filter(VoteRollup.granularity == granularity).all()
+    return {(r.target_id, bucket_start(r.bucket_start, granularity)): (r.upvotes, r.downvotes) for r in rows}
+
+
+def test_bucket_start_truncates_to_utc_boundaries():
+    at = datetime(2026, 3, 4, 15, 47, 12, tzinfo=timezone.utc)
+    assert bucket_start(at, "minute") == datetime(2026, 3, 4, 15, 47, tzinfo=timezone.utc)
+    assert bucket_start(at, "hour") == datetime(2026, 3, 4, 15, tzinfo=timezone.utc)
+    assert bucket_start(at, "day") == datetime(2026, 3, 4, tzinfo=timezone.utc)
+    assert bucket_start(at.replace(tzinfo=None), "hour") == datetime(2026, 3, 4, 15, tzinfo=timezone.utc)
+
+
+def test_rollup_counts_each_event_once_per_granularity(db):
+    base = bucket_start(datetime.now(timezone.utc) - timedelta(hours=3), "hour")
+    events = [(1, 1, base + timedelta(minutes=5)), (1, 1, base + timedelta(minutes=5, seconds=30)),
+              (1, -1, base + timedelta(minutes=70)), (1, 2, base + timedelta(minutes=75))]
+    log(db, *events)
+    assert roll_up() == 4
+    assert roll_up() == 0
+
+    assert buckets(db, "minute") == {
+        (1, base + timedelta(minutes=5)): (2, 0),
+        (1, base + timedelta(minutes=70)): (0, 1),
+        (1, base + timedelta(minutes=75)): (2, 0),
+    }
+    assert buckets(db, "hour") == {(1, base): (2, 0), (1, base + timedelta(hours=1)): (2, 1)}
+    days = {}
+    for _, delta, at in events:
+        up, down = days.get((1, bucket_start(at, "day")), (0, 0))
+        days[(1, bucket_start(at, "day"))] = (up + max(delta, 0), down + max(-delta, 0))
+    assert buckets(db, "day") == days
+
+
+def test_events_inside_the_lag_wait_for_the_next_pass(db):
+    now = datetime.now(timezone.utc)
+    log(db, (1, 1, now - timedelta(minutes=5)), (1, 1, now))
+    assert roll_up() == 1
+    assert sum(up for up, _ in buckets(db, "day").values()) == 1
+
+
+def test_score_history_starts_from_the_score_before_the_window(db):
+    now = datetime.now(timezone.utc)
+    base = bucket_start(now - timedelta(hours=3), "hour")
+    log(db,
+        (1, 1, now - timedelta(days=3)), (1, 1, now - timedelta(days=3)),   # Before the window: score 2
+        (1, 1, base + timedelta(minutes=1)), (1, -2, base + timedelta(minutes=2)),
+        (1, 1, base + timedelta(hours=2, minutes=30)))
+    roll_up()
+
+    points = score_history(db, 1, "hour", base + timedelta(minutes=40))    # Rounded down to `base`
+    assert [(p["bucket_start"], p["upvotes"], p["downvotes"], p["score"]) for p in points] == [
+        (base, 1, 2, 1),
+        (base + timedelta(hours=2), 1, 0, 2),
+    ]
+    assert score_history(db, 1, "hour", now + timedelta(hours=1)) == []
+    assert score_history(db, 2, "hour", base) == []
+
+
+def test_rising_ranks_recent_net_gain(db):
+    now = datetime.now(timezone.utc)
+    log(db,
+        (1, 1, now - timedelta(hours=1)), (1, 1, now - timedelta(hours=2)), (1, 1, now - timedelta(days=2)),
+        (2, 1, now - timedelta(hours=1)), (2, 1, now - timedelta(days=2)), (2, 1, now - timedelta(days=2)),
+        (3, 1, now - timedelta(hours=1)), (3, -2, now - timedelta(minutes=30)),
+        (4, 1, now - timedelta(hours=1)))
+    roll_up()
+    assert rising(db, hours=6, limit=10) == [(1, 2), (4, 1), (2, 1)]
+    assert rising(db, hours=6, limit=1, offset=1) == [(4, 1)]
+
+
+def test_purges_log_every_vote_they_delete(client, login, db):
+    admin, alice, bob = login("admin", admin=True), login("alice"), login("bobby")
+    post = client.post("/api/posts/", json={"title": "t", "body": "b"}, headers=alice).json()["id"]
+    kept = client.post("/api/posts/", json={"title": "k", "body": "b"}, headers=alice).json()["id"]
+    comment = client.post(f"/api/comments/post/{kept}", json={"body": "c"}, headers=bob).json()["id"]
+    reply = client.post(f"/api/comments/post/{post}", json={"body": "r"}, headers=bob).json()["id"]
+    for who in (alice, bob):
+        client.post("/api/votes/", json={"direction": 1, "post_id": post}, headers=who)
+        client.post("/api/votes/", json={"direction": -1, "comment_id": comment}, headers=who)
+        client.post("/api/votes/", json={"direction": 1, "comment_id": reply}, headers=who)
+
+    for payload in ({"targets": ["posts"], "ids": [post]}, {"targets": ["comments"], "ids": [comment]}):
+        job = client.post("/api/admin/moderation", headers=admin, json={"action": "purge", **payload}).json()
+        for _ in range(100):
+            if client.get(f"/api/admin/moderation/jobs/{job['id']}", headers=admin).json()["status"] == "done":
+                break
+            time.sleep(0.05)
+
+    net = {
+        (target_type, target_id): total for target_type, target_id, total in db.execute(
+            select(VoteEvent.target_type, VoteEvent.target_id, func.sum(VoteEvent.delta))
+            .group_by(VoteEvent.target_type, VoteEvent.target_id)
+        )
+    }
+    assert net == {("post", post): 0, ("comment", comment): 0, ("comment", reply): 0}
+    assert db.scalar(select(func.count()).select_from(VoteEvent).where(VoteEvent.delta < 0)) == 6